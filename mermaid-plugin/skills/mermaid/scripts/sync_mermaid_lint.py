@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+sync_mermaid_lint.py
+Keeps the copies of mermaid_lint.py identical to this plugin's original.
+
+Each plugin is installed on its own, so project-context (validate) and the
+Obsidian formatter ship their own copy. Without options the original is
+copied over every copy that differs; --check only compares SHA-256 hashes
+and exits 1 if a copy is missing or out of date (for CI and pre-commit).
+
+Usage:
+    python3 sync_mermaid_lint.py [--check]
+"""
+
+import argparse
+import hashlib
+import shutil
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+ORIGINAL = Path(__file__).resolve().parent / "mermaid_lint.py"
+REPO_ROOT = ORIGINAL.parents[4]
+COPIES = [
+    REPO_ROOT / "project-context" / "scripts" / "mermaid_lint.py",
+    REPO_ROOT / "obsidian-plugin" / "skills" / "obsidian" / "scripts" / "mermaid_lint.py",
+]
+
+
+def sha256(path: Path) -> Optional[str]:
+    """Hex SHA-256 of a file, or None if it does not exist."""
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Copy mermaid_lint.py to the other plugins, or check the copies")
+    parser.add_argument("--check", action="store_true", help="Only compare hashes; exit 1 if a copy differs")
+    args = parser.parse_args(argv)
+
+    expected = sha256(ORIGINAL)
+    stale = [path for path in COPIES if sha256(path) != expected]
+    for path in COPIES:
+        name = path.relative_to(REPO_ROOT)
+        if path not in stale:
+            print(f"✓ {name}")
+        elif args.check:
+            print(f"✗ {name} differs from the original (run sync_mermaid_lint.py)")
+        else:
+            shutil.copy2(ORIGINAL, path)
+            print(f"✓ {name} updated")
+    return 1 if args.check and stale else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+backup_store.py
+Content-addressed backup store for the Obsidian formatter.
+
+Backups live in one hidden folder per vault, <vault>/.obsidian-format/backups/:
+
+    objects/<ab>/<sha256 rest>   file contents, each stored once
+    manifest.jsonl               one line per backup: {"path", "at", "hash", "size"}
+
+Backing up content that is already stored only appends a manifest line, so
+repeated formatting of a vault costs no extra copies. The vault root is the
+nearest parent folder with .obsidian/ or .obsidian-format/ (else the file's
+own folder).
+
+Usage:
+    python3 backup_store.py list [FILE] [--vault DIR]
+    python3 backup_store.py restore FILE [--at TIME | --hash PREFIX]
+    python3 backup_store.py gc [--vault DIR] [--keep-days N] [--keep-last N]
+
+Output: JSON
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows — no cross-process locking
+    fcntl = None
+
+STATE_DIR_NAME = ".obsidian-format"
+BACKUPS_DIR_NAME = "backups"
+MANIFEST_FILENAME = "manifest.jsonl"
+DEFAULT_KEEP_DAYS = 30
+DEFAULT_KEEP_LAST = 1
+
+
+def find_vault_root(path: str) -> str:
+    """Nearest folder at or above path holding .obsidian/ or .obsidian-format/."""
+    start = os.path.abspath(path if os.path.isdir(path) else os.path.dirname(path) or ".")
+    current = start
+    while True:
+        if os.path.isdir(os.path.join(current, ".obsidian")) or os.path.isdir(os.path.join(current, STATE_DIR_NAME)):
+            return current
+        parent = os.path.dirname(current)
+        if parent == current:
+            return start
+        current = parent
+
+
+class BackupStore:
+    """The backup store of one vault root."""
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self.dir = os.path.join(self.root, STATE_DIR_NAME, BACKUPS_DIR_NAME)
+        self.manifest = os.path.join(self.dir, MANIFEST_FILENAME)
+
+    def object_path(self, digest: str) -> str:
+        return os.path.join(self.dir, "objects", digest[:2], digest[2:])
+
+    @contextmanager
+    def lock(self):
+        """Exclusive flock serializing saves (object write + manifest append) and gc."""
+        os.makedirs(self.dir, exist_ok=True)
+        with open(os.path.join(self.dir, ".lock"), "a") as handle:
+            if fcntl:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            yield
+
+    def save(self, path: str, digest: Optional[str] = None) -> dict:
+        """Back up path's current content; digest (sha256) skips re-hashing when known.
+
+        Content already in the store is not copied again. The object and its
+        manifest record are written under one lock, so gc cannot delete the
+        object before the record referencing it exists. Returns the record.
+        """
+        if digest is None:
+            digest = file_hash(path)
+        target = self.object_path(digest)
+        with self.lock():
+            if not os.path.exists(target):
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(target))
+                os.close(fd)
+                try:
+                    shutil.copyfile(path, tmp)
+                    os.replace(tmp, target)
+                finally:
+                    if os.path.exists(tmp):
+                        os.unlink(tmp)
+            record = {
+                "path": os.path.relpath(os.path.abspath(path), self.root).replace(os.sep, "/"),
+                "at": datetime.now().isoformat(timespec="seconds"),
+                "hash": digest,
+                "size": os.path.getsize(target),
+            }
+            with open(self.manifest, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+        return record
+
+    def records(self) -> list:
+        """Manifest records, oldest first (unreadable lines skipped)."""
+        records = []
+        try:
+            with open(self.manifest, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(record, dict) and {"path", "at", "hash"} <= record.keys():
+                        records.append(record)
+        except OSError:
+            pass
+        return records
+
+    def history(self, path: str) -> list:
+        """Records for one file, newest first."""
+        rel = os.path.relpath(os.path.abspath(path), self.root).replace(os.sep, "/")
+        return [r for r in reversed(self.records()) if r["path"] == rel]
+
+    def restore(self, path: str, at: Optional[str] = None, digest: Optional[str] = None) -> dict:
+        """Put a backup back in place; the current content is backed up first.
+
+        Picks the newest backup of path, or the newest whose time starts
+        with `at` / whose hash starts with `digest`. Raises LookupError.
+        """
+        candidates = self.history(path)
+        if at:
+            candidates = [r for r in candidates if r["at"].startswith(at)]
+        if digest:
+            candidates = [r for r in candidates if r["hash"].startswith(digest)]
+        candidates = [r for r in candidates if os.path.exists(self.object_path(r["hash"]))]
+        if not candidates:
+            raise LookupError(f"No backup of '{path}' matches")
+        record = candidates[0]
+
+        current = None
+        if os.path.exists(path):
+            if file_hash(path) == record["hash"]:
+                return {"restored": record, "unchanged": True}
+            current = self.save(path)
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(prefix=".restore-", suffix=".md", dir=directory)
+        os.close(fd)
+        try:
+            shutil.copyfile(self.object_path(record["hash"]), tmp)
+            if os.path.exists(path):
+                shutil.copymode(path, tmp)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+        return {"restored": record, "previous": current}
+
+    def gc(self, keep_days: float = DEFAULT_KEEP_DAYS, keep_last: int = DEFAULT_KEEP_LAST) -> dict:
+        """Drop records older than keep_days (keeping each file's newest keep_last) and unused objects."""
+        cutoff = (datetime.now() - timedelta(days=keep_days)).isoformat(timespec="seconds")
+        with self.lock():
+            records = self.records()
+            newest = {}
+            for record in reversed(records):
+                newest.setdefault(record["path"], []).append(record)
+            keep_ids = set()
+            for per_file in newest.values():
+                keep_ids.update(id(r) for r in per_file[:keep_last])
+            kept = [r for r in records if id(r) in keep_ids or r["at"] >= cutoff]
+
+            if len(kept) != len(records):
+                fd, tmp = tempfile.mkstemp(prefix=".manifest-", dir=self.dir)
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.writelines(json.dumps(r) + "\n" for r in kept)
+                os.replace(tmp, self.manifest)
+
+            used = {r["hash"] for r in kept}
+            removed = freed = 0
+            objects = os.path.join(self.dir, "objects")
+            for dirpath, _, filenames in os.walk(objects):
+                for name in filenames:
+                    full = os.path.join(dirpath, name)
+                    digest = os.path.basename(dirpath) + name
+                    # Temp files of a save still in progress are left alone for an hour
+                    if name.startswith(".tmp-") and time.time() - os.path.getmtime(full) < 3600:
+                        continue
+                    if digest not in used:
+                        freed += os.path.getsize(full)
+                        os.unlink(full)
+                        removed += 1
+
+        return {
+            "records_removed": len(records) - len(kept),
+            "records_kept": len(kept),
+            "objects_removed": removed,
+            "bytes_freed": freed,
+        }
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Content-addressed backups of formatted Obsidian notes")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = subparsers.add_parser("list", help="List backups (of one file, or all)")
+    list_parser.add_argument("file", nargs="?", help="Only backups of this note")
+    list_parser.add_argument("--vault", help="Vault root (default: found from the file or current folder)")
+
+    restore_parser = subparsers.add_parser("restore", help="Restore a note from its backups")
+    restore_parser.add_argument("file", help="Note to restore")
+    restore_parser.add_argument("--at", help="Backup time or prefix, e.g. 2026-01-31T14")
+    restore_parser.add_argument("--hash", help="Backup content hash prefix")
+    restore_parser.add_argument("--vault", help="Vault root (default: found from the file)")
+
+    gc_parser = subparsers.add_parser("gc", help="Drop old backups and unreferenced content")
+    gc_parser.add_argument("--vault", help="Vault root (default: found from the current folder)")
+    gc_parser.add_argument("--keep-days", type=float, default=DEFAULT_KEEP_DAYS, help="Keep backups newer than this")
+    gc_parser.add_argument("--keep-last", type=int, default=DEFAULT_KEEP_LAST,
+                           help="Always keep this many newest backups per note")
+
+    args = parser.parse_args()
+    root = args.vault or find_vault_root(getattr(args, "file", None) or ".")
+    store = BackupStore(root)
+
+    if args.command == "list":
+        records = store.history(args.file) if args.file else list(reversed(store.records()))
+        print(json.dumps({"vault": store.root, "count": len(records), "backups": records}, indent=2))
+        return 0
+
+    if args.command == "restore":
+        try:
+            result = store.restore(args.file, args.at, args.hash)
+        except (LookupError, OSError) as e:
+            print(json.dumps({"error": str(e)}))
+            return 1
+        print(json.dumps(result, indent=2))
+        return 0
+
+    if args.keep_days < 0 or args.keep_last < 0:
+        print(json.dumps({"error": "--keep-days and --keep-last must not be negative"}))
+        return 1
+    print(json.dumps(store.gc(args.keep_days, args.keep_last), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
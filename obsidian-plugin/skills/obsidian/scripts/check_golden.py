@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+check_golden.py
+Golden-file tests for format_obsidian.py.
+
+Each golden/<case>.input.md is formatted in memory and compared byte for byte
+with golden/<case>.expected.md. The expected files are the output of the
+original shell pipeline
+
+    sed 's/^  $//' | cat -s | awk -f clean-mermaid.awk | python3 fix-tables.py --no-align
+
+so a mismatch means format_obsidian.py no longer matches it. Each case also
+checks that --check (with and without the --mmap prescreen) flags the input
+and the expected file exactly when formatting would change them. Expected
+files are not always at a fixed point: the pipeline turns \r into line
+breaks only in its last step, so a second pass can still squeeze them.
+
+--pipeline also re-runs that pipeline on every input (needs sed, cat and awk)
+and compares it with the expected file; --update rewrites the expected files
+from the pipeline.
+
+Usage:
+    python3 check_golden.py [--pipeline | --update] [case ...]
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from typing import List, Optional
+
+from format_obsidian import check_file, format_lines
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+GOLDEN_DIR = os.path.join(SCRIPT_DIR, "golden")
+INPUT_SUFFIX = ".input.md"
+EXPECTED_SUFFIX = ".expected.md"
+
+
+def golden_cases() -> List[str]:
+    """Names of the cases in golden/, sorted."""
+    return sorted(name[:-len(INPUT_SUFFIX)] for name in os.listdir(GOLDEN_DIR) if name.endswith(INPUT_SUFFIX))
+
+
+def read_bytes(path: str) -> bytes:
+    """A file's raw content."""
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def formatted(path: str) -> bytes:
+    """format_obsidian.py's output for a file, without touching it."""
+    with open(path, "r", encoding="utf-8", newline="\n") as src:
+        return "".join(format_lines(src)).encode("utf-8")
+
+
+def pipeline(path: str) -> bytes:
+    """The original shell pipeline's output for a file, run on a temporary copy."""
+    fd, tmp = tempfile.mkstemp(suffix=".md")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            subprocess.run(
+                ["sh", "-c", "sed 's/^  $//' \"$1\" | cat -s | awk -f \"$2\"", "sh", path,
+                 os.path.join(SCRIPT_DIR, "clean-mermaid.awk")],
+                check=True, stdout=out,
+            )
+        subprocess.run([sys.executable, os.path.join(SCRIPT_DIR, "fix-tables.py"), "--no-align", tmp], check=True)
+        return read_bytes(tmp)
+    finally:
+        os.unlink(tmp)
+
+
+def check_case(name: str, use_pipeline: bool) -> List[str]:
+    """Failure messages for one case (empty if it passes)."""
+    source = os.path.join(GOLDEN_DIR, name + INPUT_SUFFIX)
+    expected_path = os.path.join(GOLDEN_DIR, name + EXPECTED_SUFFIX)
+    if not os.path.exists(expected_path):
+        return [f"missing {name}{EXPECTED_SUFFIX} (run with --update)"]
+    expected = read_bytes(expected_path)
+
+    failures = []
+    actual = formatted(source)
+    if actual != expected:
+        failures.append(f"output differs from {name}{EXPECTED_SUFFIX}{_first_diff(actual, expected)}")
+    if use_pipeline and pipeline(source) != expected:
+        failures.append(f"pipeline output differs from {name}{EXPECTED_SUFFIX}")
+    for label, path, before, after in (("input", source, read_bytes(source), actual),
+                                       ("expected output", expected_path, expected, formatted(expected_path))):
+        changes = before != after
+        for prescreen in (False, True):
+            if (check_file(path, prescreen=prescreen) is not None) != changes:
+                mode = "--check --mmap" if prescreen else "--check"
+                failures.append(f"{mode} {'missed' if changes else 'flagged'} the {label}")
+    return failures
+
+
+def _first_diff(actual: bytes, expected: bytes) -> str:
+    """Where two outputs first differ, as a suffix for a failure message."""
+    actual_lines = actual.split(b"\n")
+    expected_lines = expected.split(b"\n")
+    for number, (got, want) in enumerate(zip(actual_lines, expected_lines), 1):
+        if got != want:
+            return f" at line {number}: got {got!r}, expected {want!r}"
+    return f": got {len(actual_lines)} lines, expected {len(expected_lines)}"
+
+
+def update(names: List[str]) -> None:
+    """Rewrite the expected files of the named cases from the pipeline."""
+    for name in names:
+        with open(os.path.join(GOLDEN_DIR, name + EXPECTED_SUFFIX), "wb") as f:
+            f.write(pipeline(os.path.join(GOLDEN_DIR, name + INPUT_SUFFIX)))
+        print(f"✓ {name}{EXPECTED_SUFFIX} written")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare format_obsidian.py with the golden files in golden/")
+    parser.add_argument("cases", nargs="*", help="Case names (default: all)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--pipeline", action="store_true",
+                      help="Also compare the original sed/cat/awk/fix-tables.py pipeline with the expected files")
+    mode.add_argument("--update", action="store_true", help="Rewrite the expected files from the original pipeline")
+    args = parser.parse_args(argv)
+
+    names = args.cases or golden_cases()
+    unknown = [n for n in names if not os.path.exists(os.path.join(GOLDEN_DIR, n + INPUT_SUFFIX))]
+    if unknown:
+        print(f"Error: unknown case(s): {', '.join(unknown)}")
+        return 2
+    if (args.pipeline or args.update) and not all(shutil.which(tool) for tool in ("sed", "cat", "awk")):
+        print("Error: --pipeline and --update need sed, cat and awk")
+        return 2
+    if args.update:
+        update(names)
+        return 0
+
+    failed = 0
+    for name in names:
+        failures = check_case(name, args.pipeline)
+        if failures:
+            failed += 1
+            print(f"✗ {name}")
+            for failure in failures:
+                print(f"  {failure}")
+        else:
+            print(f"✓ {name}")
+    print(f"\n{len(names) - failed}/{len(names)} golden cases passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
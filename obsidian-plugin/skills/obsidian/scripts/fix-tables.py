@@ -1,43 +1,46 @@
 #!/usr/bin/env python3
 """
 fix-tables.py
-Removes blank lines between table rows in Markdown files
-Usage: python3 fix-tables.py <file.md>
+Removes blank lines between table rows in Markdown files and aligns table columns
+Usage: python3 fix-tables.py [--no-align] <file.md>
+
+Streams the file (see table_engine.py): memory is bounded by the largest
+table, not the document.
 """
 
+import argparse
+import os
+import shutil
 import sys
+import tempfile
 
+from table_engine import align_tables, drop_table_gaps
 
-def fix_tables(file_path):
-    """Remove blank lines between table rows."""
-    with open(file_path, "r") as f:
-        lines = f.readlines()
-
-    result = []
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-        result.append(line)
-
-        # If this is a table row and next line is blank and line after that is also a table row
-        if line.strip().startswith("|"):
-            # Skip blank lines between table rows
-            while i + 1 < len(lines) and lines[i + 1].strip() == "":
-                if i + 2 < len(lines) and lines[i + 2].strip().startswith("|"):
-                    i += 1  # Skip the blank line
-                else:
-                    break
 
-        i += 1
-
-    with open(file_path, "w") as f:
-        f.writelines(result)
+def fix_tables(file_path, align=True):
+    """Remove blank lines between table rows, then align each table's columns."""
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, tmp = tempfile.mkstemp(prefix=".fix-tables-", suffix=".md", dir=directory)
+    try:
+        with open(file_path, "r", encoding="utf-8") as src, os.fdopen(fd, "w", encoding="utf-8") as out:
+            lines = drop_table_gaps(src)
+            if align:
+                lines = align_tables(lines)
+            out.writelines(lines)
+        shutil.copymode(file_path, tmp)
+        os.replace(tmp, file_path)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python3 fix-tables.py <file.md>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Remove blank lines between table rows and align table columns")
+    parser.add_argument("file", metavar="file.md", help="Document to fix in place")
+    parser.add_argument("--no-align", action="store_true", help="Only remove blank lines between rows")
+    args = parser.parse_args()
 
-    file_path = sys.argv[1]
-    fix_tables(file_path)
+    if not os.path.isfile(args.file):
+        print(f"Error: File '{args.file}' not found")
+        sys.exit(1)
+    fix_tables(args.file, align=not args.no_align)
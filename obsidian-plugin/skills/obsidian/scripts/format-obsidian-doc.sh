@@ -2,6 +2,9 @@
 # format-obsidian-doc.sh
 # Master script to format Obsidian markdown documents
 # Usage: ./format-obsidian-doc.sh "path/to/file.md"
+#
+# Thin wrapper around format_obsidian.py, which applies whitespace squeezing,
+# Mermaid cleanup and table fixes in a single streaming pass.
 
 set -e
 
@@ -18,37 +21,7 @@ if [ ! -f "$FILE" ]; then
     exit 1
 fi
 
-echo "Formatting Obsidian document: $FILE"
-
 # Get script directory
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 
-# Create backup
-BACKUP="${FILE}.backup.$(date +%Y%m%d_%H%M%S)"
-cp "$FILE" "$BACKUP"
-echo "✓ Backup created: $BACKUP"
-
-# Step 1: Remove lines with only two spaces and squeeze blank lines
-echo "→ Removing excessive whitespace..."
-sed 's/^  $//' "$FILE" | cat -s > "${FILE}.tmp"
-mv "${FILE}.tmp" "$FILE"
-echo "✓ Whitespace cleaned"
-
-# Step 2: Clean Mermaid diagrams
-echo "→ Cleaning Mermaid diagrams..."
-awk -f "$SCRIPT_DIR/clean-mermaid.awk" "$FILE" > "${FILE}.tmp"
-mv "${FILE}.tmp" "$FILE"
-echo "✓ Mermaid diagrams cleaned"
-
-# Step 3: Fix tables
-echo "→ Fixing table formatting..."
-python3 "$SCRIPT_DIR/fix-tables.py" "$FILE"
-echo "✓ Tables fixed"
-
-# Get line count
-LINES=$(wc -l < "$FILE")
-echo ""
-echo "✓ Formatting complete!"
-echo "  File: $FILE"
-echo "  Lines: $LINES"
-echo "  Backup: $BACKUP"
+exec python3 "$SCRIPT_DIR/format_obsidian.py" --backup "$FILE"
@@ -0,0 +1,530 @@
+#!/usr/bin/env python3
+"""
+format_obsidian.py
+Formats Obsidian markdown documents in a single streaming pass.
+
+Produces the same output as the original shell pipeline
+
+    sed 's/^  $//' | cat -s | awk -f clean-mermaid.awk | python3 fix-tables.py
+
+but reads each file line by line through a chain of generators (one per
+step) and writes the result once, so memory use does not grow with the
+document and no intermediate files or processes are involved.
+
+--vault DIR formats every note in a vault on a process pool. A cache in
+<vault>/.obsidian-format/cache.json remembers each note's stat and the hash
+of its formatted content, so unchanged notes are skipped after one stat()
+and notes whose content already is the formatted result are not rewritten.
+
+--align-tables additionally pads table columns (table_engine.py); it is off
+by default so the output stays that of the original pipeline.
+
+Mermaid blocks in the formatted result are checked with mermaid_lint.py and
+syntax errors are reported with their line and column (the file is still
+formatted; the vault cache remembers each note's errors).
+
+--backup keeps the previous content of every changed note in the vault's
+content-addressed backup store (see backup_store.py for list/restore/gc).
+
+--check writes nothing: each file is streamed through the same chain and
+compared line by line, stopping at the first line that would change. Exit
+status 1 means some file needs formatting (for pre-commit hooks). With
+--mmap, files are first scanned as raw bytes for what the chain can change
+(a line of two spaces, \r, a missing final newline, double blank lines,
+blank lines inside Mermaid blocks, blank lines between table rows, and any
+table with --align-tables); files without any are passed without decoding.
+With --vault, notes whose stat matches the cache are passed as well.
+
+Usage:
+    python3 format_obsidian.py [--backup] [--align-tables] <file.md> [<file.md> ...]
+    python3 format_obsidian.py --vault DIR [--jobs N] [--backup] [--align-tables] [--no-cache]
+    python3 format_obsidian.py --check [--mmap] [--align-tables] (<file.md> ... | --vault DIR)
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import re
+import shutil
+import sys
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, Optional
+
+from backup_store import BackupStore, file_hash, find_vault_root
+from mermaid_lint import lint_lines
+from table_engine import align_tables, drop_table_gaps
+
+# [[:space:]] in awk's C locale
+AWK_SPACE = " \t\n\r\v\f"
+# Bump when formatting output or the cached fields change, so old cache entries are dropped
+FORMAT_VERSION = 3
+STATE_DIR_NAME = ".obsidian-format"
+CACHE_FILENAME = "cache.json"
+
+# Byte patterns for the --mmap prescreen. They may over-match (then the file is
+# streamed), never under-match. Whitespace is widened to everything str.strip()
+# could remove, including any non-ASCII byte. Each starts with a literal so the
+# regex engine can skip ahead instead of trying every position.
+_WS = rb"[\t\x0b\x0c\r\x1c-\x20\x80-\xff]"
+BLANK_BEFORE_ROW = re.compile(rb"\n" + _WS + rb"*\n" + _WS + rb"*\|")
+TABLE_ROW = re.compile(_WS + rb"*\|")
+NEWLINE_ROW = re.compile(rb"\n" + _WS + rb"*\|")
+MERMAID_CLOSE = re.compile(rb"\n```(?:\n|\Z)")
+MERMAID_BLANK = re.compile(rb"\n[ \t\x0b\x0c]*\n")
+
+
+def strip_two_space_lines(lines: Iterable[str]) -> Iterator[str]:
+    """sed 's/^  $//' — a line of exactly two spaces becomes empty."""
+    for line in lines:
+        if line == "  \n":
+            yield "\n"
+        elif line == "  ":
+            yield ""
+        else:
+            yield line
+
+
+def squeeze_blank_lines(lines: Iterable[str]) -> Iterator[str]:
+    """cat -s — runs of empty lines become one."""
+    previous_blank = False
+    for line in lines:
+        blank = line == "\n"
+        if not (blank and previous_blank):
+            yield line
+        previous_blank = blank
+
+
+def clean_mermaid(lines: Iterable[str]) -> Iterator[str]:
+    """clean-mermaid.awk — drop blank lines inside ```mermaid blocks.
+
+    Like awk, every output line ends with a newline.
+    """
+    in_mermaid = False
+    for line in lines:
+        if not line:
+            continue
+        record = line[:-1] if line.endswith("\n") else line
+        if record.startswith("```mermaid"):
+            in_mermaid = True
+        elif record == "```" and in_mermaid:
+            in_mermaid = False
+        elif in_mermaid and not record.strip(AWK_SPACE):
+            continue
+        yield record + "\n"
+
+
+def universal_newlines(lines: Iterable[str]) -> Iterator[str]:
+    """Re-split lines the way fix-tables.py reads them (text mode: \\r and \\r\\n end lines)."""
+    for line in lines:
+        if "\r" not in line:
+            yield line
+            continue
+        parts = line.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+        for part in parts[:-1]:
+            yield part + "\n"
+
+
+def format_lines(lines: Iterable[str], align: bool = False) -> Iterator[str]:
+    """The full formatting chain over lines read with newline="\\n"."""
+    lines = strip_two_space_lines(lines)
+    lines = squeeze_blank_lines(lines)
+    lines = clean_mermaid(lines)
+    lines = universal_newlines(lines)
+    lines = drop_table_gaps(lines)
+    return align_tables(lines) if align else lines
+
+
+def _hashed(lines: Iterable[str], digest) -> Iterator[str]:
+    for line in lines:
+        digest.update(line.encode("utf-8"))
+        yield line
+
+
+def format_file(path: str, backup: Optional[BackupStore] = None, align: bool = False) -> dict:
+    """Format a file in place (atomically) if formatting changes it.
+
+    Returns lines, changed, bytes_before, bytes_after, hash (sha256 of the
+    formatted content) and mermaid_errors (line, column, message, severity for
+    each Mermaid syntax error or warning in the formatted content). With a backup store, a
+    changed file's previous content is saved there first (as "backup": its hash).
+    A file modified while it was being formatted is left alone (OSError).
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    before = os.stat(path)
+    fd, tmp = tempfile.mkstemp(prefix=".format-", suffix=".md", dir=directory)
+    source_hash = hashlib.sha256()
+    output_hash = hashlib.sha256()
+    count = 0
+    has_mermaid = False
+    try:
+        with open(path, "r", encoding="utf-8", newline="\n") as src, \
+                os.fdopen(fd, "w", encoding="utf-8", newline="") as out:
+            for line in _hashed(format_lines(_hashed(src, source_hash), align), output_hash):
+                out.write(line)
+                count += 1
+                has_mermaid = has_mermaid or "mermaid" in line
+        changed = source_hash.digest() != output_hash.digest()
+        result = {
+            "lines": count,
+            "changed": changed,
+            "bytes_before": before.st_size,
+            "bytes_after": os.path.getsize(tmp),
+            "hash": output_hash.hexdigest(),
+            "mermaid_errors": [],
+        }
+        if has_mermaid:
+            # Second streaming read of the result; only notes with diagrams pay for it
+            with open(tmp, "r", encoding="utf-8", newline="\n") as formatted:
+                result["mermaid_errors"] = [e for d in lint_lines(formatted) for e in d["errors"]]
+        if changed:
+            now = os.stat(path)
+            if (now.st_mtime_ns, now.st_size) != (before.st_mtime_ns, before.st_size):
+                raise OSError("file changed while it was being formatted")
+            if backup is not None:
+                result["backup"] = backup.save(path, source_hash.hexdigest())["hash"]
+            shutil.copymode(path, tmp)
+            os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+    return result
+
+
+def first_difference(path: str, align: bool = False) -> Optional[int]:
+    """Line number of the first line formatting would change, or None if path is already formatted.
+
+    Reads only up to that line and writes nothing. Source lines wait in a
+    queue until the chain emits the line they are compared with, so memory is
+    bounded by the chain's lookahead (one table with align).
+    """
+    pending = deque()
+
+    def recorded(lines: Iterable[str]) -> Iterator[str]:
+        for line in lines:
+            pending.append(line)
+            yield line
+
+    number = 0
+    with open(path, "r", encoding="utf-8", newline="\n") as src:
+        for line in format_lines(recorded(src), align):
+            number += 1
+            if not pending or pending.popleft() != line:
+                return number
+    return number + 1 if pending else None
+
+
+def may_change(path: str, align: bool = False) -> bool:
+    """mmap prescreen: False only if formatting is certain to leave path unchanged."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return False
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            # Lines of two spaces, \r, a missing final newline, or two blank lines in a row
+            if data[-1:] != b"\n" or data.find(b"\r") >= 0 or data.find(b"\n  \n") >= 0 \
+                    or data.find(b"\n\n\n") >= 0 or data[:3] == b"  \n" or data[:2] == b"\n\n":
+                return True
+            if align and (TABLE_ROW.match(data) or NEWLINE_ROW.search(data)):
+                return True
+            # A blank line between two table rows
+            for match in BLANK_BEFORE_ROW.finditer(data):
+                start = data.rfind(b"\n", 0, match.start()) + 1
+                if TABLE_ROW.match(data, start, match.start()):
+                    return True
+            # A blank line inside a ```mermaid block
+            start = data.find(b"```mermaid")
+            while start >= 0:
+                if start == 0 or data[start - 1] == 0x0a:
+                    body = data.find(b"\n", start)
+                    close = MERMAID_CLOSE.search(data, body)
+                    end = close.start() + 1 if close else len(data)
+                    if MERMAID_BLANK.search(data, body, end):
+                        return True
+                    if not close:
+                        break
+                    start = data.find(b"```mermaid", end)
+                else:
+                    start = data.find(b"```mermaid", start + 1)
+    return False
+
+
+def check_file(path: str, align: bool = False, prescreen: bool = False) -> Optional[int]:
+    """first_difference(), skipped when the prescreen already proves the file formatted."""
+    if prescreen and not may_change(path, align):
+        return None
+    return first_difference(path, align)
+
+
+def vault_notes(vault: str) -> Iterator[str]:
+    """Relative paths of the vault's .md notes, skipping hidden dirs (.obsidian, .trash, .git...)."""
+    for dirpath, dirnames, filenames in os.walk(vault):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            if name.endswith(".md") and not os.path.islink(path):
+                yield os.path.relpath(path, vault)
+
+
+def load_cache(vault: str, options: str = "") -> dict:
+    """{relative path: {mtime_ns, size, hash}}, empty if missing or from another FORMAT_VERSION/options."""
+    try:
+        with open(os.path.join(vault, STATE_DIR_NAME, CACHE_FILENAME), encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != FORMAT_VERSION or data.get("options", "") != options:
+        return {}
+    return data.get("files", {})
+
+
+def save_cache(vault: str, files: dict, options: str = "") -> None:
+    state_dir = os.path.join(vault, STATE_DIR_NAME)
+    os.makedirs(state_dir, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".cache-", dir=state_dir)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"version": FORMAT_VERSION, "options": options, "files": files}, f)
+        os.replace(tmp, os.path.join(state_dir, CACHE_FILENAME))
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+
+
+def format_note(vault: str, rel: str, known: Optional[dict], backup: bool, align: bool = False) -> dict:
+    """Pool worker: format one note unless its content already is the formatted result (known cache entry)."""
+    path = os.path.join(vault, rel)
+    result = {"path": rel}
+    try:
+        if known and known.get("hash") and file_hash(path) == known["hash"]:
+            result.update(changed=False, hash=known["hash"], mermaid_errors=known.get("mermaid_errors", []))
+        else:
+            result.update(format_file(path, BackupStore(vault) if backup else None, align))
+        stat = os.stat(path)
+        result.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+    except (OSError, UnicodeDecodeError) as e:
+        result["error"] = str(e)
+    return result
+
+
+def format_vault(vault: str, jobs: Optional[int] = None, backup: bool = False, use_cache: bool = True,
+                 align: bool = False) -> dict:
+    """Format every note in a vault; returns the summary."""
+    options = "align-tables" if align else ""
+    cache = load_cache(vault, options) if use_cache else {}
+    notes = list(vault_notes(vault))
+    todo = []
+    skipped = 0
+    files = {}
+    mermaid_errors = []
+    for rel in notes:
+        entry = cache.get(rel)
+        if entry:
+            try:
+                stat = os.stat(os.path.join(vault, rel))
+            except OSError:
+                continue
+            if (stat.st_mtime_ns, stat.st_size) == (entry.get("mtime_ns"), entry.get("size")):
+                files[rel] = entry
+                skipped += 1
+                mermaid_errors += [dict(e, path=rel) for e in entry.get("mermaid_errors", [])]
+                continue
+        todo.append((rel, entry))
+
+    if jobs == 1 or len(todo) < 2:
+        results = [format_note(vault, rel, known, backup, align) for rel, known in todo]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(format_note, [vault] * len(todo), [rel for rel, _ in todo],
+                                    [known for _, known in todo], [backup] * len(todo), [align] * len(todo),
+                                    chunksize=max(1, len(todo) // ((jobs or os.cpu_count() or 1) * 4))))
+
+    changed = []
+    errors = []
+    for result in results:
+        if "error" in result:
+            errors.append({"path": result["path"], "error": result["error"]})
+            continue
+        files[result["path"]] = {k: result[k] for k in ("mtime_ns", "size", "hash")}
+        if result["mermaid_errors"]:
+            files[result["path"]]["mermaid_errors"] = result["mermaid_errors"]
+            mermaid_errors += [dict(e, path=result["path"]) for e in result["mermaid_errors"]]
+        if result["changed"]:
+            changed.append(result)
+    save_cache(vault, files, options)
+
+    return {
+        "notes": len(notes),
+        "changed": changed,
+        "unchanged": len(notes) - len(changed) - len(errors),
+        "skipped_by_cache": skipped,
+        "bytes_saved": sum(r["bytes_before"] - r["bytes_after"] for r in changed),
+        "errors": errors,
+        "mermaid_errors": sorted(mermaid_errors, key=lambda e: (e["path"], e["line"], e["column"])),
+    }
+
+
+def check_vault(vault: str, align: bool = False, prescreen: bool = False, use_cache: bool = True) -> dict:
+    """--check over a vault: notes that need formatting, with the first line that changes.
+
+    Notes whose stat matches the cache are taken as formatted. The cache is
+    only read, never written.
+    """
+    cache = load_cache(vault, "align-tables" if align else "") if use_cache else {}
+    notes = list(vault_notes(vault))
+    unformatted = []
+    errors = []
+    skipped = 0
+    for rel in notes:
+        path = os.path.join(vault, rel)
+        try:
+            entry = cache.get(rel)
+            if entry:
+                stat = os.stat(path)
+                if (stat.st_mtime_ns, stat.st_size) == (entry.get("mtime_ns"), entry.get("size")):
+                    skipped += 1
+                    continue
+            line = check_file(path, align, prescreen)
+        except (OSError, UnicodeDecodeError, ValueError) as e:
+            errors.append({"path": rel, "error": str(e)})
+            continue
+        if line is not None:
+            unformatted.append({"path": rel, "line": line})
+    return {"notes": len(notes), "unformatted": unformatted, "skipped_by_cache": skipped, "errors": errors}
+
+
+def print_check_results(unformatted: list, checked: int, errors: list) -> None:
+    for result in unformatted:
+        print(f"✗ {result['path']}: needs formatting (first change at line {result['line']})")
+    for error in errors:
+        print(f"Error: could not check '{error['path']}': {error['error']}")
+    if unformatted:
+        print(f"{len(unformatted)} of {checked} files would be reformatted")
+    else:
+        print(f"✓ {checked - len(errors)} files already formatted")
+
+
+def print_vault_summary(vault: str, summary: dict) -> None:
+    changed = summary["changed"]
+    print(f"Formatting Obsidian vault: {vault}")
+    print(f"✓ {summary['notes']} notes: {len(changed)} changed, {summary['unchanged']} unchanged "
+          f"({summary['skipped_by_cache']} skipped via cache), {len(summary['errors'])} errors")
+    print(f"  Bytes saved: {summary['bytes_saved']}")
+    if changed:
+        print("  Changed:")
+        for result in changed:
+            line = f"    - {result['path']} ({result['bytes_before']} → {result['bytes_after']} bytes)"
+            if result.get("backup"):
+                line += f", backup {result['backup'][:12]}"
+            print(line)
+    if summary["errors"]:
+        print("  Errors:")
+        for error in summary["errors"]:
+            print(f"    - {error['path']}: {error['error']}")
+    if summary["mermaid_errors"]:
+        print("  Mermaid syntax errors:")
+        for error in summary["mermaid_errors"]:
+            label = "warning: " if error["severity"] == "warning" else ""
+            print(f"    - {error['path']}:{error['line']}:{error['column']}: {label}{error['message']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Format Obsidian markdown documents in one pass")
+    parser.add_argument("files", nargs="*", metavar="file.md", help="Documents to format in place")
+    parser.add_argument("--backup", action="store_true",
+                        help="Save each changed file's previous content in the content-addressed store "
+                             "under <vault>/.obsidian-format/backups/ (see backup_store.py)")
+    parser.add_argument("--vault", metavar="DIR", help="Format every note in the vault, skipping unchanged ones")
+    parser.add_argument("--jobs", type=int, help="Worker processes for --vault (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="With --vault, ignore the skip cache")
+    parser.add_argument("--align-tables", action="store_true", help="Also pad table columns to equal width")
+    parser.add_argument("--check", action="store_true",
+                        help="Write nothing; exit 1 if any file needs formatting")
+    parser.add_argument("--mmap", action="store_true", help="With --check, prescreen files without decoding them")
+    args = parser.parse_args()
+
+    if args.mmap and not args.check:
+        parser.error("--mmap only applies to --check")
+    if args.check and args.backup:
+        parser.error("--check writes nothing, so --backup does not apply")
+
+    if args.check:
+        if args.vault:
+            if args.files:
+                parser.error("--vault cannot be combined with file arguments")
+            if not os.path.isdir(args.vault):
+                print(f"Error: Vault '{args.vault}' not found")
+                return 1
+            summary = check_vault(args.vault, args.align_tables, args.mmap, not args.no_cache)
+            print_check_results(summary["unformatted"], summary["notes"], summary["errors"])
+            return 1 if summary["unformatted"] or summary["errors"] else 0
+        if not args.files:
+            parser.error("give one or more files, or --vault DIR")
+        unformatted = []
+        errors = []
+        for path in args.files:
+            try:
+                line = check_file(path, args.align_tables, args.mmap)
+            except (OSError, UnicodeDecodeError, ValueError) as e:
+                errors.append({"path": path, "error": str(e)})
+                continue
+            if line is not None:
+                unformatted.append({"path": path, "line": line})
+        print_check_results(unformatted, len(args.files), errors)
+        return 1 if unformatted or errors else 0
+
+    if args.vault:
+        if args.files:
+            parser.error("--vault cannot be combined with file arguments")
+        if not os.path.isdir(args.vault):
+            print(f"Error: Vault '{args.vault}' not found")
+            return 1
+        if args.jobs is not None and args.jobs < 1:
+            parser.error("--jobs must be at least 1")
+        summary = format_vault(args.vault, args.jobs, args.backup, not args.no_cache, args.align_tables)
+        print_vault_summary(args.vault, summary)
+        return 1 if summary["errors"] else 0
+    if not args.files:
+        parser.error("give one or more files, or --vault DIR")
+
+    status = 0
+    for path in args.files:
+        if not os.path.isfile(path):
+            print(f"Error: File '{path}' not found")
+            status = 1
+            continue
+
+        print(f"Formatting Obsidian document: {path}")
+        store = BackupStore(find_vault_root(path)) if args.backup else None
+        try:
+            result = format_file(path, store, args.align_tables)
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"Error: could not format '{path}': {e}")
+            status = 1
+            continue
+
+        if result["changed"]:
+            print("✓ Whitespace cleaned, Mermaid diagrams cleaned, tables fixed")
+        else:
+            print("✓ Already formatted — file left unchanged")
+        print("")
+        print("✓ Formatting complete!")
+        print(f"  File: {path}")
+        print(f"  Lines: {result['lines']}")
+        if result.get("backup"):
+            print(f"  Backup: {result['backup'][:12]} in {store.dir}")
+            print(f"  Restore: python3 {os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backup_store.py')} "
+                  f"restore \"{path}\"")
+        if result["mermaid_errors"]:
+            print("⚠ Mermaid syntax errors:")
+            for error in result["mermaid_errors"]:
+                label = "warning: " if error["severity"] == "warning" else ""
+                print(f"    line {error['line']}, column {error['column']}: {label}{error['message']}")
+
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
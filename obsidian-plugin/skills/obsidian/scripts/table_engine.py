@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+table_engine.py
+Streaming Markdown table normalizer shared by fix-tables.py and format_obsidian.py.
+
+Lines pass straight through until a table starts; only the current table
+(header, delimiter row, body rows) is buffered. Each buffered table is read
+twice — once to measure column widths, once to emit aligned rows — so
+memory is bounded by the largest table, not the file.
+
+Cells are split on unescaped pipes only, so `\\|` (e.g. [[Note\\|alias]])
+stays inside its cell. Column alignment markers (:---, :---:, ---:) are kept
+and applied when padding. Tables inside fenced code blocks are left alone.
+"""
+
+import re
+import unicodedata
+from typing import Iterable, Iterator, List, Optional
+
+DELIMITER_CELL = re.compile(r"^:?-+:?$")
+FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+MIN_WIDTH = 3
+
+
+def drop_table_gaps(lines: Iterable[str]) -> Iterator[str]:
+    """Drop a single blank line between two table rows (the original fix-tables.py rule)."""
+    held = None
+    previous_row = False
+    for line in lines:
+        stripped = line.strip()
+        row = stripped.startswith("|")
+        if held is not None:
+            if not row:
+                yield held
+            held = None
+        elif previous_row and not stripped:
+            held = line
+            previous_row = False
+            continue
+        yield line
+        previous_row = row
+    if held is not None:
+        yield held
+
+
+def split_row(line: str) -> List[str]:
+    """Cells of a table row, split on unescaped pipes and stripped."""
+    text = line.strip()
+    if text.startswith("|"):
+        text = text[1:]
+    if "\\" not in text:
+        cells = [cell.strip() for cell in text.split("|")]
+    else:
+        cells = []
+        current = []
+        escaped = False
+        for ch in text:
+            if escaped:
+                current.append(ch)
+                escaped = False
+            elif ch == "\\":
+                current.append(ch)
+                escaped = True
+            elif ch == "|":
+                cells.append("".join(current).strip())
+                current = []
+            else:
+                current.append(ch)
+        cells.append("".join(current).strip())
+    # A trailing unescaped pipe closes the row rather than opening an empty cell
+    if len(cells) > 1 and not cells[-1]:
+        cells.pop()
+    return cells
+
+
+def column_alignment(cell: str) -> Optional[str]:
+    """"left", "right", "center" or None for a delimiter cell."""
+    if cell.startswith(":") and cell.endswith(":") and len(cell) > 1:
+        return "center"
+    if cell.endswith(":"):
+        return "right"
+    if cell.startswith(":"):
+        return "left"
+    return None
+
+
+def display_width(text: str) -> int:
+    """Columns text occupies in a monospace editor (wide CJK = 2, combining marks = 0)."""
+    if text.isascii():
+        return len(text)
+    width = 0
+    for ch in text:
+        if unicodedata.combining(ch):
+            continue
+        width += 2 if unicodedata.east_asian_width(ch) in "WF" else 1
+    return width
+
+
+def pad(cell: str, width: int, alignment: Optional[str]) -> str:
+    space = width - display_width(cell)
+    if alignment == "right":
+        return " " * space + cell
+    if alignment == "center":
+        return " " * (space // 2) + cell + " " * (space - space // 2)
+    return cell + " " * space
+
+
+def delimiter(width: int, alignment: Optional[str]) -> str:
+    if alignment == "center":
+        return ":" + "-" * (width - 2) + ":"
+    if alignment == "right":
+        return "-" * (width - 1) + ":"
+    if alignment == "left":
+        return ":" + "-" * (width - 1)
+    return "-" * width
+
+
+def is_delimiter_row(line: str) -> bool:
+    cells = split_row(line)
+    return bool(cells) and all(DELIMITER_CELL.match(c) for c in cells)
+
+
+def format_table(block: List[str]) -> Iterator[str]:
+    """Aligned rows for a buffered table (header, delimiter, body).
+
+    A table whose delimiter row does not have one cell per header cell is
+    not a table in GFM/Obsidian and is returned unchanged.
+    """
+    header = split_row(block[0])
+    markers = split_row(block[1])
+    if len(markers) != len(header):
+        yield from block
+        return
+    columns = len(header)
+    alignments = [column_alignment(m) for m in markers]
+
+    # Pass 1: column widths
+    widths = [MIN_WIDTH] * columns
+    for index, line in enumerate(block):
+        if index == 1:
+            continue
+        for column, cell in enumerate(split_row(line)[:columns]):
+            widths[column] = max(widths[column], display_width(cell))
+
+    # Pass 2: emit, re-splitting each row instead of keeping every cell in memory
+    indent = block[0][:len(block[0]) - len(block[0].lstrip())]
+    for index, line in enumerate(block):
+        ending = line[len(line.rstrip("\r\n")):]
+        if index == 1:
+            cells = [delimiter(widths[c], alignments[c]) for c in range(columns)]
+        else:
+            cells = split_row(line)
+            cells += [""] * (columns - len(cells))
+            # Cells past the header are kept as they are (renderers ignore them)
+            cells = [pad(cell, widths[c], alignments[c]) if c < columns else cell for c, cell in enumerate(cells)]
+        yield indent + "| " + " | ".join(cells) + " |" + ending
+
+
+def align_tables(lines: Iterable[str]) -> Iterator[str]:
+    """Stream lines, replacing each table outside code fences with its aligned form."""
+    block = []
+    fence = None
+    for line in lines:
+        stripped = line.strip()
+        if block:
+            if stripped.startswith("|") and (len(block) > 1 or is_delimiter_row(stripped)):
+                block.append(line)
+                continue
+            yield from format_table(block) if len(block) > 1 else block
+            block = []
+
+        if fence:
+            match = FENCE.match(line)
+            if match and match.group(1)[0] == fence[0] and len(match.group(1)) >= len(fence) \
+                    and not line[match.end():].strip():
+                fence = None
+            yield line
+            continue
+        match = FENCE.match(line)
+        if match:
+            fence = match.group(1)
+        elif stripped.startswith("|"):
+            block = [line]
+            continue
+        yield line
+
+    if block:
+        yield from format_table(block) if len(block) > 1 else block
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for fetch_git_deps.py against local file:// repositories.
+
+Builds synthetic remotes (commit history, application code, a large unrelated
+blob and a set of .project-context/ files), points a scratch project at them
+and runs fetch_git_deps.cmd_fetch in four scenarios:
+
+    cold         empty mirror and project cache
+    warm         nothing changed upstream (one ls-remote per dep)
+    force        warm mirror, every dep re-extracted (--force)
+    incremental  one new commit per remote touching app code and brief.md
+
+A separate transitive check fetches a two-level dependency chain with
+--depth 2 and then the default depth 1, under a "deps_cache": {"undeclared":
+true} policy; the level-2 cache must survive the shallower fetch's eviction.
+
+For each scenario it reports wall time, per-phase timings summed over deps,
+objects/bytes received, bytes written into .deps-cache/, mirror size on disk, and how many
+application blobs reached a mirror — the partial fetch should keep that at 0.
+Nothing touches the network or the user's mirror cache.
+
+Usage:
+    python bench_fetch.py [--deps N[,N...]] [--history N] [--app-files N] [--app-size KB]
+                          [--large-blob MB] [--context-files N] [--jobs N] [--lazy] [--keep] [--check]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from stat import S_ISREG
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import fetch_git_deps  # noqa: E402
+
+CONTEXT_NAMES = ["brief.md", "architecture.md", "state.md", "progress.md", "patterns.md"]
+GIT_ENV = {
+    "GIT_AUTHOR_NAME": "bench",
+    "GIT_AUTHOR_EMAIL": "bench@example.com",
+    "GIT_COMMITTER_NAME": "bench",
+    "GIT_COMMITTER_EMAIL": "bench@example.com",
+}
+
+
+def git(args, cwd=None):
+    """Run git for fixture setup; raises on failure."""
+    result = subprocess.run(
+        ["git"] + args, cwd=cwd, capture_output=True, text=True, env={**os.environ, **GIT_ENV}
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"git {' '.join(args)} failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+def _text(size):
+    """About `size` bytes of incompressible text."""
+    return "\n".join(os.urandom(32).hex() for _ in range(max(1, size // 65))) + "\n"
+
+
+def create_remote(root, index, opts):
+    """Source repo with history plus a filter-enabled bare copy; returns the bare path."""
+    src = root / f"src{index}"
+    context = src / ".project-context"
+    context.mkdir(parents=True)
+    git(["init", "-q", "-b", "main"], cwd=src)
+
+    for i in range(opts.app_files):
+        path = src / "app" / f"module{i}.py"
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(_text(opts.app_size * 1024))
+    if opts.large_blob:
+        (src / "assets").mkdir()
+        (src / "assets" / "large.bin").write_bytes(os.urandom(opts.large_blob * 1024 * 1024))
+    for i in range(opts.context_files):
+        name = CONTEXT_NAMES[i] if i < len(CONTEXT_NAMES) else f"notes{i}.md"
+        (context / name).write_text(f"# {name}\n\n" + _text(2048))
+    git(["add", "-A"], cwd=src)
+    git(["commit", "-qm", "initial"], cwd=src)
+
+    for i in range(1, opts.history):
+        (src / "app" / f"module{i % max(1, opts.app_files)}.py").write_text(_text(opts.app_size * 1024))
+        git(["add", "-A"], cwd=src)
+        git(["commit", "-qm", f"change {i}"], cwd=src)
+
+    bare = root / f"remote{index}.git"
+    git(["clone", "-q", "--bare", str(src), str(bare)])
+    # Hosted remotes allow partial clone; a local bare repo has to opt in
+    git(["config", "uploadpack.allowFilter", "true"], cwd=bare)
+    git(["config", "uploadpack.allowAnySHA1InWant", "true"], cwd=bare)
+    return bare
+
+
+def advance_remote(root, index):
+    """Push one new commit that changes app code and brief.md."""
+    src = root / f"src{index}"
+    (src / "app").mkdir(exist_ok=True)
+    (src / "app" / "module0.py").write_text(_text(4096))
+    (src / ".project-context" / "brief.md").write_text("# brief.md\n\n" + _text(2048))
+    git(["add", "-A"], cwd=src)
+    git(["commit", "-qm", "advance"], cwd=src)
+    git(["push", "-q", str(root / f"remote{index}.git"), "HEAD:main"], cwd=src)
+
+
+def app_blobs(root, index):
+    """Oids of every blob outside .project-context/ in a source repo's history."""
+    out = git(["rev-list", "--objects", "--all"], cwd=root / f"src{index}")
+    oids = set()
+    for line in out.splitlines():
+        oid, _, path = line.partition(" ")
+        if path and not path.startswith(".project-context") and "." in Path(path).name:
+            oids.add(oid)
+    return oids
+
+
+def present_blobs(mirror):
+    """Oids of blobs actually stored in a mirror (never triggers a lazy fetch)."""
+    out = git(["cat-file", "--batch-all-objects", "--batch-check=%(objecttype) %(objectname)"], cwd=mirror)
+    return {line.split()[1] for line in out.splitlines() if line.startswith("blob ")}
+
+
+def disk_usage(path):
+    """Bytes of regular files under path, symlinks not followed, hardlinks counted once."""
+    total = 0
+    seen = set()
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            st = os.lstat(os.path.join(dirpath, name))
+            if S_ISREG(st.st_mode) and (st.st_dev, st.st_ino) not in seen:
+                seen.add((st.st_dev, st.st_ino))
+                total += st.st_size
+    return total
+
+
+def create_context_remote(root, name, upstream=None):
+    """Small filter-enabled bare repo with brief.md and an optional upstream git dep; returns its path."""
+    src = root / f"src-{name}"
+    context = src / ".project-context"
+    context.mkdir(parents=True)
+    (context / "brief.md").write_text(f"# {name}\n")
+    if upstream:
+        deps = {"upstream": [{"project": upstream.stem, "git": upstream.as_uri()}], "downstream": []}
+        (context / "dependencies.json").write_text(json.dumps(deps))
+    git(["init", "-q", "-b", "main"], cwd=src)
+    git(["add", "-A"], cwd=src)
+    git(["commit", "-qm", "initial"], cwd=src)
+    bare = root / f"{name}.git"
+    git(["clone", "-q", "--bare", str(src), str(bare)])
+    git(["config", "uploadpack.allowFilter", "true"], cwd=bare)
+    return bare
+
+
+def check_transitive(root, jobs):
+    """Fetch at depth 2, then depth 1 with undeclared eviction; True if the level-2 cache survived."""
+    base = create_context_remote(root, "base")
+    lib = create_context_remote(root, "lib", upstream=base)
+    project = root / "project-transitive"
+    context = project / ".project-context"
+    context.mkdir(parents=True)
+    deps = {"upstream": [{"project": "lib", "git": lib.as_uri()}], "downstream": []}
+    (context / "dependencies.json").write_text(json.dumps(deps))
+    (context / fetch_git_deps.CONFIG_FILENAME).write_text(json.dumps({"deps_cache": {"undeclared": True}}))
+    os.environ[fetch_git_deps.MIRROR_ROOT_ENV] = str(root / "mirrors-transitive")
+
+    cache_dir = context / fetch_git_deps.CACHE_DIR_NAME
+    run_fetch(project, jobs, depth=2)
+    fetched = (cache_dir / "base").exists()
+    run_fetch(project, jobs)
+    return {"fetched_at_depth_2": fetched, "kept_after_depth_1": (cache_dir / "base").exists()}
+
+
+def run_fetch(project_dir, jobs, force=False, lazy=None, depth=1):
+    """Run cmd_fetch in-process; returns (wall seconds, parsed JSON output)."""
+    args = argparse.Namespace(
+        dir=str(project_dir), project=None, jobs=jobs, per_host=jobs, deadline=None,
+        force=force, plan=None, depth=depth, lazy=lazy,
+    )
+    out = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(out):
+        fetch_git_deps.cmd_fetch(args)
+    return time.perf_counter() - start, json.loads(out.getvalue())
+
+
+def summarize(wall, output, mirrors_dir, cache_dir, leaked):
+    """One scenario's numbers."""
+    phases = {}
+    statuses = {}
+    for result in output.get("results", []):
+        statuses[result["status"]] = statuses.get(result["status"], 0) + 1
+        for phase, seconds in result.get("timings", {}).items():
+            phases[phase] = round(phases.get(phase, 0.0) + seconds, 4)
+    return {
+        "wall_seconds": round(wall, 4),
+        "statuses": statuses,
+        "phase_seconds": phases,
+        "bytes_written": sum(r.get("bytes_written", 0) for r in output.get("results", [])),
+        "bytes_received": sum(r.get("bytes_received", 0) for r in output.get("results", [])),
+        "objects_received": sum(r.get("objects_received", 0) for r in output.get("results", [])),
+        "cache_bytes": disk_usage(cache_dir),
+        "mirror_bytes": disk_usage(mirrors_dir),
+        "app_blobs_in_mirrors": leaked,
+    }
+
+
+def bench(root, dep_count, opts, remotes, leak_sets):
+    """All scenarios for the first dep_count remotes, with a fresh mirror root."""
+    project = root / f"project-{dep_count}"
+    (project / ".project-context").mkdir(parents=True)
+    deps = {
+        "upstream": [
+            {"project": f"svc{i}", "git": remotes[i].as_uri(), "what": "API"} for i in range(dep_count)
+        ],
+        "downstream": [],
+    }
+    (project / ".project-context" / "dependencies.json").write_text(json.dumps(deps))
+
+    mirrors_root = root / f"mirrors-{dep_count}"
+    os.environ[fetch_git_deps.MIRROR_ROOT_ENV] = str(mirrors_root)
+    mirrors_dir = mirrors_root / "mirrors"
+    cache_dir = project / ".project-context" / fetch_git_deps.CACHE_DIR_NAME
+
+    def leaked():
+        count = 0
+        for i in range(dep_count):
+            mirror = fetch_git_deps.mirror_path(remotes[i].as_uri())
+            if mirror.is_dir():
+                count += len(present_blobs(mirror) & leak_sets[i])
+        return count
+
+    scenarios = {}
+    wall, output = run_fetch(project, opts.jobs, lazy=opts.lazy)
+    scenarios["cold"] = summarize(wall, output, mirrors_dir, cache_dir, leaked())
+    wall, output = run_fetch(project, opts.jobs, lazy=opts.lazy)
+    scenarios["warm"] = summarize(wall, output, mirrors_dir, cache_dir, leaked())
+    wall, output = run_fetch(project, opts.jobs, force=True, lazy=opts.lazy)
+    scenarios["force"] = summarize(wall, output, mirrors_dir, cache_dir, leaked())
+
+    before = disk_usage(mirrors_dir)
+    for i in range(dep_count):
+        advance_remote(root, i)
+        leak_sets[i] |= app_blobs(root, i)
+    wall, output = run_fetch(project, opts.jobs, lazy=opts.lazy)
+    scenarios["incremental"] = summarize(wall, output, mirrors_dir, cache_dir, leaked())
+    scenarios["incremental"]["mirror_growth_bytes"] = scenarios["incremental"]["mirror_bytes"] - before
+
+    return scenarios
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fetch_git_deps.py against local file:// remotes")
+    parser.add_argument("--deps", default="1,4,8", help="Comma-separated dependency counts to run")
+    parser.add_argument("--history", type=int, default=20, help="Commits per remote")
+    parser.add_argument("--app-files", type=int, default=20, help="Application files per remote")
+    parser.add_argument("--app-size", type=int, default=32, help="Size of each application file (KB)")
+    parser.add_argument("--large-blob", type=int, default=8, help="Size of an unrelated binary blob (MB, 0 = none)")
+    parser.add_argument("--context-files", type=int, default=5, help="Files in each remote .project-context/")
+    parser.add_argument("--jobs", type=int, default=fetch_git_deps.DEFAULT_JOBS, help="fetch --jobs")
+    parser.add_argument("--lazy", action="store_const", const=True, help="Run every fetch with --lazy")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch directory and print its path")
+    parser.add_argument("--check", action="store_true",
+                        help="Exit 1 if any application blob reached a mirror or a transitive cache was evicted")
+    opts = parser.parse_args()
+
+    try:
+        counts = sorted({int(n) for n in opts.deps.split(",")})
+    except ValueError:
+        print(json.dumps({"error": "--deps must be comma-separated integers"}))
+        return 1
+    if not counts or counts[0] < 1 or opts.history < 1 or opts.context_files < 1:
+        print(json.dumps({"error": "--deps, --history and --context-files must be at least 1"}))
+        return 1
+
+    root = Path(tempfile.mkdtemp(prefix="bench-fetch-"))
+    saved_env = os.environ.get(fetch_git_deps.MIRROR_ROOT_ENV)
+    try:
+        setup_start = time.perf_counter()
+        remotes = [create_remote(root, i, opts) for i in range(counts[-1])]
+        leak_sets = [app_blobs(root, i) for i in range(counts[-1])]
+        setup = time.perf_counter() - setup_start
+
+        runs = []
+        for count in counts:
+            # Every count starts from the same upstream state
+            for i in range(counts[-1]):
+                git(["push", "-q", "--force", str(remotes[i]), "HEAD:main"], cwd=root / f"src{i}")
+            runs.append({"deps": count, "scenarios": bench(root, count, opts, remotes, leak_sets)})
+
+        leaked = sum(s["app_blobs_in_mirrors"] for run in runs for s in run["scenarios"].values())
+        transitive = check_transitive(root, opts.jobs)
+        report = {
+            "config": {
+                "history": opts.history,
+                "app_files": opts.app_files,
+                "app_size_kb": opts.app_size,
+                "large_blob_mb": opts.large_blob,
+                "context_files": opts.context_files,
+                "jobs": opts.jobs,
+                "lazy": bool(opts.lazy),
+                "setup_seconds": round(setup, 2),
+            },
+            "runs": runs,
+            "app_blobs_in_mirrors": leaked,
+            "transitive": transitive,
+        }
+        if opts.keep:
+            report["scratch_dir"] = str(root)
+        print(json.dumps(report, indent=2))
+        return 1 if opts.check and (leaked or not all(transitive.values())) else 0
+    finally:
+        if saved_env is None:
+            os.environ.pop(fetch_git_deps.MIRROR_ROOT_ENV, None)
+        else:
+            os.environ[fetch_git_deps.MIRROR_ROOT_ENV] = saved_env
+        if not opts.keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Opt-in warm daemon for manage_context.py and fetch_git_deps.py.
+
+Every skill invocation otherwise pays an interpreter start, argparse setup and
+a cold read of .project-context/. The daemon keeps one ContextSnapshot and the
+computed results in memory, serves them as JSON-RPC 2.0 over a Unix socket
+under .project-context/, and drops them whenever the mtime poller sees a
+watched file change.
+
+The client (`call`) falls back to running the command in-process when no
+daemon is listening, so callers never need to know whether one is running.
+
+Usage:
+    python context_daemon.py start [--dir DIR] [--poll SECONDS] [--idle-timeout SECONDS]
+    python context_daemon.py stop [--dir DIR]
+    python context_daemon.py call {status,validate,deps,fetch-status} [--dir DIR]
+    python context_daemon.py bench [--dir DIR] [--runs N] [--method NAME]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+from pathlib import Path
+
+# The client path only needs socket + json; the script modules are imported
+# on demand so `call` stays close to bare interpreter start-up when a daemon
+# is listening.
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+SOCKET_NAME = ".daemon.sock"
+MAX_SOCKET_PATH = 100  # AF_UNIX paths are limited to ~108 bytes
+CONNECT_TIMEOUT = 0.5
+DEFAULT_POLL_SECONDS = 1.0
+DEFAULT_IDLE_TIMEOUT = 3600
+
+
+METHODS = ("status", "validate", "deps", "fetch-status")
+
+
+def _load_scripts():
+    """Import manage_context and fetch_git_deps from this directory."""
+    if str(SCRIPTS_DIR) not in sys.path:
+        sys.path.insert(0, str(SCRIPTS_DIR))
+    import fetch_git_deps
+    import manage_context
+    return manage_context, fetch_git_deps
+
+
+def run_local(method, project_dir="."):
+    """Run a command in-process on a fresh snapshot. Returns (payload, exit_code)."""
+    manage_context, _ = _load_scripts()
+    return run_method(method, manage_context.ContextSnapshot(project_dir))
+
+
+def run_method(method, snapshot):
+    """Dispatch a method name to its report function."""
+    manage_context, fetch_git_deps = _load_scripts()
+    if method == "fetch-status":
+        if not snapshot.context_dir:
+            return {"error": "No .project-context/ directory found."}, 1
+        return fetch_git_deps.cache_status(snapshot.context_dir), 0
+    return manage_context.REPORT_COMMANDS[method](snapshot)
+
+
+def socket_path(project_dir):
+    """Socket location for a project — inside .project-context/ when it fits."""
+    context_dir = (Path(project_dir) / ".project-context").resolve()
+    path = context_dir / SOCKET_NAME
+    if len(str(path)) <= MAX_SOCKET_PATH:
+        return path
+    digest = hashlib.sha1(str(context_dir).encode()).hexdigest()[:12]
+    return Path(tempfile.gettempdir()) / f"project-context-{digest}.sock"
+
+
+def watched_paths(snapshot):
+    """Every path whose mtime can change a command result.
+
+    Directory mtimes catch added/removed files; file mtimes catch edits.
+    """
+    manage_context, fetch_git_deps = _load_scripts()
+    context_dir = snapshot.context_dir
+    paths = [context_dir, context_dir / "plans"]
+    paths += [context_dir / name for name in manage_context.CONTEXT_FILES]
+    paths.append(context_dir / manage_context.CONFIG_FILENAME)
+    paths += [context_dir / "plans" / name for name in snapshot.plans]
+
+    cache_dir = context_dir / fetch_git_deps.CACHE_DIR_NAME
+    paths.append(cache_dir)
+    if cache_dir.is_dir():
+        for entry in cache_dir.iterdir():
+            paths += [entry, entry / fetch_git_deps.META_FILENAME]
+
+    # Commits move staleness (status reads last-commit times per HEAD)
+    try:
+        repo = manage_context._find_git_repo(context_dir.resolve())
+    except OSError:
+        repo = None
+    if repo:
+        _, git_dir, common_dir = repo
+        paths += [git_dir / "HEAD", common_dir / "packed-refs"]
+        try:
+            head = (git_dir / "HEAD").read_text().strip()
+            if head.startswith("ref:"):
+                ref = head[len("ref:"):].strip()
+                paths += [git_dir / ref, common_dir / ref]
+        except OSError:
+            pass
+
+    deps = snapshot.dependencies or {}
+    for dep in deps.get("upstream", []) + deps.get("downstream", []):
+        if "path" in dep:
+            dep_dir = context_dir.parent / dep["path"]
+            paths += [dep_dir, dep_dir / ".project-context"]
+    return paths
+
+
+def fingerprint(paths):
+    """(mtime_ns, size) per path — None for paths that don't exist."""
+    result = []
+    for path in paths:
+        try:
+            st = path.stat()
+            result.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            result.append(None)
+    return tuple(result)
+
+
+class ContextState:
+    """Warm snapshot plus memoized results, invalidated on mtime change."""
+
+    def __init__(self, project_dir):
+        self.project_dir = project_dir
+        self.lock = threading.Lock()
+        self.last_request = time.monotonic()
+        self._reset()
+
+    def _reset(self):
+        manage_context, _ = _load_scripts()
+        self.snapshot = manage_context.ContextSnapshot(self.project_dir)
+        self.results = {}
+        self.paths = watched_paths(self.snapshot) if self.snapshot.context_dir else []
+        self.fingerprint = fingerprint(self.paths)
+
+    def poll(self):
+        """Drop cached state if any watched path changed since the last poll."""
+        with self.lock:
+            if fingerprint(self.paths) != self.fingerprint:
+                self._reset()
+
+    def run(self, method):
+        with self.lock:
+            self.last_request = time.monotonic()
+            # Status/validate compare against "now", so results expire daily
+            key = (method, date.today())
+            if key not in self.results:
+                self.results[key] = run_method(method, self.snapshot)
+            return self.results[key]
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """One newline-delimited JSON-RPC request per connection."""
+
+    def handle(self):
+        line = self.rfile.readline()
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            method = request["method"]
+            if method == "shutdown":
+                response = {"result": {"stopping": True}}
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+            elif method == "ping":
+                response = {"result": {"pid": os.getpid()}}
+            elif method in METHODS:
+                payload, code = self.server.state.run(method)
+                response = {"result": {"payload": payload, "exit_code": code}}
+            else:
+                response = {"error": {"code": -32601, "message": f"Unknown method '{method}'"}}
+        except (json.JSONDecodeError, ValueError, KeyError, AttributeError) as e:
+            response = {"error": {"code": -32600, "message": f"Invalid request: {e}"}}
+        except Exception as e:  # keep serving other clients
+            response = {"error": {"code": -32603, "message": f"Internal error: {e}"}}
+        response = {"jsonrpc": "2.0", "id": request_id, **response}
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(project_dir, poll_seconds, idle_timeout):
+    """Run the daemon in the foreground until shutdown or idle timeout."""
+    path = socket_path(project_dir)
+    if path.exists():
+        if _rpc(path, "ping") is not None:
+            return {"started": False, "reason": "Daemon already running", "socket": str(path)}
+        path.unlink()
+
+    server = _Server(str(path), _Handler)
+    server.state = ContextState(project_dir)
+
+    def _poll_loop():
+        while True:
+            time.sleep(poll_seconds)
+            server.state.poll()
+            if idle_timeout and time.monotonic() - server.state.last_request > idle_timeout:
+                server.shutdown()
+                return
+
+    threading.Thread(target=_poll_loop, daemon=True).start()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        try:
+            path.unlink()
+        except OSError:
+            pass
+    return {"started": True, "stopped": True, "socket": str(path)}
+
+
+def _rpc(path, method, timeout=None):
+    """Send one JSON-RPC request. Returns the result, or None on any failure."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(str(path))
+            sock.settimeout(timeout)
+            request = {"jsonrpc": "2.0", "id": 1, "method": method}
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            data = b""
+            while not data.endswith(b"\n"):
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                data += chunk
+    except OSError:
+        return None
+
+    try:
+        response = json.loads(data)
+    except (json.JSONDecodeError, ValueError):
+        return None
+    return response.get("result")
+
+
+def call(method, project_dir="."):
+    """Run a command via the daemon, falling back to in-process execution.
+
+    Returns (payload, exit_code, source) where source is "daemon" or "local".
+    """
+    if hasattr(socket, "AF_UNIX"):
+        result = _rpc(socket_path(project_dir), method)
+        if result is not None:
+            return result["payload"], result["exit_code"], "daemon"
+    payload, code = run_local(method, project_dir)
+    return payload, code, "local"
+
+
+def cmd_start(args):
+    """Start the daemon in the background (or foreground with --foreground)."""
+    if not hasattr(socket, "AF_UNIX"):
+        print(json.dumps({"started": False, "reason": "Unix sockets are not supported on this platform"}))
+        return 1
+    if not (Path(args.dir) / ".project-context").is_dir():
+        print(json.dumps({"started": False, "reason": "No .project-context/ directory found."}))
+        return 1
+
+    if args.foreground:
+        print(json.dumps(serve(args.dir, args.poll, args.idle_timeout)))
+        return 0
+
+    path = socket_path(args.dir)
+    if _rpc(path, "ping") is not None:
+        print(json.dumps({"started": False, "reason": "Daemon already running", "socket": str(path)}))
+        return 0
+
+    import subprocess
+
+    subprocess.Popen(
+        [sys.executable, str(Path(__file__).resolve()), "start", "--foreground",
+         "--dir", args.dir, "--poll", str(args.poll), "--idle-timeout", str(args.idle_timeout)],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+    # Wait for the socket to accept connections
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        result = _rpc(path, "ping")
+        if result is not None:
+            print(json.dumps({"started": True, "pid": result["pid"], "socket": str(path)}))
+            return 0
+        time.sleep(0.05)
+
+    print(json.dumps({"started": False, "reason": "Daemon did not come up within 5s", "socket": str(path)}))
+    return 1
+
+
+def cmd_stop(args):
+    """Ask a running daemon to shut down."""
+    path = socket_path(args.dir)
+    if not hasattr(socket, "AF_UNIX") or _rpc(path, "shutdown") is None:
+        print(json.dumps({"stopped": False, "reason": "No daemon running"}))
+        return 0
+    print(json.dumps({"stopped": True, "socket": str(path)}))
+    return 0
+
+
+def cmd_call(args):
+    """Thin client: same output as the underlying script's subcommand."""
+    payload, code, _ = call(args.method, args.dir)
+    print(json.dumps(payload, indent=2))
+    return code
+
+
+def cmd_bench(args):
+    """Compare the cold script path against the daemon-backed client."""
+    import statistics
+    import subprocess
+
+    scripts = SCRIPTS_DIR
+    if args.method == "fetch-status":
+        cold_cmd = [sys.executable, str(scripts / "fetch_git_deps.py"), "status", "--dir", args.dir]
+    else:
+        cold_cmd = [sys.executable, str(scripts / "manage_context.py"), args.method, "--dir", args.dir]
+    client_cmd = [sys.executable, str(Path(__file__).resolve()), "call", args.method, "--dir", args.dir]
+
+    def _time_process(cmd):
+        samples = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            samples.append((time.perf_counter() - start) * 1000)
+        return samples
+
+    def _time_inline(fn):
+        samples = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - start) * 1000)
+        return samples
+
+    def _summary(samples):
+        return {"median_ms": round(statistics.median(samples), 2), "min_ms": round(min(samples), 2)}
+
+    path = socket_path(args.dir)
+    daemon_running = hasattr(socket, "AF_UNIX") and _rpc(path, "ping") is not None
+
+    result = {
+        "command": args.method,
+        "runs": args.runs,
+        "daemon_running": daemon_running,
+        "cold_process": _summary(_time_process(cold_cmd)),
+        "client_process": _summary(_time_process(client_cmd)),
+        "in_process": _summary(_time_inline(
+            lambda: run_local(args.method, args.dir))),
+    }
+    if daemon_running:
+        result["daemon_roundtrip"] = _summary(_time_inline(lambda: _rpc(path, args.method)))
+    else:
+        result["hint"] = "Start the daemon first to measure the warm path: context_daemon.py start"
+
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm daemon for project context scripts")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    # start command
+    start_parser = subparsers.add_parser("start", help="Start the daemon for a project")
+    start_parser.add_argument("--dir", default=".", help="Project root directory")
+    start_parser.add_argument("--poll", type=float, default=DEFAULT_POLL_SECONDS,
+                              help="Seconds between mtime polls")
+    start_parser.add_argument("--idle-timeout", type=float, default=DEFAULT_IDLE_TIMEOUT,
+                              help="Exit after this many idle seconds (0 = never)")
+    start_parser.add_argument("--foreground", action="store_true", help="Run in the foreground")
+
+    # stop command
+    stop_parser = subparsers.add_parser("stop", help="Stop the daemon for a project")
+    stop_parser.add_argument("--dir", default=".", help="Project root directory")
+
+    # call command
+    call_parser = subparsers.add_parser("call", help="Run a command via the daemon (or in-process)")
+    call_parser.add_argument("method", choices=METHODS, help="Command to run")
+    call_parser.add_argument("--dir", default=".", help="Project root directory")
+
+    # bench command
+    bench_parser = subparsers.add_parser("bench", help="Measure daemon vs cold script latency")
+    bench_parser.add_argument("--dir", default=".", help="Project root directory")
+    bench_parser.add_argument("--runs", type=int, default=10, help="Samples per path")
+    bench_parser.add_argument("--method", default="status", choices=METHODS,
+                              help="Command to benchmark")
+
+    args = parser.parse_args()
+
+    commands = {
+        "start": cmd_start,
+        "stop": cmd_stop,
+        "call": cmd_call,
+        "bench": cmd_bench,
+    }
+
+    return commands[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,29 +2,111 @@
 """
 Fetch .project-context/ from git link dependencies.
 
-Uses git sparse-checkout (--filter=blob:none --sparse) to download only the
-.project-context/ directory from remote repos, then copies the context files
-into .project-context/.deps-cache/<project>/ and cleans up the temp clone.
-No .git/ directories are retained — the cache is plain files.
+Keeps one partial (--filter=blob:none, --depth 1) bare mirror per remote URL
+in a user-level cache (~/.cache/project-context/mirrors/<url-hash>/), shared
+by every project on the machine. Each fetch updates the mirror incrementally,
+downloads only the .project-context/ blobs, and streams them through one
+`git cat-file --batch` process straight into .project-context/.deps-cache/<project>/
+(plus plans/ files selected with --plan). The project cache is plain files.
+
+Each fetch is staged in .deps-cache/.versions/<project>/<stamp>/ and published
+by atomically swapping the .deps-cache/<project> symlink, so readers always
+see a complete directory and never take locks. Writers hold a per-dep lock
+(.deps-cache/.locks/<project>.lock) plus the cache-wide .deps-cache/.lock in
+shared mode; `clean` takes the cache-wide lock exclusively.
+
+File contents are stored once per blob oid in .deps-cache/.blobs/ and
+hardlinked (copied where hardlinks are unsupported) into each version, so
+identical files across deps, refs and re-fetches share one read-only copy
+and unchanged files are never rewritten. Each version's .fetch-meta.json
+lists its blob oids, so blobs survive where files had to be copied. Blobs
+that no cache file links to and no version lists are collected by `clean`
+and, when no other fetch is running, after `fetch`.
+
+`fetch --lazy` downloads only the tree listing and the summary files agents
+read first (brief.md, architecture.md, dependencies.json); the rest is
+recorded as "deferred" in .fetch-meta.json and pulled on first access with
+`get <project> <file>`. Files fetched that way are kept eager on later
+fetches. The lazy/eager choice is remembered per dep.
+
+`fetch --depth N` also follows the upstream git deps listed in each fetched
+dependency's own dependencies.json, breadth-first, and records the resolved
+graph in .deps-cache/.graph.json for `status`.
+
+The fetched commit and the .project-context tree hash are recorded in
+.fetch-meta.json; later fetches ask the remote for the ref's commit with
+`git ls-remote` first and skip deps that haven't moved (status "up_to_date").
+Each run also appends per-phase timings and transferred object/byte counts
+to the dep's recent history there; `status --stats` ranks the slowest deps.
+
+`clean --max-size/--older-than/--undeclared` evicts entries least recently
+used first — last use is the later of fetched_at and the newest access time
+of the entry's files. With a "deps_cache" section in config.json the same
+policy runs after every fetch:
+
+    {"deps_cache": {"max_size": "200M", "older_than": "30d", "undeclared": true}}
 
 Usage:
-    python fetch_git_deps.py fetch [--dir DIR] [--project NAME]
-    python fetch_git_deps.py status [--dir DIR]
+    python fetch_git_deps.py fetch [--dir DIR] [--project NAME] [--jobs N] [--per-host N] [--deadline SECS] [--force]
+                                   [--plan NAME ...] [--depth N] [--lazy | --eager]
+    python fetch_git_deps.py get <project> <file> [--dir DIR]
+    python fetch_git_deps.py status [--dir DIR] [--stats [--top N]]
     python fetch_git_deps.py clean [--dir DIR] [--project NAME]
+    python fetch_git_deps.py clean [--dir DIR] [--max-size SIZE] [--older-than AGE] [--undeclared] [--dry-run]
 """
 
 import argparse
+import fnmatch
+import hashlib
 import json
+import os
+import re
 import shutil
 import subprocess
 import sys
 import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
 from pathlib import Path
+from stat import S_ISREG
+from urllib.parse import urlparse
+
+try:
+    import fcntl
+except ImportError:  # Windows — mirrors are used without cross-process locking
+    fcntl = None
 
 
 CACHE_DIR_NAME = ".deps-cache"
 META_FILENAME = ".fetch-meta.json"
+DEFAULT_JOBS = 4
+DEFAULT_PER_HOST = 2
+CLONE_TIMEOUT = 120
+GIT_TIMEOUT = 60
+MIRROR_ROOT_ENV = "PROJECT_CONTEXT_CACHE"
+MIRROR_REF_PREFIX = "refs/deps/"
+VERSIONS_DIR_NAME = ".versions"
+LOCKS_DIR_NAME = ".locks"
+CACHE_LOCK_NAME = ".lock"
+GRAPH_FILENAME = ".graph.json"
+BLOBS_DIR_NAME = ".blobs"
+HISTORY_LIMIT = 10
+TREND_THRESHOLD = 0.2  # ±20% against the earlier average counts as a trend
+ROOT_NODE = "."
+LAZY_EAGER_FILES = {"brief.md", "architecture.md", "dependencies.json"}
+CONFIG_FILENAME = "config.json"
+EVICT_LOCK_WAIT = 10  # seconds an automatic eviction waits for running fetches
+SIZE_UNITS = {"": 1, "b": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3}
+AGE_UNITS = {"": 86400, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+# mkstemp/mkdtemp create 0600 files and 0700 dirs; published ones get the usual modes
+FILE_MODE = 0o644
+DIR_MODE = 0o755
+# Read once at import: os.umask() can only be read by setting it, which races with worker threads
+UMASK = os.umask(0o022)
+os.umask(UMASK)
 
 
 def find_context_dir(start_dir="."):
@@ -68,8 +150,32 @@ def parse_git_deps(context_dir):
     return git_deps
 
 
-def run_git(args, cwd=None, timeout=60):
+def git_host(url):
+    """Host part of a git URL, for per-host concurrency limits.
+
+    Handles scheme URLs (https://, ssh://, file://) and scp-like
+    user@host:path; anything else is treated as a local path.
+    """
+    if "://" in url:
+        parsed = urlparse(url)
+        return parsed.hostname.lower() if parsed.scheme != "file" and parsed.hostname else "local"
+    match = re.match(r"^(?:[^@/]+@)?([^:/]+):", url)
+    if match and len(match.group(1)) > 1:  # not a Windows drive letter
+        return match.group(1).lower()
+    return "local"
+
+
+def _time_left(deadline, timeout):
+    """Clamp a per-command timeout to the time remaining before deadline."""
+    if deadline is None:
+        return timeout
+    return min(timeout, deadline - time.monotonic())
+
+
+def run_git(args, cwd=None, timeout=GIT_TIMEOUT, input=None):
     """Run a git command and return (success, stdout, stderr)."""
+    if timeout <= 0:
+        return False, "", "Command timed out"
     try:
         result = subprocess.run(
             ["git"] + args,
@@ -77,6 +183,7 @@ def run_git(args, cwd=None, timeout=60):
             capture_output=True,
             text=True,
             timeout=timeout,
+            input=input,
         )
         return result.returncode == 0, result.stdout.strip(), result.stderr.strip()
     except subprocess.TimeoutExpired:
@@ -85,13 +192,448 @@ def run_git(args, cwd=None, timeout=60):
         return False, "", "git not found — ensure git is installed"
 
 
-def fetch_single_dep(dep, cache_dir):
+def read_meta(dep_cache):
+    """Parsed .fetch-meta.json of a cached dep, or None."""
+    try:
+        return json.loads((dep_cache / META_FILENAME).read_text())
+    except (OSError, json.JSONDecodeError, ValueError):
+        return None
+
+
+def remote_commit(git_url, ref, timeout=GIT_TIMEOUT):
+    """Commit the remote ref points at, via one `git ls-remote` round trip.
+
+    Branches win over tags; annotated tags resolve to their peeled commit,
+    which is what `git clone --branch <tag>` checks out. None on failure.
+    """
+    ok, out, _ = run_git(["ls-remote", git_url, ref], timeout=timeout)
+    if not ok:
+        return None
+    refs = {}
+    for line in out.splitlines():
+        sha, _, name = line.partition("\t")
+        refs[name] = sha
+    if ref == "HEAD":
+        return refs.get("HEAD")
+    for name in (f"refs/heads/{ref}", f"refs/tags/{ref}^{{}}", f"refs/tags/{ref}", ref):
+        if name in refs:
+            return refs[name]
+    return None
+
+
+def _cache_is_current(meta, dep, ref, plans, lazy=False):
+    """Whether cached metadata belongs to this dep's URL/ref/plan selection/mode and has files."""
+    return bool(meta and meta.get("git") == dep["git"] and meta.get("ref") == ref
+                and meta.get("commit") and (meta.get("files") or meta.get("deferred"))
+                and sorted(meta.get("plan_patterns", [])) == sorted(plans)
+                and bool(meta.get("lazy")) == lazy)
+
+
+def mirror_root():
+    """User-level mirror directory ($PROJECT_CONTEXT_CACHE or XDG cache)."""
+    base = os.environ.get(MIRROR_ROOT_ENV)
+    if not base:
+        base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "project-context"
+    return Path(base) / "mirrors"
+
+
+def mirror_path(git_url):
+    """Mirror directory for a remote URL."""
+    return mirror_root() / hashlib.sha256(git_url.encode()).hexdigest()[:16]
+
+
+class FileLock:
+    """flock on a lock file, polled so it honours the deadline.
+
+    Works across threads and processes (flock locks belong to the open file,
+    so threads exclude each other too). Without fcntl it is a no-op.
+    """
+
+    def __init__(self, path, shared=False, deadline=None):
+        self.path = Path(path)
+        self.mode = fcntl.LOCK_SH if shared and fcntl else fcntl.LOCK_EX if fcntl else None
+        self.deadline = deadline
+        self.handle = None
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.handle = open(self.path, "a")
+        if fcntl is None:
+            return self
+        while True:
+            try:
+                fcntl.flock(self.handle, self.mode | fcntl.LOCK_NB)
+                return self
+            except BlockingIOError:
+                if self.deadline is not None and time.monotonic() >= self.deadline:
+                    self.handle.close()
+                    raise TimeoutError(f"Deadline reached while waiting for {self.path.name}")
+                time.sleep(0.05)
+
+    def __exit__(self, *exc):
+        self.handle.close()  # releases the flock
+
+
+def mirror_lock(mirror, deadline=None):
+    """Exclusive lock serializing fetch/extract on one mirror."""
+    return FileLock(mirror.with_name(mirror.name + ".lock"), deadline=deadline)
+
+
+def cache_lock(cache_dir, shared=True, deadline=None):
+    """Cache-wide lock: shared for fetches, exclusive for whole-cache changes."""
+    return FileLock(cache_dir / CACHE_LOCK_NAME, shared=shared, deadline=deadline)
+
+
+def dep_lock(cache_dir, project, deadline=None):
+    """Exclusive lock serializing writers of one dep's cache entry."""
+    return FileLock(cache_dir / LOCKS_DIR_NAME / f"{project}.lock", deadline=deadline)
+
+
+def write_json_atomic(path, data):
+    """Write JSON via a temp file + os.replace so readers never see a partial file.
+
+    Keeps the mode of an existing file; a new one gets 0644 minus the umask.
+    """
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(json.dumps(data, indent=2))
+        try:
+            os.chmod(tmp, path.stat().st_mode & 0o7777)
+        except FileNotFoundError:
+            os.chmod(tmp, FILE_MODE & ~UMASK)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def stage_version(cache_dir, project):
+    """New empty version dir for a dep, on the same filesystem as the cache."""
+    versions = cache_dir / VERSIONS_DIR_NAME / project
+    versions.mkdir(parents=True, exist_ok=True)
+    staged = Path(tempfile.mkdtemp(prefix=datetime.now().strftime("%Y%m%dT%H%M%S-"), dir=versions))
+    os.chmod(staged, DIR_MODE & ~UMASK)
+    return staged
+
+
+def publish_version(cache_dir, project, staged):
+    """Point .deps-cache/<project> at a staged version in one atomic rename.
+
+    The previous version is kept for readers that are still inside it;
+    anything older is deleted. Caller holds the dep lock.
+    """
+    link = cache_dir / project
+    versions = staged.parent
+    previous = None
+
+    if link.is_symlink():
+        previous = (cache_dir / os.readlink(link)).resolve()
+    elif link.exists():
+        # Plain directory from an older cache layout — move it into .versions/
+        previous = versions / f"legacy-{staged.name}"
+        os.replace(link, previous)
+
+    tmp_link = cache_dir / f".{project}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.symlink(os.path.relpath(staged, cache_dir), tmp_link, target_is_directory=True)
+        os.replace(tmp_link, link)
+    except (OSError, NotImplementedError):
+        # No symlink support (e.g. Windows without developer mode): plain rename
+        tmp_link.unlink(missing_ok=True)
+        if link.is_symlink():
+            link.unlink()
+        os.replace(staged, link)
+
+    keep = {staged.resolve(), previous.resolve() if previous else None}
+    for old in versions.iterdir():
+        if old.resolve() not in keep:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def remove_dep_cache(cache_dir, project):
+    """Remove a dep's cache entry (symlink or legacy directory) and its versions."""
+    link = cache_dir / project
+    if link.is_symlink():
+        link.unlink()
+    elif link.is_dir():
+        shutil.rmtree(link)
+    shutil.rmtree(cache_dir / VERSIONS_DIR_NAME / project, ignore_errors=True)
+
+
+def blob_path(cache_dir, oid):
+    """Location of a blob in the cache's content-addressed store."""
+    return cache_dir / BLOBS_DIR_NAME / oid[:2] / oid[2:]
+
+
+def link_blob(cache_dir, oid, dest, cat=None):
+    """Hardlink dest to the stored blob, writing it from `cat` first if new.
+
+    Stored blobs are read-only, since every cache file linking to one
+    shares its inode. Falls back to a copy where hardlinks are unsupported.
+    Returns bytes written. Caller holds the cache lock (shared is enough).
+    """
+    stored = blob_path(cache_dir, oid)
+    written = 0
+    if not stored.exists():
+        stored.parent.mkdir(parents=True, exist_ok=True)
+        tmp = stored.with_name(f".{stored.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            written = cat.write_blob(oid, tmp)
+            os.chmod(tmp, 0o444)
+            os.replace(tmp, stored)
+        finally:
+            tmp.unlink(missing_ok=True)
+    try:
+        os.link(stored, dest)
+    except OSError:
+        shutil.copyfile(stored, dest)
+        written += stored.stat().st_size
+    return written
+
+
+def referenced_blobs(cache_dir):
+    """Blob oids listed in the "blobs" of any version's metadata."""
+    metas = list((cache_dir / VERSIONS_DIR_NAME).glob(f"*/*/{META_FILENAME}"))
+    # Legacy plain directories hold their metadata directly
+    metas += [item / META_FILENAME for item in cache_dir.iterdir()
+              if not item.name.startswith(".") and item.is_dir() and not item.is_symlink()]
+    oids = set()
+    for path in metas:
+        try:
+            oids.update(json.loads(path.read_text()).get("blobs", {}).values())
+        except (OSError, json.JSONDecodeError, ValueError, AttributeError):
+            continue
+    return oids
+
+
+def gc_blobs(cache_dir):
+    """Delete stored blobs no cache file links to and no version lists; returns (count, bytes).
+
+    A link count of 1 alone is not enough: where hardlinks are unsupported
+    every file is a copy, yet its blob is still in use. Caller holds the
+    cache lock exclusively, so no fetch is between writing a blob and
+    linking it.
+    """
+    count = freed = 0
+    store = cache_dir / BLOBS_DIR_NAME
+    if not store.is_dir():
+        return count, freed
+    referenced = referenced_blobs(cache_dir)
+    for path in store.glob("*/*"):
+        stat = path.lstat()
+        if stat.st_nlink == 1 and path.parent.name + path.name not in referenced:
+            path.unlink()
+            count += 1
+            freed += stat.st_size
+    return count, freed
+
+
+def collect_blobs(cache_dir):
+    """gc_blobs if the cache is idle right now; None when another process holds it."""
+    try:
+        with cache_lock(cache_dir, shared=False, deadline=time.monotonic()):
+            return gc_blobs(cache_dir)
+    except TimeoutError:
+        return None
+
+
+def ensure_mirror(git_url, deadline=None):
+    """Create the bare partial mirror for a URL if needed; returns (path, error)."""
+    mirror = mirror_path(git_url)
+    if (mirror / "HEAD").exists():
+        return mirror, None
+    if mirror.exists():  # left over from an interrupted init
+        shutil.rmtree(mirror, ignore_errors=True)
+
+    tmp = Path(tempfile.mkdtemp(prefix=mirror.name + "-", dir=mirror.parent))
+    try:
+        os.chmod(tmp, DIR_MODE & ~UMASK)
+        for args in (
+            ["init", "--bare", "--quiet", str(tmp)],
+            ["-C", str(tmp), "config", "remote.origin.url", git_url],
+            ["-C", str(tmp), "config", "remote.origin.promisor", "true"],
+            ["-C", str(tmp), "config", "remote.origin.partialclonefilter", "blob:none"],
+        ):
+            ok, _, err = run_git(args, timeout=_time_left(deadline, GIT_TIMEOUT))
+            if not ok:
+                return None, err
+        os.replace(tmp, mirror)
+        return mirror, None
+    finally:
+        if tmp.exists():
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+def update_mirror(mirror, ref, deadline=None):
+    """Fetch ref into the mirror (only new objects, no blobs); returns (commit, error)."""
+    local_ref = MIRROR_REF_PREFIX + re.sub(r"[^A-Za-z0-9._/-]", "_", ref)
+    ok, _, err = run_git(
+        ["-C", str(mirror), "fetch", "--quiet", "--depth", "1", "--filter=blob:none", "--no-tags",
+         "origin", f"+{ref}:{local_ref}"],
+        timeout=_time_left(deadline, CLONE_TIMEOUT),
+    )
+    if not ok:
+        return None, err
+    ok, commit, err = run_git(["-C", str(mirror), "rev-parse", f"{local_ref}^{{commit}}"])
+    return (commit, None) if ok else (None, err)
+
+
+def _plan_selected(name, patterns):
+    """Whether a plans/ file name matches one of the --plan patterns."""
+    return any(fnmatch.fnmatch(name, p) or fnmatch.fnmatch(name, p + ".md") for p in patterns)
+
+
+def context_blobs(mirror, commit, plans=()):
+    """Files to extract from .project-context/ at commit, as {relative path: blob oid}.
+
+    Top-level files always; plans/ files only when their name matches one of
+    the `plans` patterns ("auth-flow.md", "auth-flow", "auth-*", "*").
+    """
+    ok, out, _ = run_git(["-C", str(mirror), "ls-tree", "-r", "-z", commit, ".project-context/"])
+    blobs = {}
+    for entry in out.split("\0") if ok else []:
+        meta, _, path = entry.partition("\t")
+        parts = meta.split()
+        if len(parts) != 3 or parts[1] != "blob":
+            continue
+        rel = path[len(".project-context/"):]
+        if "/" not in rel:
+            blobs[rel] = parts[2]
+        elif rel.count("/") == 1 and rel.startswith("plans/") and _plan_selected(rel[len("plans/"):], plans):
+            blobs[rel] = parts[2]
+    return blobs
+
+
+class CatFileBatch:
+    """One long-lived `git cat-file --batch` process for reading blobs."""
+
+    def __init__(self, mirror):
+        self.proc = subprocess.Popen(
+            ["git", "-C", str(mirror), "cat-file", "--batch"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def write_blob(self, oid, dest):
+        """Stream one blob into dest; returns bytes written."""
+        self.proc.stdin.write(f"{oid}\n".encode())
+        self.proc.stdin.flush()
+        header = self.proc.stdout.readline().decode().split()
+        if len(header) != 3 or header[1] != "blob":
+            raise OSError(f"git cat-file: cannot read blob {oid}")
+        remaining = size = int(header[2])
+        with open(dest, "wb") as out:
+            while remaining:
+                chunk = self.proc.stdout.read(min(remaining, 1 << 16))
+                if not chunk:
+                    raise OSError(f"git cat-file: truncated blob {oid}")
+                out.write(chunk)
+                remaining -= len(chunk)
+        self.proc.stdout.read(1)  # trailing newline
+        return size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.proc.stdin.close()
+        try:
+            self.proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+        self.proc.stdout.close()
+
+
+def prefetch_blobs(mirror, oids, deadline=None):
+    """Download missing blobs in one request instead of one lazy fetch each."""
+    ok, out, _ = run_git(["-C", str(mirror), "rev-list", "--objects", "--missing=print", "--no-object-names",
+                          "--no-walk"] + list(oids))
+    missing = [line[1:] for line in out.splitlines() if line.startswith("?")] if ok else list(oids)
+    if not missing:
+        return True, None
+    ok, _, err = run_git(
+        ["-C", str(mirror), "-c", "fetch.negotiationAlgorithm=noop", "fetch", "--quiet", "origin", "--no-tags",
+         "--no-write-fetch-head", "--recurse-submodules=no", "--filter=blob:none", "--stdin"],
+        timeout=_time_left(deadline, CLONE_TIMEOUT),
+        input="\n".join(missing) + "\n",
+    )
+    return ok, err
+
+
+def mirror_counts(mirror):
+    """(objects, bytes) stored in a mirror, from `git count-objects -v`."""
+    ok, out, _ = run_git(["-C", str(mirror), "count-objects", "-v"])
+    values = {}
+    for line in out.splitlines() if ok else []:
+        key, _, value = line.partition(":")
+        if value.strip().isdigit():
+            values[key] = int(value)
+    objects = values.get("count", 0) + values.get("in-pack", 0)
+    size = (values.get("size", 0) + values.get("size-pack", 0)) * 1024
+    return objects, size
+
+
+def record_history(meta, result, timings):
+    """Append this run to meta["history"] (newest last, HISTORY_LIMIT kept)."""
+    entry = {
+        "at": datetime.now().isoformat(timespec="seconds"),
+        "status": result["status"],
+        "seconds": round(sum(timings.values()), 4),
+        "timings": dict(timings),
+    }
+    for key in ("objects_received", "bytes_received", "bytes_written"):
+        if key in result:
+            entry[key] = result[key]
+    meta["history"] = (meta.get("history", []) + [entry])[-HISTORY_LIMIT:]
+    if result["status"] == "ok":
+        meta["last_fetch"] = entry
+    return meta
+
+
+class PhaseTimer:
+    """Wall-clock seconds per fetch phase, accumulated into a dict."""
+
+    def __init__(self):
+        self.timings = {}
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings[name] = round(self.timings.get(name, 0.0) + elapsed, 4)
+
+
+def fetch_single_dep(dep, cache_dir, deadline=None, force=False, plans=None, lazy=None):
     """Fetch .project-context/ for a single git dependency.
 
-    Uses sparse-checkout (--filter=blob:none --sparse) so only the
-    .project-context/ directory is downloaded — no application code.
-    Copies context files to cache, then cleans up the temp clone.
-    No .git/ is retained — cache contains only plain context files.
+    Updates the shared partial mirror for the URL (new commits and trees
+    only), downloads just the top-level .project-context/ blobs (and the
+    plans/ files matching `plans`), and streams them from `git cat-file
+    --batch` straight into the cache. No work tree or .git/ is involved —
+    cache contains only plain context files.
+
+    plans=None keeps the plan selection of the previous fetch, lazy=None its
+    lazy/eager mode. A lazy fetch extracts only LAZY_EAGER_FILES, selected
+    plans and files previously pulled with `get`; every other file (plans
+    included) is listed under meta["deferred"] with its blob oid.
+
+    With a deadline (time.monotonic() value) every git command's timeout is
+    clamped to the time left, and a dep whose git step runs out of time is
+    reported as "timed_out".
+
+    Unless force is set, a dep whose remote ref still points at the cached
+    commit is reported "up_to_date" without cloning, and a new commit that
+    leaves the .project-context tree unchanged only refreshes the metadata.
+
+    result["timings"] holds seconds per phase (check, mirror_fetch, list,
+    blobs, write, publish) for the phases that ran. Blobs already in the
+    cache's blob store are neither downloaded nor rewritten, only linked.
     """
     project = dep["project"]
     git_url = dep["git"]
@@ -104,77 +646,170 @@ def fetch_single_dep(dep, cache_dir):
         "ref": ref,
         "direction": dep["direction"],
     }
+    timer = PhaseTimer()
+    result["timings"] = timer.timings
 
-    # Clone to temp dir, copy context files out, delete clone
-    tmp_dir = None
-    try:
-        tmp_dir = Path(tempfile.mkdtemp(prefix=f"deps-{project}-"))
-        repo_dir = tmp_dir / "repo"
-
-        # Sparse clone — downloads tree objects but no file blobs yet,
-        # and initializes sparse-checkout in cone mode (root files only)
-        clone_args = ["clone", "--depth", "1", "--filter=blob:none", "--sparse"]
-        if ref != "HEAD":
-            clone_args += ["--branch", ref]
-        clone_args += [git_url, str(repo_dir)]
-
-        ok, _, err = run_git(clone_args, timeout=120)
-        if not ok:
+    def git_failed(step, err):
+        if deadline is not None and time.monotonic() >= deadline:
+            result["status"] = "timed_out"
+            result["error"] = f"{step} did not finish before the deadline"
+        else:
             result["status"] = "error"
-            result["error"] = f"git clone failed: {err}"
-            return result
+            result["error"] = f"{step} failed: {err}"
+        return result
 
-        # Restrict checkout to only .project-context/ — triggers blob download
-        # for that directory only
-        ok, _, err = run_git(["sparse-checkout", "set", ".project-context"], cwd=repo_dir)
-        if not ok:
-            result["status"] = "error"
-            result["error"] = f"git sparse-checkout set failed: {err}"
-            return result
-
-        # Check if .project-context/ exists in cloned repo
-        cloned_context = repo_dir / ".project-context"
-        if not cloned_context.is_dir():
-            result["status"] = "no_context"
-            result["message"] = "Remote repository has no .project-context/ directory"
-            return result
-
-        # Collect context files (only files, skip subdirs like plans/)
-        context_files = [f.name for f in cloned_context.iterdir() if f.is_file()]
-        if not context_files:
-            result["status"] = "no_context"
-            result["message"] = ".project-context/ exists but contains no files"
-            return result
-
-        # Clear old cache and copy fresh files
-        if dep_cache.exists():
-            shutil.rmtree(dep_cache)
-        dep_cache.mkdir(parents=True)
-
-        for f in cloned_context.iterdir():
-            if f.is_file():
-                shutil.copy2(f, dep_cache / f.name)
-
-        # Write fetch metadata
-        fetched_at = datetime.now().isoformat()
-        meta = {
-            "project": project,
-            "git": git_url,
-            "ref": ref,
-            "fetched_at": fetched_at,
-            "files": context_files,
-        }
-        (dep_cache / META_FILENAME).write_text(json.dumps(meta, indent=2))
+    if deadline is not None and time.monotonic() >= deadline:
+        result["status"] = "timed_out"
+        result["error"] = "Deadline reached before fetch started"
+        return result
+
+    staged = None
+    try:
+        with cache_lock(cache_dir, deadline=deadline), dep_lock(cache_dir, project, deadline):
+            meta = read_meta(dep_cache)
+            if plans is None:
+                plans = (meta or {}).get("plan_patterns", [])
+            if lazy is None:
+                lazy = bool((meta or {}).get("lazy"))
+            cached = not force and _cache_is_current(meta, dep, ref, plans, lazy)
+            remote = None
+            if cached:
+                with timer.phase("check"):
+                    remote = remote_commit(git_url, ref, _time_left(deadline, GIT_TIMEOUT))
+            if cached and remote == meta["commit"]:
+                result["status"] = "up_to_date"
+                result["cached_path"] = str(dep_cache)
+                result["files"] = meta["files"]
+                result["commit"] = meta["commit"]
+                result["fetched_at"] = meta.get("fetched_at")
+                write_json_atomic(dep_cache / META_FILENAME, record_history(meta, result, timer.timings))
+                return result
+
+            # Update the shared mirror, then stream the context blobs into a
+            # staged version of the cache entry
+            with mirror_lock(mirror_path(git_url), deadline):
+                with timer.phase("mirror_fetch"):
+                    commit = None
+                    mirror, err = ensure_mirror(git_url, deadline)
+                    if mirror:
+                        # Mirror is locked, so the growth is this fetch's transfer
+                        objects_before, bytes_before = mirror_counts(mirror)
+                        commit, err = update_mirror(mirror, ref, deadline)
+                if not mirror:
+                    return git_failed("git init (mirror)", err)
+                if not commit:
+                    return git_failed("git fetch", err)
+
+                with timer.phase("list"):
+                    ok, tree, _ = run_git(["-C", str(mirror), "rev-parse", f"{commit}:.project-context"])
+                    blobs = context_blobs(mirror, commit, ["*"] if lazy else plans) if ok else {}
+                if not ok:
+                    result["status"] = "no_context"
+                    result["message"] = "Remote repository has no .project-context/ directory"
+                    return result
+
+                # New commit, same .project-context tree — keep the cached files
+                if cached and tree == meta.get("tree"):
+                    meta.update({"commit": commit, "checked_at": datetime.now().isoformat()})
+                    result["status"] = "up_to_date"
+                    result["cached_path"] = str(dep_cache)
+                    result["files"] = meta["files"]
+                    result["commit"] = commit
+                    result["fetched_at"] = meta.get("fetched_at")
+                    write_json_atomic(dep_cache / META_FILENAME, record_history(meta, result, timer.timings))
+                    return result
+
+                if not any("/" not in rel for rel in blobs):
+                    result["status"] = "no_context"
+                    result["message"] = ".project-context/ exists but contains no files"
+                    return result
+
+                deferred = {}
+                if lazy:
+                    on_demand = [rel for rel in (meta or {}).get("on_demand", []) if rel in blobs]
+                    keep = LAZY_EAGER_FILES.union(on_demand)
+                    deferred = {
+                        rel: oid for rel, oid in blobs.items()
+                        if rel not in keep and not (rel.startswith("plans/") and _plan_selected(rel[len("plans/"):], plans))
+                    }
+                    blobs = {rel: oid for rel, oid in blobs.items() if rel not in deferred}
+
+                # Context files: top-level only, plus selected plans/
+                context_files = [rel for rel in blobs if "/" not in rel]
+                plan_files = sorted(rel.split("/", 1)[1] for rel in blobs if "/" in rel)
+
+                with timer.phase("blobs"):
+                    missing = {oid for oid in blobs.values() if not blob_path(cache_dir, oid).exists()}
+                    ok, err = prefetch_blobs(mirror, missing, deadline) if missing else (True, None)
+                if not ok:
+                    return git_failed("git fetch (context blobs)", err)
+                objects_after, bytes_after = mirror_counts(mirror)
+                # Auto-repacking can shrink the mirror; never report negative transfer
+                result["objects_received"] = max(0, objects_after - objects_before)
+                result["bytes_received"] = max(0, bytes_after - bytes_before)
+
+                with timer.phase("write"):
+                    staged = stage_version(cache_dir, project)
+                    if plan_files:
+                        (staged / "plans").mkdir()
+                    bytes_written = 0
+                    with CatFileBatch(mirror) if missing else nullcontext() as cat:
+                        for rel, oid in blobs.items():
+                            bytes_written += link_blob(cache_dir, oid, staged / rel, cat)
+
+            # Write fetch metadata, then publish files + metadata together
+            fetched_at = datetime.now().isoformat()
+            history = (meta or {}).get("history", []) if (meta or {}).get("git") == git_url else []
+            result["status"] = "ok"
+            result["bytes_written"] = bytes_written
+            meta = {
+                "project": project,
+                "git": git_url,
+                "ref": ref,
+                "commit": commit,
+                "tree": tree,
+                "fetched_at": fetched_at,
+                "files": context_files,
+                "blobs": blobs,
+            }
+            if plans:
+                meta["plan_patterns"] = sorted(plans)
+            if plans or plan_files:
+                meta["plans"] = plan_files
+            if lazy:
+                meta["lazy"] = True
+                meta["deferred"] = deferred
+                meta["on_demand"] = on_demand
+            meta["history"] = history
+            record_history(meta, result, timer.timings)
+            with timer.phase("publish"):
+                (staged / META_FILENAME).write_text(json.dumps(meta, indent=2))
+                publish_version(cache_dir, project, staged)
+            staged = None
 
-        result["status"] = "ok"
         result["cached_path"] = str(dep_cache)
         result["files"] = context_files
+        if lazy:
+            result["deferred"] = sorted(deferred)
+        if plans:
+            result["plans"] = plan_files
+            missing = [p for p in plans if not any(_plan_selected(f, [p]) for f in plan_files)]
+            if missing:
+                result["missing_plans"] = missing
+        result["commit"] = commit
         result["fetched_at"] = fetched_at
 
+    except TimeoutError as e:
+        result["status"] = "timed_out"
+        result["error"] = str(e)
+    except OSError as e:
+        result["status"] = "error"
+        result["error"] = f"Writing context files failed: {e}"
+
     finally:
-        # Always clean up temp dir
-        if tmp_dir and tmp_dir.exists():
-            shutil.rmtree(tmp_dir, ignore_errors=True)
+        # Never-published staging dirs are removed
+        if staged is not None:
+            shutil.rmtree(staged, ignore_errors=True)
 
     return result
 
@@ -207,27 +842,272 @@ def cmd_fetch(args):
             }))
             return 1
 
-    cache_dir = get_cache_dir(context_dir)
-    results = []
+    if args.jobs < 1 or args.per_host < 1:
+        print(json.dumps({"error": "--jobs and --per-host must be at least 1"}))
+        return 1
 
-    for dep in git_deps:
-        result = fetch_single_dep(dep, cache_dir)
-        results.append(result)
+    if args.depth < 1:
+        print(json.dumps({"error": "--depth must be at least 1"}))
+        return 1
+
+    cache_dir = get_cache_dir(context_dir)
+    deadline = time.monotonic() + args.deadline if args.deadline else None
+    results, graph = fetch_graph(git_deps, cache_dir, args.depth, args.jobs, args.per_host, deadline,
+                                 args.force, args.plan, args.lazy)
+    # A --project run only sees part of the graph; keep the last full one
+    if not args.project:
+        store_graph(cache_dir, graph)
 
     ok_count = sum(1 for r in results if r["status"] == "ok")
+    up_to_date_count = sum(1 for r in results if r["status"] == "up_to_date")
     err_count = sum(1 for r in results if r["status"] == "error")
     no_ctx_count = sum(1 for r in results if r["status"] == "no_context")
+    timed_out_count = sum(1 for r in results if r["status"] == "timed_out")
 
-    print(json.dumps({
+    output = {
         "fetched": ok_count,
+        "up_to_date": up_to_date_count,
         "errors": err_count,
         "no_context": no_ctx_count,
+        "timed_out": timed_out_count,
         "total": len(results),
         "cache_dir": str(cache_dir),
         "results": results,
-    }, indent=2))
+    }
+    if args.depth > 1:
+        output["levels"] = graph["levels"]
+    eviction = auto_evict(context_dir, cache_dir, {r["project"] for r in results})
+    if eviction is not None:
+        output["eviction"] = eviction
+    print(json.dumps(output, indent=2))
+
+    return 0 if err_count == 0 and timed_out_count == 0 else 1
+
+
+def fetch_all(git_deps, cache_dir, jobs=DEFAULT_JOBS, per_host=DEFAULT_PER_HOST, deadline=None, force=False,
+              plans=None, lazy=None):
+    """Fetch deps on a bounded thread pool; results keep the input order.
+
+    At most `per_host` clones talk to the same host at once. Deps still
+    queued when the deadline passes come back as "timed_out", so the caller
+    always gets one result per dep.
+    """
+    host_slots = {host: threading.Semaphore(per_host) for host in {git_host(d["git"]) for d in git_deps}}
+
+    def worker(dep):
+        slot = host_slots[git_host(dep["git"])]
+        wait = None if deadline is None else max(0.0, deadline - time.monotonic())
+        if not slot.acquire(timeout=wait):
+            return {
+                "project": dep["project"],
+                "git": dep["git"],
+                "ref": dep.get("ref", "HEAD"),
+                "direction": dep["direction"],
+                "status": "timed_out",
+                "error": "Deadline reached while waiting for a per-host slot",
+            }
+        try:
+            # Entries sharing a project name serialize on its dep lock
+            return fetch_single_dep(dep, cache_dir, deadline, force, plans, lazy)
+        finally:
+            slot.release()
+
+    with ThreadPoolExecutor(max_workers=min(jobs, len(git_deps)) or 1) as pool:
+        return list(pool.map(worker, git_deps))
+
+
+def _cache_name(name, git_url, ref, taken):
+    """Cache directory name for a transitive dep: its own name unless unsafe or taken."""
+    safe = re.sub(r"[^A-Za-z0-9._@-]", "_", name or "").lstrip(".") or "dep"
+    if safe in taken:
+        safe = f"{safe}@{hashlib.sha256(f'{git_url}#{ref}'.encode()).hexdigest()[:8]}"
+    return safe
+
+
+def fetch_graph(git_deps, cache_dir, depth=1, jobs=DEFAULT_JOBS, per_host=DEFAULT_PER_HOST, deadline=None,
+                force=False, plans=None, lazy=None):
+    """Fetch direct git deps and, breadth-first, their upstream git deps.
+
+    Level 1 is `git_deps`; each further level (up to `depth`) comes from the
+    `upstream` git entries of the dependencies.json fetched at the previous
+    level. Deps are deduplicated by (url, ref); a transitive dep whose name
+    is already used by another (url, ref) is cached as <name>@<hash8>. Each
+    level is fetched in parallel with fetch_all. Returns (results, graph).
+    """
+    names = {}
+    taken = {d["project"] for d in git_deps}
+    edges = []
+    for dep in git_deps:
+        names.setdefault((dep["git"], dep.get("ref", "HEAD")), dep["project"])
+        edges.append([ROOT_NODE, dep["project"]])
+
+    nodes = {}
+    results = []
+    level_deps = git_deps
+    level = 1
+    while level_deps:
+        level_plans = plans if level == 1 else None
+        level_results = fetch_all(level_deps, cache_dir, jobs, per_host, deadline, force, level_plans, lazy)
+        for dep, result in zip(level_deps, level_results):
+            if level > 1:
+                result["level"] = level
+                result["via"] = dep["via"]
+            nodes[dep["project"]] = {
+                "git": dep["git"],
+                "ref": dep.get("ref", "HEAD"),
+                "level": level,
+                "status": result["status"],
+            }
+        results += level_results
+        levels = level
+        if level >= depth:
+            break
+
+        next_deps = []
+        for dep, result in zip(level_deps, level_results):
+            if result["status"] not in ("ok", "up_to_date"):
+                continue
+            for upstream in parse_git_deps(cache_dir / dep["project"]):
+                if upstream["direction"] != "upstream":
+                    continue
+                key = (upstream["git"], upstream.get("ref", "HEAD"))
+                if key not in names:
+                    name = _cache_name(upstream.get("project"), *key, taken)
+                    names[key] = name
+                    taken.add(name)
+                    next_deps.append({**upstream, "project": name, "via": dep["project"]})
+                edges.append([dep["project"], names[key]])
+        level_deps = next_deps
+        level += 1
+
+    graph = {
+        "depth": depth,
+        "levels": levels,
+        "resolved_at": datetime.now().isoformat(),
+        "nodes": nodes,
+        "edges": edges,
+    }
+    return results, graph
+
+
+def store_graph(cache_dir, graph):
+    """Save a full fetch's graph as .graph.json.
+
+    A fetch shallower than the stored graph only sees part of it, so its
+    nodes and edges are merged into the stored graph (which keeps its
+    depth) instead of replacing it; transitive caches found by the deeper
+    fetch then stay "declared" for eviction. A fetch at the same or a
+    greater depth replaces the graph.
+    """
+    path = cache_dir / GRAPH_FILENAME
+    try:
+        stored = json.loads(path.read_text())
+    except (OSError, json.JSONDecodeError, ValueError):
+        stored = None
+    if isinstance(stored, dict) and isinstance(stored.get("depth"), int) and stored["depth"] > graph["depth"]:
+        edges = graph["edges"] + [e for e in stored.get("edges", []) if e not in graph["edges"]]
+        graph = {
+            **graph,
+            "depth": stored["depth"],
+            "levels": max(stored.get("levels", 0), graph["levels"]),
+            "nodes": {**stored.get("nodes", {}), **graph["nodes"]},
+            "edges": edges,
+        }
+    write_json_atomic(path, graph)
+    return graph
+
+
+def get_file(context_dir, project, name, deadline=None):
+    """Path of a dep's context file, downloading it first if the fetch deferred it.
 
-    return 0 if err_count == 0 else 1
+    Also bumps the file's access time, which eviction uses as last-read.
+    Returns (payload, code).
+    """
+    cache_dir = context_dir / CACHE_DIR_NAME
+    dep_cache = cache_dir / project
+    meta = read_meta(dep_cache)
+    if not meta:
+        return {"error": f"No cache for '{project}'", "hint": "Run fetch first"}, 1
+    if Path(name).is_absolute() or ".." in Path(name).parts:
+        return {"error": f"Invalid file name '{name}'"}, 1
+
+    def lookup(meta):
+        for rel in (name, f"{name}.md"):
+            if rel in meta.get("deferred", {}) or (rel != META_FILENAME and (dep_cache / rel).is_file()):
+                return rel
+        return None
+
+    rel = lookup(meta)
+    if rel is None:
+        available = meta.get("files", []) + [f"plans/{p}" for p in meta.get("plans", [])]
+        return {"error": f"'{name}' is not in {project}'s .project-context/",
+                "available": sorted(available + list(meta.get("deferred", {})))}, 1
+
+    payload = {"project": project, "file": rel, "path": str(dep_cache / rel), "status": "cached"}
+    if rel in meta.get("deferred", {}):
+        try:
+            with cache_lock(cache_dir, deadline=deadline), dep_lock(cache_dir, project, deadline):
+                # Re-read under the lock: a fetch may have replaced the entry
+                meta = read_meta(dep_cache) or {}
+                rel = lookup(meta)
+                oid = meta.get("deferred", {}).get(rel) if rel else None
+                if oid:
+                    dest = dep_cache / rel
+                    dest.parent.mkdir(exist_ok=True)
+                    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.tmp")
+                    try:
+                        if blob_path(cache_dir, oid).exists():
+                            link_blob(cache_dir, oid, tmp)
+                        else:
+                            with mirror_lock(mirror_path(meta["git"]), deadline):
+                                mirror, err = ensure_mirror(meta["git"], deadline)
+                                if mirror:
+                                    ok, err = prefetch_blobs(mirror, [oid], deadline)
+                                if not mirror or not ok:
+                                    return {"error": f"git fetch ({rel}) failed: {err}"}, 1
+                                with CatFileBatch(mirror) as cat:
+                                    link_blob(cache_dir, oid, tmp, cat)
+                        os.replace(tmp, dest)
+                    finally:
+                        tmp.unlink(missing_ok=True)
+
+                    del meta["deferred"][rel]
+                    meta.setdefault("blobs", {})[rel] = oid
+                    if rel.startswith("plans/"):
+                        meta["plans"] = sorted(meta.get("plans", []) + [rel[len("plans/"):]])
+                    else:
+                        meta["files"] = meta.get("files", []) + [rel]
+                    meta["on_demand"] = meta.get("on_demand", []) + [rel]
+                    write_json_atomic(dep_cache / META_FILENAME, meta)
+                    payload["status"] = "fetched"
+        except TimeoutError as e:
+            return {"error": str(e)}, 1
+        except OSError as e:
+            return {"error": f"Writing {rel} failed: {e}"}, 1
+
+    path = dep_cache / rel
+    try:
+        stat = path.stat()
+        os.utime(path, (time.time(), stat.st_mtime))
+    except OSError as e:
+        return {"error": f"{rel} is not readable: {e}"}, 1
+    payload.setdefault("bytes", stat.st_size)
+    payload["file"] = rel
+    payload["path"] = str(path)
+    return payload, 0
+
+
+def cmd_get(args):
+    """Print the path of a dependency's context file, fetching it on first access."""
+    context_dir = find_context_dir(args.dir)
+    if not context_dir:
+        print(json.dumps({"error": "No .project-context/ directory found."}))
+        return 1
+
+    deadline = time.monotonic() + args.deadline if args.deadline else None
+    payload, code = get_file(context_dir, args.project, args.file, deadline)
+    print(json.dumps(payload, indent=2))
+    return code
 
 
 def cmd_status(args):
@@ -237,16 +1117,81 @@ def cmd_status(args):
         print(json.dumps({"error": "No .project-context/ directory found."}))
         return 1
 
+    result = fetch_stats(context_dir, args.top) if args.stats else cache_status(context_dir)
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+def _trend(history):
+    """Latest fetch time vs. the earlier ones: slower, faster, steady (or None)."""
+    fetches = [h["seconds"] for h in history if h.get("status") == "ok"]
+    if len(fetches) < 2:
+        return None
+    earlier = sum(fetches[:-1]) / len(fetches[:-1])
+    if earlier and fetches[-1] > earlier * (1 + TREND_THRESHOLD):
+        return "slower"
+    if earlier and fetches[-1] < earlier * (1 - TREND_THRESHOLD):
+        return "faster"
+    return "steady"
+
+
+def fetch_stats(context_dir, top=5):
+    """Slowest cached deps by their last full fetch, with phases and trend."""
+    cache_dir = context_dir / CACHE_DIR_NAME
+    deps = []
+    for item in cache_dir.iterdir() if cache_dir.is_dir() else []:
+        if item.name.startswith(".") or not item.is_dir():
+            continue
+        meta = read_meta(item) or {}
+        history = meta.get("history", [])
+        last = meta.get("last_fetch")
+        if not last:
+            continue
+        checks = [h["seconds"] for h in history if h.get("status") == "up_to_date"]
+        deps.append({
+            "project": item.name,
+            "last_fetch_seconds": last["seconds"],
+            "last_fetch_at": last["at"],
+            "slowest_phase": max(last["timings"], key=last["timings"].get) if last["timings"] else None,
+            "timings": last["timings"],
+            "objects_received": last.get("objects_received"),
+            "bytes_received": last.get("bytes_received"),
+            "bytes_written": last.get("bytes_written"),
+            "avg_check_seconds": round(sum(checks) / len(checks), 4) if checks else None,
+            "runs": len(history),
+            "trend": _trend(history),
+            "recent_seconds": [h["seconds"] for h in history if h.get("status") == "ok"],
+        })
+
+    deps.sort(key=lambda d: d["last_fetch_seconds"], reverse=True)
+    return {
+        "deps_with_stats": len(deps),
+        "total_last_fetch_seconds": round(sum(d["last_fetch_seconds"] for d in deps), 4),
+        "total_bytes_received": sum(d["bytes_received"] or 0 for d in deps),
+        "slowest": deps[:top],
+    }
+
+
+def cache_status(context_dir):
+    """Build the cache status payload for a .project-context/ directory."""
     cache_dir = context_dir / CACHE_DIR_NAME
     if not cache_dir.is_dir():
-        print(json.dumps({
+        return {
             "cached": 0,
             "message": "No .deps-cache/ directory — no git dependencies fetched yet"
-        }))
-        return 0
+        }
 
     git_deps = parse_git_deps(context_dir)
     git_dep_map = {d["project"]: d for d in git_deps}
+    graph = None
+    try:
+        graph = json.loads((cache_dir / GRAPH_FILENAME).read_text())
+    except (OSError, json.JSONDecodeError, ValueError):
+        pass
+    graph_nodes = graph.get("nodes", {}) if graph else {}
+    parents = {}
+    for parent, child in graph.get("edges", []) if graph else []:
+        parents.setdefault(child, []).append(parent)
 
     cached = []
     for item in cache_dir.iterdir():
@@ -259,17 +1204,25 @@ def cmd_status(args):
         if meta_file.exists():
             try:
                 meta = json.loads(meta_file.read_text())
+                meta.pop("history", None)  # see status --stats
+                if "deferred" in meta:
+                    meta["deferred"] = sorted(meta["deferred"])
                 entry.update(meta)
             except (json.JSONDecodeError, ValueError):
                 pass
 
-        # Check if still declared in dependencies.json
+        # Check if still declared in dependencies.json (or reached transitively)
         entry["declared"] = item.name in git_dep_map
+        if not entry["declared"] and graph_nodes.get(item.name, {}).get("level", 1) > 1:
+            entry["transitive"] = True
+            entry["via"] = parents.get(item.name, [])
 
         # List cached context files (excluding metadata)
         context_files = [f.name for f in item.iterdir() if f.is_file() and f.name != META_FILENAME]
         entry["has_context"] = len(context_files) > 0
         entry["context_files"] = context_files
+        if (item / "plans").is_dir():
+            entry["cached_plans"] = sorted(f.name for f in (item / "plans").iterdir() if f.is_file())
 
         cached.append(entry)
 
@@ -281,13 +1234,224 @@ def cmd_status(args):
         if d["project"] not in cached_names
     ]
 
-    print(json.dumps({
+    status = {
         "cached": len(cached),
         "not_fetched": len(not_fetched),
         "entries": cached,
         "missing": not_fetched,
-    }, indent=2))
-    return 0
+    }
+    if graph:
+        status["graph"] = graph
+    return status
+
+
+def parse_size(text):
+    """Bytes from "500000", "64K", "200M", "1.5G"."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([bkmg]?)i?b?\s*", str(text), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Invalid size '{text}' (use e.g. 500K, 200M, 1G)")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).lower()])
+
+
+def parse_age(text):
+    """Seconds from "30d", "12h", "90m", "2w"; a bare number is days."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhdw]?)\s*", str(text), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Invalid age '{text}' (use e.g. 30d, 12h, 2w)")
+    return float(match.group(1)) * AGE_UNITS[match.group(2).lower()]
+
+
+def read_cache_policy(context_dir):
+    """The "deps_cache" section of config.json as (policy, error); (None, None) when absent."""
+    config_file = context_dir / CONFIG_FILENAME
+    if not config_file.exists():
+        return None, None
+    try:
+        section = json.loads(config_file.read_text()).get("deps_cache")
+        if section is None:
+            return None, None
+        if not isinstance(section, dict):
+            raise ValueError('"deps_cache" must be an object')
+        policy = {
+            "max_size": parse_size(section["max_size"]) if section.get("max_size") is not None else None,
+            "older_than": parse_age(section["older_than"]) if section.get("older_than") is not None else None,
+            "undeclared": bool(section.get("undeclared", False)),
+        }
+    except (OSError, json.JSONDecodeError, AttributeError, ValueError) as e:
+        return None, f"{CONFIG_FILENAME}: {e}"
+    return policy, None
+
+
+def _inodes(path, into=None):
+    """{(dev, inode): [size, nlink, links seen]} for regular files under path, symlinks not followed."""
+    inodes = {} if into is None else into
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            st = os.lstat(os.path.join(dirpath, name))
+            if S_ISREG(st.st_mode):
+                info = inodes.setdefault((st.st_dev, st.st_ino), [st.st_size, st.st_nlink, 0])
+                info[2] += 1
+    return inodes
+
+
+def _timestamp(iso):
+    try:
+        return datetime.fromisoformat(iso).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def declared_names(context_dir, cache_dir):
+    """Cache names still in use: direct git deps plus what the stored graph reaches from them.
+
+    The stored graph keeps the nodes of the deepest full fetch (store_graph),
+    so a later shallower fetch does not make transitive caches undeclared.
+    """
+    names = {d["project"] for d in parse_git_deps(context_dir)}
+    try:
+        edges = json.loads((cache_dir / GRAPH_FILENAME).read_text()).get("edges", [])
+    except (OSError, json.JSONDecodeError, ValueError, AttributeError):
+        edges = []
+    queue = list(names)
+    while queue:
+        parent = queue.pop()
+        for edge_parent, child in edges:
+            if edge_parent == parent and child not in names:
+                names.add(child)
+                queue.append(child)
+    return names
+
+
+def cache_entries(cache_dir):
+    """Each dep entry in the cache with its last use time, plus total cache bytes.
+
+    An entry's bytes are what evicting it frees: files whose every link
+    (bar the blob store's) is inside the entry's versions. last_read is the
+    newest access time of the entry's files (not the metadata), so it only
+    moves on mounts that record atime; hardlinked files share it.
+    """
+    entries = []
+    versions = cache_dir / VERSIONS_DIR_NAME
+    stored = _inodes(cache_dir / BLOBS_DIR_NAME)
+    everything = {key: [size, nlink, 0] for key, (size, nlink, _) in stored.items()}
+    for item in cache_dir.iterdir():
+        if item.name.startswith(".") or not (item.is_symlink() or item.is_dir()):
+            continue
+        meta = read_meta(item) if item.is_dir() else None
+        fetched = _timestamp((meta or {}).get("fetched_at"))
+        last_read = 0.0
+        if item.is_dir():
+            for path in item.rglob("*"):
+                if path.name != META_FILENAME and path.is_file():
+                    last_read = max(last_read, path.stat().st_atime)
+        inodes = _inodes(versions / item.name)
+        if not item.is_symlink():
+            _inodes(item, inodes)  # legacy plain directory
+        everything.update(inodes)
+        size = sum(info[0] for key, info in inodes.items() if info[2] + (key in stored) >= info[1])
+        entries.append({
+            "project": item.name,
+            "bytes": size,
+            "fetched_at": fetched,
+            "last_read": last_read,
+            "last_used": max(fetched, last_read),
+            "broken": not item.is_dir(),
+        })
+    if versions.is_dir():
+        _inodes(versions, everything)
+    return entries, sum(info[0] for info in everything.values())
+
+
+def evict_cache(cache_dir, max_size=None, older_than=None, keep_names=None, protect=(), dry_run=False,
+                deadline=None):
+    """Evict cache entries by policy, least recently used first.
+
+    older_than: seconds since last use; keep_names: set of names still
+    declared (None disables the undeclared policy); max_size: bytes the
+    cache may keep, evicting the oldest entries until it fits. Entries in
+    `protect` are only evicted as undeclared. Broken links and version
+    dirs without an entry are always removed. Runs under the exclusive
+    cache-wide lock, so no fetch is mid-write.
+    """
+    with cache_lock(cache_dir, shared=False, deadline=deadline):
+        now = time.time()
+        entries, total = cache_entries(cache_dir)
+        entries.sort(key=lambda e: e["last_used"])
+        evicted = []
+        kept = []
+        for entry in entries:
+            name = entry["project"]
+            if entry["broken"]:
+                entry["reason"] = "broken"
+            elif keep_names is not None and name not in keep_names:
+                entry["reason"] = "undeclared"
+            elif older_than is not None and name not in protect and now - entry["last_used"] > older_than:
+                entry["reason"] = "older_than"
+            (evicted if "reason" in entry else kept).append(entry)
+
+        total -= sum(e["bytes"] for e in evicted)
+        if max_size is not None:
+            for entry in list(kept):
+                if total <= max_size:
+                    break
+                if entry["project"] in protect:
+                    continue
+                entry["reason"] = "max_size"
+                kept.remove(entry)
+                evicted.append(entry)
+                total -= entry["bytes"]
+
+        orphans = []
+        names = {e["project"] for e in kept}
+        versions = cache_dir / VERSIONS_DIR_NAME
+        for item in versions.iterdir() if versions.is_dir() else []:
+            if item.name not in names and item.name not in {e["project"] for e in evicted}:
+                orphans.append({"project": item.name, "bytes": sum(i[0] for i in _inodes(item).values()),
+                                "reason": "orphaned"})
+
+        blobs_removed = 0
+        if not dry_run:
+            for entry in evicted + orphans:
+                remove_dep_cache(cache_dir, entry["project"])
+            # Nobody holds or waits on dep locks while the cache lock is exclusive
+            locks = cache_dir / LOCKS_DIR_NAME
+            for lock in locks.glob("*.lock") if locks.is_dir() else []:
+                if lock.name[:-len(".lock")] not in names:
+                    lock.unlink(missing_ok=True)
+            blobs_removed, _ = gc_blobs(cache_dir)
+
+    report = []
+    for entry in evicted + orphans:
+        item = {"project": entry["project"], "reason": entry["reason"], "bytes": entry["bytes"]}
+        if entry.get("last_used"):
+            item["last_used"] = datetime.fromtimestamp(entry["last_used"]).isoformat(timespec="seconds")
+        report.append(item)
+    return {
+        "cleaned": len(report),
+        "freed_bytes": sum(e["bytes"] for e in report),
+        "kept": len(kept),
+        "cache_bytes": total,
+        "evicted": report,
+        "blobs_removed": blobs_removed,
+        "dry_run": dry_run,
+    }
+
+
+def auto_evict(context_dir, cache_dir, protect):
+    """Apply the config.json "deps_cache" policy after a fetch; None when unconfigured."""
+    policy, error = read_cache_policy(context_dir)
+    if error:
+        return {"error": error}
+    if not policy:
+        # Still drop blobs that replaced versions no longer link to
+        collect_blobs(cache_dir)
+        return None
+    keep_names = declared_names(context_dir, cache_dir) if policy["undeclared"] else None
+    try:
+        return evict_cache(cache_dir, policy["max_size"], policy["older_than"], keep_names, protect,
+                           deadline=time.monotonic() + EVICT_LOCK_WAIT)
+    except TimeoutError:
+        return {"skipped": "Another fetch is using the cache; eviction will run next time"}
 
 
 def cmd_clean(args):
@@ -298,26 +1462,49 @@ def cmd_clean(args):
         return 1
 
     cache_dir = context_dir / CACHE_DIR_NAME
+    policy = args.max_size is not None or args.older_than is not None or args.undeclared
+    if policy and args.project:
+        print(json.dumps({"error": "--project cannot be combined with --max-size, --older-than or --undeclared"}))
+        return 1
+    if args.dry_run and not policy:
+        print(json.dumps({"error": "--dry-run needs --max-size, --older-than or --undeclared"}))
+        return 1
+    try:
+        max_size = parse_size(args.max_size) if args.max_size is not None else None
+        older_than = parse_age(args.older_than) if args.older_than is not None else None
+    except ValueError as e:
+        print(json.dumps({"error": str(e)}))
+        return 1
+
     if not cache_dir.is_dir():
         print(json.dumps({"cleaned": 0, "message": "No cache to clean"}))
         return 0
 
-    if args.project:
+    if policy:
+        keep_names = declared_names(context_dir, cache_dir) if args.undeclared else None
+        print(json.dumps(evict_cache(cache_dir, max_size, older_than, keep_names, dry_run=args.dry_run), indent=2))
+    elif args.project:
         # Clean specific project
         dep_cache = cache_dir / args.project
-        if dep_cache.is_dir():
-            shutil.rmtree(dep_cache)
+        if dep_cache.is_symlink() or dep_cache.is_dir():
+            with cache_lock(cache_dir), dep_lock(cache_dir, args.project):
+                remove_dep_cache(cache_dir, args.project)
+            collect_blobs(cache_dir)
             print(json.dumps({"cleaned": 1, "project": args.project}))
         else:
             print(json.dumps({"cleaned": 0, "error": f"No cache for '{args.project}'"}))
             return 1
     else:
-        # Clean all
+        # Clean all — waits for running fetches to finish
         count = 0
-        for item in cache_dir.iterdir():
-            if item.is_dir() and not item.name.startswith("."):
-                shutil.rmtree(item)
-                count += 1
+        with cache_lock(cache_dir, shared=False):
+            for item in cache_dir.iterdir():
+                if not item.name.startswith(".") and (item.is_symlink() or item.is_dir()):
+                    remove_dep_cache(cache_dir, item.name)
+                    count += 1
+            shutil.rmtree(cache_dir / VERSIONS_DIR_NAME, ignore_errors=True)
+            shutil.rmtree(cache_dir / BLOBS_DIR_NAME, ignore_errors=True)
+            (cache_dir / GRAPH_FILENAME).unlink(missing_ok=True)
         print(json.dumps({"cleaned": count}))
 
     return 0
@@ -331,20 +1518,48 @@ def main():
     fetch_parser = subparsers.add_parser("fetch", help="Fetch/update git dependency contexts")
     fetch_parser.add_argument("--dir", default=".", help="Project root directory")
     fetch_parser.add_argument("--project", help="Fetch only this project (by name)")
+    fetch_parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help="Parallel fetches")
+    fetch_parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST, help="Max concurrent fetches per git host")
+    fetch_parser.add_argument("--deadline", type=float, help="Overall time limit in seconds; unfinished deps report timed_out")
+    fetch_parser.add_argument("--force", action="store_true", help="Re-fetch even if the remote commit is unchanged")
+    fetch_parser.add_argument("--depth", type=int, default=1,
+                              help="Also fetch upstream git deps of fetched deps, up to N levels (default 1: direct only)")
+    fetch_parser.add_argument("--plan", action="append", metavar="NAME",
+                              help="Also fetch plans/NAME (glob allowed, repeatable); remembered for later fetches")
+    mode = fetch_parser.add_mutually_exclusive_group()
+    mode.add_argument("--lazy", dest="lazy", action="store_const", const=True,
+                      help="Fetch only summary files now; the rest on first `get` (remembered per dep)")
+    mode.add_argument("--eager", dest="lazy", action="store_const", const=False,
+                      help="Fetch every context file (undoes --lazy)")
+
+    # get command
+    get_parser = subparsers.add_parser("get", help="Path of a dependency context file, fetched on first access")
+    get_parser.add_argument("project", help="Dependency (cache) name")
+    get_parser.add_argument("file", help="File in its .project-context/, e.g. patterns.md or plans/auth-flow.md")
+    get_parser.add_argument("--dir", default=".", help="Project root directory")
+    get_parser.add_argument("--deadline", type=float, help="Time limit in seconds")
 
     # status command
     status_parser = subparsers.add_parser("status", help="Show cached dependency status")
     status_parser.add_argument("--dir", default=".", help="Project root directory")
+    status_parser.add_argument("--stats", action="store_true", help="Slowest deps with phase timings and trend")
+    status_parser.add_argument("--top", type=int, default=5, help="Number of deps in --stats")
 
     # clean command
     clean_parser = subparsers.add_parser("clean", help="Remove cached dependencies")
     clean_parser.add_argument("--dir", default=".", help="Project root directory")
     clean_parser.add_argument("--project", help="Clean only this project cache")
+    clean_parser.add_argument("--max-size", metavar="SIZE", help="Evict least recently used entries until the cache fits (e.g. 200M)")
+    clean_parser.add_argument("--older-than", metavar="AGE", help="Evict entries not fetched or read within AGE (e.g. 30d, 12h)")
+    clean_parser.add_argument("--undeclared", action="store_true",
+                              help="Evict entries no longer declared in dependencies.json or reached via the dep graph")
+    clean_parser.add_argument("--dry-run", action="store_true", help="Report what the policy would evict without removing it")
 
     args = parser.parse_args()
 
     commands = {
         "fetch": cmd_fetch,
+        "get": cmd_get,
         "status": cmd_status,
         "clean": cmd_clean,
     }
@@ -6,17 +6,41 @@ Replaces fragile sed operations with reliable Python-based file management.
 Usage:
     python manage_context.py status [--dir DIR]
     python manage_context.py validate [--dir DIR]
-    python manage_context.py update-sections [--file FILE]
+    python manage_context.py update-sections [--file FILE | --recursive [--root DIR]]
     python manage_context.py deps [--dir DIR]
+    python manage_context.py batch [COMMAND ...] [--json ARRAY] [--dir DIR]
+    python manage_context.py digest [--dir DIR] [--max-tokens N] [--focus TEXT] [--no-cache]
+    python manage_context.py propagate-plan [--dir DIR] [--record]
+    python manage_context.py snapshot [--dir DIR] [--label LABEL] [--list]
+    python manage_context.py diff [A] [B] [--dir DIR] [--patch]
+    python manage_context.py gc [--dir DIR] [--keep N]
+
+The status, validate and deps commands can also be served by a warm local
+daemon — see context_daemon.py.
 """
 
 import argparse
+import copy
+import difflib
+import hashlib
 import json
+import os
 import re
+import subprocess
 import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from mermaid_lint import lint_markdown
+
+try:
+    import fcntl
+except ImportError:  # Windows — no cross-process locking
+    fcntl = None
+
 
 CONTEXT_FILES = ["brief.md", "architecture.md", "state.md", "progress.md", "patterns.md", "dependencies.json"]
 
@@ -29,9 +53,50 @@ STALENESS_DAYS = {
     "dependencies.json": 30,
 }
 
+LOCAL_CACHE_DIR_NAME = ".cache"
+
+# Local files in the digest, most useful first (state.md answers "where are we?")
+DIGEST_LOCAL_FILES = ["state.md", "brief.md", "architecture.md", "patterns.md", "progress.md"]
+# Dependency files the agent may load — never a dependency's state.md or progress.md
+DIGEST_DEP_FILES = ["brief.md", "architecture.md"]
+DIGEST_MAX_DEPS = 2
+DEFAULT_DIGEST_TOKENS = 2000
+DIGEST_CACHE_VERSION = 2
+TOKEN_CACHE_VERSION = 2
+GIT_TIMES_CACHE_VERSION = 1
+
+# Optional per-project settings, e.g. {"token_budgets": {"total": 8000,
+# "default": 3000, "files": {"state.md": 600}}}
+CONFIG_FILENAME = "config.json"
+
+# Content-addressed snapshot store: objects/<ab>/<sha256 rest> + manifests/<id>.json
+SNAPSHOT_DIR_NAME = ".snapshots"
+
+# Relevance table from update/references/propagation-workflow.md: a changed
+# file matters downstream when the dependency's `what` mentions one of these.
+PROPAGATION_KEYWORDS = {
+    "architecture.md": ["api", "endpoint", "schema", "interface", "contract", "integration", "architecture", "structure"],
+    "brief.md": ["requirement", "goal", "scope", "vision", "purpose"],
+    "patterns.md": ["pattern", "convention", "standard", "practice"],
+    "progress.md": ["milestone"],
+    "state.md": [],
+}
+PROPAGATION_LABEL = "propagated"
+PROPAGATION_EXCERPT_CHARS = 400
+_STOPWORDS = {"and", "the", "for", "with", "from", "into", "our", "their", "all", "any", "via", "etc"}
+
 MANAGED_SECTION_START = "<!-- PROJECT-CONTEXT:START -->"
 MANAGED_SECTION_END = "<!-- PROJECT-CONTEXT:END -->"
 
+MANAGED_SECTION_RE = re.compile(
+    re.escape(MANAGED_SECTION_START) + r".*?" + re.escape(MANAGED_SECTION_END),
+    re.DOTALL
+)
+
+MANAGED_FILENAMES = ("CLAUDE.md", "AGENTS.md")
+# Directories never searched by update-sections --recursive
+RECURSIVE_SKIP_DIRS = {".git", ".hg", ".svn", "node_modules", ".venv", "venv", "__pycache__", ".deps-cache", ".cache", ".snapshots", ".tox"}
+
 CLAUDE_MANAGED_CONTENT = """
 <!-- PROJECT-CONTEXT:START -->
 ## Project Context
@@ -71,6 +136,218 @@ def find_context_dir(start_dir="."):
     return None
 
 
+def get_local_cache_dir(context_dir):
+    """Get or create .project-context/.cache/ for derived, regenerable data."""
+    cache_dir = context_dir / LOCAL_CACHE_DIR_NAME
+    cache_dir.mkdir(exist_ok=True)
+
+    gitignore = cache_dir / ".gitignore"
+    if not gitignore.exists():
+        gitignore.write_text("# Auto-generated — derived data from manage_context.py\n*\n!.gitignore\n")
+
+    return cache_dir
+
+
+# Pre-tokenizer pieces, modelled on BPE tokenizers: a word with its leading
+# space, up to 3 digits, a punctuation run, or a whitespace run.
+_TOKEN_PIECE_RE = re.compile(r" ?[A-Za-z]+| ?\d{1,3}| ?[^\sA-Za-z\d]+|\s+")
+
+
+def estimate_tokens(text):
+    """Estimate the BPE token count of text without a tokenizer.
+
+    Piece model: an ASCII word costs one token per 8 letters (common words
+    are a single token), a digit group one token, punctuation one token per
+    2 characters, non-ASCII one per character, and a whitespace run — other
+    than a word's leading space — one token.
+    """
+    tokens = 0
+    for piece in _TOKEN_PIECE_RE.findall(text):
+        core = piece[1:] if len(piece) > 1 and piece[0] == " " else piece
+        if core.isspace():
+            tokens += 1
+        elif core.isascii() and core.isalpha():
+            tokens += 1 + (len(core) - 1) // 8
+        elif core[0].isdigit():
+            tokens += 1
+        else:
+            ascii_chars = sum(1 for c in core if c.isascii())
+            tokens += (ascii_chars + 1) // 2 + len(core) - ascii_chars
+    return tokens
+
+
+def split_sections(text):
+    """Split Markdown into [(heading, text)] sections.
+
+    Sections are keyed by their heading line; text before the first heading
+    is "(preamble)". Headings inside fenced blocks are ignored, and repeated
+    headings get a " (2)", " (3)"... suffix so keys stay unique.
+    """
+    sections = []
+    title, lines, in_fence = "(preamble)", [], False
+    for line in text.splitlines(keepends=True):
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        elif not in_fence and re.match(r"#{1,6}\s", line):
+            if lines:
+                sections.append((title, "".join(lines)))
+            title, lines = line.strip(), []
+        lines.append(line)
+    if lines:
+        sections.append((title, "".join(lines)))
+
+    seen = {}
+    unique = []
+    for title, body in sections:
+        seen[title] = seen.get(title, 0) + 1
+        unique.append((title if seen[title] == 1 else f"{title} ({seen[title]})", body))
+    return unique
+
+
+def token_profile(text):
+    """Estimated tokens for a whole file and for each Markdown section."""
+    return {
+        "tokens": estimate_tokens(text),
+        "sections": {title: estimate_tokens(body) for title, body in split_sections(text)},
+    }
+
+
+def _find_git_repo(start):
+    """Return (worktree root, git dir, common dir) for the repo containing start."""
+    for directory in [start, *start.parents]:
+        dot_git = directory / ".git"
+        if dot_git.is_dir():
+            return directory, dot_git, dot_git
+        if dot_git.is_file():
+            # Linked worktree or submodule: ".git" points at the real git dir
+            text = dot_git.read_text().strip()
+            if not text.startswith("gitdir:"):
+                return None
+            git_dir = (directory / text[len("gitdir:"):].strip()).resolve()
+            common_dir = git_dir
+            if (git_dir / "commondir").is_file():
+                common_dir = (git_dir / (git_dir / "commondir").read_text().strip()).resolve()
+            return directory, git_dir, common_dir
+    return None
+
+
+def _read_git_head(git_dir, common_dir):
+    """Resolve HEAD to a commit SHA by reading ref files — no git process."""
+    head = (git_dir / "HEAD").read_text().strip()
+    if not head.startswith("ref:"):
+        return head
+    ref = head[len("ref:"):].strip()
+    for base in (git_dir, common_dir):
+        if (base / ref).is_file():
+            return (base / ref).read_text().strip()
+    packed = common_dir / "packed-refs"
+    if packed.is_file():
+        for line in packed.read_text().splitlines():
+            parts = line.split()
+            if len(parts) == 2 and parts[1] == ref:
+                return parts[0]
+    return None
+
+
+def _git(args, cwd):
+    """Run git and return stdout, or None on failure."""
+    try:
+        result = subprocess.run(["git"] + args, cwd=cwd, capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return result.stdout if result.returncode == 0 else None
+
+
+def _scan_commit_times(root, paths):
+    """Last commit time per path from ONE `git log` over all paths.
+
+    Stops reading as soon as every path has been seen, so a long history
+    is not walked further than the oldest of the latest touches.
+    """
+    times = {}
+    try:
+        proc = subprocess.Popen(
+            ["git", "-c", "core.quotepath=off", "log", "--format=@%ct", "--name-only", "--", *paths],
+            cwd=root, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+        )
+    except OSError:
+        return times
+    wanted = set(paths)
+    commit_time = None
+    for line in proc.stdout:
+        line = line.rstrip("\n")
+        if line.startswith("@"):
+            commit_time = int(line[1:])
+        elif line in wanted and line not in times:
+            times[line] = commit_time
+            if len(times) == len(wanted):
+                break
+    proc.kill()
+    proc.wait()
+    return times
+
+
+def git_modified_times(snapshot):
+    """Last commit time of each context file, cached per HEAD commit.
+
+    Filesystem mtimes are reset by clones and checkouts, so staleness is
+    taken from history instead. Files that are untracked, uncommitted-dirty,
+    or edited since the cache was built are omitted (callers fall back to
+    mtime). Returns {} outside a git repository.
+    """
+    context_dir = snapshot.context_dir.resolve()
+    try:
+        repo = _find_git_repo(context_dir)
+        if not repo:
+            return {}
+        root, git_dir, common_dir = repo
+        head = _read_git_head(git_dir, common_dir)
+    except OSError:
+        return {}
+    if not head:
+        head = (_git(["rev-parse", "HEAD"], root) or "").strip()
+        if not head:
+            return {}
+
+    def _stat_key(fname):
+        stat = snapshot.stat(fname)
+        return [stat.st_mtime_ns, stat.st_size] if stat else None
+
+    cache_file = snapshot.context_dir / LOCAL_CACHE_DIR_NAME / "git-times.json"
+    try:
+        cache = json.loads(cache_file.read_text())
+        if cache.get("version") != GIT_TIMES_CACHE_VERSION or cache.get("head") != head:
+            cache = None
+    except (OSError, json.JSONDecodeError, ValueError):
+        cache = None
+
+    if cache is None:
+        rel = context_dir.relative_to(root).as_posix()
+        paths = {f"{rel}/{fname}" if rel != "." else fname: fname for fname in CONTEXT_FILES}
+        scanned = _scan_commit_times(root, list(paths))
+        dirty = set()
+        porcelain = _git(["-c", "core.quotepath=off", "status", "--porcelain", "--", *paths], root)
+        for line in (porcelain or "").splitlines():
+            dirty.add(line[3:])
+        cache = {
+            "version": GIT_TIMES_CACHE_VERSION,
+            "head": head,
+            "times": {paths[p]: t for p, t in scanned.items() if p not in dirty},
+            # Stat at scan time: a later edit changes it and drops the entry
+            "stats": {fname: _stat_key(fname) for fname in CONTEXT_FILES},
+        }
+        try:
+            get_local_cache_dir(snapshot.context_dir)
+            cache_file.write_text(json.dumps(cache))
+        except OSError:
+            pass
+
+    return {
+        fname: commit_time for fname, commit_time in cache["times"].items()
+        if cache["stats"].get(fname) == _stat_key(fname)
+    }
+
+
 def parse_dependencies(context_dir):
     """Parse dependencies.json and return structured dependency data.
 
@@ -79,9 +356,13 @@ def parse_dependencies(context_dir):
     deps_file = context_dir / "dependencies.json"
     if not deps_file.exists():
         return None
+    return _parse_dependencies_text(deps_file.read_text())
 
+
+def _parse_dependencies_text(text):
+    """Parse dependencies.json content, or return None if it is invalid."""
     try:
-        data = json.loads(deps_file.read_text())
+        data = json.loads(text)
     except (json.JSONDecodeError, ValueError):
         return None
 
@@ -92,57 +373,178 @@ def parse_dependencies(context_dir):
     }
 
 
+class ContextSnapshot:
+    """Lazily loaded view of a project's .project-context/ directory.
+
+    Each file is stat'ed and read at most once per snapshot, so several
+    commands run against the same snapshot share the parsed state instead of
+    re-reading the context files and dependencies.json.
+    """
+
+    def __init__(self, project_dir="."):
+        self.project_dir = Path(project_dir)
+        self.context_dir = find_context_dir(project_dir)
+        self._stats = {}
+        self._texts = {}
+        self._plans = None
+        self._dependencies_loaded = False
+        self._dependencies = None
+        self._config = None
+        self._token_profiles = None
+
+    def stat(self, name):
+        """Return os.stat_result for a context-relative path, or None if missing."""
+        if name not in self._stats:
+            try:
+                self._stats[name] = (self.context_dir / name).stat()
+            except OSError:
+                self._stats[name] = None
+        return self._stats[name]
+
+    def exists(self, name):
+        return self.stat(name) is not None
+
+    def read_text(self, name):
+        """Return the content of a context-relative path (cached)."""
+        if name not in self._texts:
+            self._texts[name] = (self.context_dir / name).read_text()
+        return self._texts[name]
+
+    @property
+    def plans(self):
+        """Names of plan files in plans/ (cached)."""
+        if self._plans is None:
+            plans_dir = self.context_dir / "plans"
+            self._plans = [f.name for f in plans_dir.glob("*.md")] if plans_dir.is_dir() else []
+        return self._plans
+
+    @property
+    def dependencies(self):
+        """Parsed dependencies.json (see parse_dependencies), loaded on first use."""
+        if not self._dependencies_loaded:
+            self._dependencies_loaded = True
+            if self.exists("dependencies.json"):
+                self._dependencies = _parse_dependencies_text(self.read_text("dependencies.json"))
+        return self._dependencies
+
+    @property
+    def config(self):
+        """Parsed config.json as (config, error) — ({}, None) when absent."""
+        if self._config is None:
+            self._config = ({}, None)
+            if self.exists(CONFIG_FILENAME):
+                try:
+                    data = json.loads(self.read_text(CONFIG_FILENAME))
+                    if not isinstance(data, dict):
+                        raise ValueError("top level must be an object")
+                    self._config = (data, None)
+                except (json.JSONDecodeError, ValueError) as e:
+                    self._config = ({}, str(e))
+        return self._config
+
+    def token_profiles(self):
+        """token_profile() of each existing context file, cached by mtime/size.
+
+        Profiles persist in .cache/tokens.json, so unchanged files are not
+        re-read or re-estimated on later runs.
+        """
+        if self._token_profiles is not None:
+            return self._token_profiles
+
+        cache_file = self.context_dir / LOCAL_CACHE_DIR_NAME / "tokens.json"
+        entries = {}
+        try:
+            cache = json.loads(cache_file.read_text())
+            if cache.get("version") == TOKEN_CACHE_VERSION:
+                entries = cache["files"]
+        except (OSError, json.JSONDecodeError, ValueError, KeyError, AttributeError):
+            pass
+
+        profiles = {}
+        dirty = False
+        for fname in CONTEXT_FILES:
+            stat = self.stat(fname)
+            if stat is None:
+                continue
+            entry = entries.get(fname)
+            if not entry or entry.get("mtime_ns") != stat.st_mtime_ns or entry.get("size") != stat.st_size:
+                entry = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, **token_profile(self.read_text(fname))}
+                dirty = True
+            profiles[fname] = entry
+
+        if dirty or set(entries) != set(profiles):
+            try:
+                cache_file = get_local_cache_dir(self.context_dir) / "tokens.json"
+                cache_file.write_text(json.dumps({"version": TOKEN_CACHE_VERSION, "files": profiles}))
+            except OSError:
+                pass  # read-only checkout — estimates are still returned
+
+        self._token_profiles = profiles
+        return profiles
+
+
 def cmd_status(args):
     """Show current project context status."""
-    context_dir = find_context_dir(args.dir)
+    result, code = status_report(ContextSnapshot(args.dir))
+    print(json.dumps(result, indent=2))
+    return code
+
+
+def status_report(snapshot):
+    """Build the status payload for a snapshot. Returns (result, exit_code)."""
+    context_dir = snapshot.context_dir
     if not context_dir:
-        print(json.dumps({
+        return {
             "exists": False,
             "message": "No .project-context/ directory found. Run /project-context:init to create."
-        }))
-        return 1
+        }, 1
 
     now = datetime.now()
     files = {}
     missing = []
+    profiles = snapshot.token_profiles()
+    commit_times = git_modified_times(snapshot)
 
     for fname in CONTEXT_FILES:
-        fpath = context_dir / fname
-        if fpath.exists():
-            stat = fpath.stat()
-            mtime = datetime.fromtimestamp(stat.st_mtime)
+        stat = snapshot.stat(fname)
+        if stat is not None:
+            if fname in commit_times:
+                mtime, source = datetime.fromtimestamp(commit_times[fname]), "git"
+            else:
+                mtime, source = datetime.fromtimestamp(stat.st_mtime), "mtime"
             age_days = (now - mtime).days
             stale_threshold = STALENESS_DAYS.get(fname, 7)
             is_stale = age_days > stale_threshold
-            size_lines = len(fpath.read_text().splitlines())
+            size_lines = len(snapshot.read_text(fname).splitlines())
 
             files[fname] = {
                 "exists": True,
                 "lines": size_lines,
                 "last_modified": mtime.isoformat(),
+                "modified_source": source,
                 "age_days": age_days,
                 "stale": is_stale,
                 "stale_threshold_days": stale_threshold,
+                "tokens": profiles[fname]["tokens"],
+                "sections": profiles[fname]["sections"],
             }
         else:
             missing.append(fname)
             files[fname] = {"exists": False}
 
     # Check for plans
-    plans_dir = context_dir / "plans"
-    plans = []
-    if plans_dir.is_dir():
-        plans = [f.name for f in plans_dir.glob("*.md")]
+    plans = list(snapshot.plans)
 
     # Parse dependencies if present
-    deps = parse_dependencies(context_dir)
+    deps = snapshot.dependencies
 
     # Determine suggested next action
-    next_action = _determine_next_action(files, plans, context_dir)
+    next_action = _determine_next_action(files, plans, snapshot)
 
     result = {
         "exists": True,
         "files": files,
+        "total_tokens": sum(p["tokens"] for p in profiles.values()),
         "missing": missing,
         "plans": plans,
         "next_action": next_action,
@@ -167,18 +569,11 @@ def cmd_status(args):
             result["dependencies"]["git_cached"] = cached
             result["dependencies"]["git_not_cached"] = [d["project"] for d in git_deps if d["project"] not in cached]
 
-    print(json.dumps(result, indent=2))
-    return 0
+    return result, 0
 
 
-def _determine_next_action(files, plans, context_dir):
+def _determine_next_action(files, plans, snapshot):
     """Determine what the user should do next (used by /project-context:next)."""
-    # Check if state.md exists and has content
-    state_file = context_dir / "state.md"
-    state_content = ""
-    if state_file.exists():
-        state_content = state_file.read_text()
-
     # Missing critical files
     missing_critical = [f for f in ["brief.md", "architecture.md"] if not files.get(f, {}).get("exists")]
     if missing_critical:
@@ -192,8 +587,7 @@ def _determine_next_action(files, plans, context_dir):
     if plans:
         # Look for plans with "Planning" status
         for plan_name in plans:
-            plan_path = context_dir / "plans" / plan_name
-            content = plan_path.read_text()
+            content = snapshot.read_text(f"plans/{plan_name}")
             if "**Status:** Planning" in content:
                 return {"action": "implement", "reason": f"Plan '{plan_name}' is ready for implementation", "plan": plan_name}
 
@@ -208,16 +602,21 @@ def _determine_next_action(files, plans, context_dir):
 
 def cmd_validate(args):
     """Validate project context files."""
-    context_dir = find_context_dir(args.dir)
+    result, code = validate_report(ContextSnapshot(args.dir))
+    print(json.dumps(result, indent=2))
+    return code
+
+
+def validate_report(snapshot):
+    """Build the validation payload for a snapshot. Returns (result, exit_code)."""
+    context_dir = snapshot.context_dir
     if not context_dir:
-        print(json.dumps({"valid": False, "error": "No .project-context/ directory found."}))
-        return 1
+        return {"valid": False, "error": "No .project-context/ directory found."}, 1
 
     issues = []
 
     for fname in CONTEXT_FILES:
-        fpath = context_dir / fname
-        if not fpath.exists():
+        if not snapshot.exists(fname):
             # dependencies.md is optional
             if fname == "dependencies.json":
                 continue
@@ -227,7 +626,7 @@ def cmd_validate(args):
                 issues.append({"file": fname, "severity": "error", "message": f"{fname} missing — critical context file"})
             continue
 
-        content = fpath.read_text()
+        content = snapshot.read_text(fname)
 
         # JSON file validation (dependencies.json)
         if fname.endswith(".json"):
@@ -267,10 +666,34 @@ def cmd_validate(args):
             if "```mermaid" not in content:
                 issues.append({"file": fname, "severity": "warning", "message": "architecture.md has no Mermaid diagrams"})
 
+        # Mermaid syntax, checked offline (see mermaid_lint.py)
+        if "mermaid" in content:
+            for diagram in lint_markdown(content):
+                for error in diagram["errors"]:
+                    # Unrecognized syntax may be newer Mermaid; only certain errors fail validation
+                    kind = "syntax error" if error["severity"] == "error" else "unrecognized syntax"
+                    issues.append({
+                        "file": fname,
+                        "severity": error["severity"],
+                        "message": f"Mermaid {kind} at line {error['line']}, column {error['column']}: {error['message']}",
+                        "line": error["line"],
+                        "column": error["column"],
+                    })
+
+    # Token budgets from config.json
+    config, config_error = snapshot.config
+    if config_error:
+        issues.append({"file": CONFIG_FILENAME, "severity": "error", "message": f"{CONFIG_FILENAME} is invalid: {config_error}"})
+    budgets = config.get("token_budgets")
+    budget_error = _budget_config_error(budgets)
+    if budget_error:
+        issues.append({"file": CONFIG_FILENAME, "severity": "error", "message": f"{CONFIG_FILENAME} is invalid: {budget_error}"})
+    else:
+        issues.extend(_budget_issues(snapshot, budgets or {}))
+
     # Validate dependency entries if present
-    deps = parse_dependencies(context_dir)
+    deps = snapshot.dependencies
     if deps:
-        project_root = Path(args.dir).resolve()
         all_deps = deps["upstream"] + deps["downstream"]
         for dep in all_deps:
             if "git" in dep:
@@ -324,26 +747,106 @@ def cmd_validate(args):
                 })
 
     # Check plans directory
-    plans_dir = context_dir / "plans"
-    if plans_dir.is_dir():
-        for plan_file in plans_dir.glob("*.md"):
-            content = plan_file.read_text()
-            # Check for executable task format
-            if "**Action:**" not in content and "- **Action:**" not in content:
-                issues.append({"file": f"plans/{plan_file.name}", "severity": "info", "message": "Plan lacks executable task format (Action/Verify/Done)"})
+    for plan_name in snapshot.plans:
+        content = snapshot.read_text(f"plans/{plan_name}")
+        # Check for executable task format
+        if "**Action:**" not in content and "- **Action:**" not in content:
+            issues.append({"file": f"plans/{plan_name}", "severity": "info", "message": "Plan lacks executable task format (Action/Verify/Done)"})
 
     valid = not any(i["severity"] == "error" for i in issues)
-    print(json.dumps({"valid": valid, "issues": issues}, indent=2))
-    return 0 if valid else 1
+    return {"valid": valid, "issues": issues}, 0 if valid else 1
 
 
-def cmd_update_sections(args):
-    """Update managed sections in CLAUDE.md or AGENTS.md."""
-    file_path = Path(args.file)
-    if not file_path.exists():
-        print(json.dumps({"updated": False, "reason": f"{args.file} not found"}))
-        return 1
+def _budget_config_error(budgets):
+    """Why a "token_budgets" config value is unusable, or None if it is fine (or absent)."""
+    def positive_int(value):
+        return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+    if budgets is None:
+        return None
+    if not isinstance(budgets, dict):
+        return '"token_budgets" must be an object'
+    for key in ("default", "total"):
+        if budgets.get(key) is not None and not positive_int(budgets[key]):
+            return f'"token_budgets.{key}" must be a positive integer'
+    files = budgets.get("files", {})
+    if not isinstance(files, dict):
+        return '"token_budgets.files" must be an object'
+    for fname, limit in files.items():
+        if not positive_int(limit):
+            return f'"token_budgets.files.{fname}" must be a positive integer'
+    return None
+
+
+def _budget_issues(snapshot, budgets):
+    """Errors for context files (or their total) over the configured token budgets."""
+    if not budgets:
+        return []
 
+    issues = []
+    profiles = snapshot.token_profiles()
+    file_budgets = budgets.get("files", {})
+    for fname, profile in profiles.items():
+        limit = file_budgets.get(fname, budgets.get("default"))
+        if limit and profile["tokens"] > limit:
+            largest = max(profile["sections"].items(), key=lambda item: item[1])
+            issues.append({
+                "file": fname,
+                "severity": "error",
+                "message": f"{fname} is ~{profile['tokens']} tokens, over its {limit}-token budget "
+                           f"(largest section: {largest[0]} ~{largest[1]}) — run /project-context:optimize",
+            })
+
+    total = sum(p["tokens"] for p in profiles.values())
+    if budgets.get("total") and total > budgets["total"]:
+        issues.append({
+            "file": "*",
+            "severity": "error",
+            "message": f"Context files total ~{total} tokens, over the {budgets['total']}-token budget — run /project-context:optimize",
+        })
+    return issues
+
+
+def _block_hash(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def atomic_write_text(path, text):
+    """Write via a temp file in the same directory + rename, keeping the mode."""
+    _atomic_write(path, text, "w")
+
+
+def atomic_write_bytes(path, data):
+    """atomic_write_text() for raw bytes."""
+    _atomic_write(path, data, "wb")
+
+
+def _atomic_write(path, data, mode):
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode) as f:
+            f.write(data)
+        try:
+            os.chmod(tmp, path.stat().st_mode & 0o7777)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def update_managed_section(file_path):
+    """Bring one CLAUDE.md/AGENTS.md managed section up to date.
+
+    Returns "updated" or "unchanged". The file is only rewritten (atomically)
+    when the managed block's hash differs from the expected block, so no-op
+    runs leave mtimes — and file watchers — alone.
+    """
     content = file_path.read_text()
 
     # Determine which content to use
@@ -352,40 +855,125 @@ def cmd_update_sections(args):
     else:
         new_section = CLAUDE_MANAGED_CONTENT
 
-    if MANAGED_SECTION_START in content:
+    blocks = MANAGED_SECTION_RE.findall(content)
+    if blocks:
+        expected = _block_hash(new_section.strip())
+        if all(_block_hash(block) == expected for block in blocks):
+            return "unchanged"
         # Replace existing managed section
-        pattern = re.compile(
-            re.escape(MANAGED_SECTION_START) + r".*?" + re.escape(MANAGED_SECTION_END),
-            re.DOTALL
-        )
-        new_content = pattern.sub(new_section.strip(), content)
+        new_content = MANAGED_SECTION_RE.sub(lambda _: new_section.strip(), content)
     else:
         # Append managed section
         new_content = content.rstrip() + "\n" + new_section
 
-    file_path.write_text(new_content)
-    print(json.dumps({"updated": True, "file": str(file_path)}))
+    atomic_write_text(file_path, new_content)
+    return "updated"
+
+
+def find_managed_files(root):
+    """CLAUDE.md/AGENTS.md files under root that project-context manages.
+
+    A file qualifies if it already has a managed section or sits next to (or
+    in .claude/ beside) a .project-context/ directory.
+    """
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in RECURSIVE_SKIP_DIRS)
+        for name in MANAGED_FILENAMES:
+            if name not in filenames:
+                continue
+            path = Path(dirpath) / name
+            project_dir = path.parent.parent if path.parent.name == ".claude" else path.parent
+            if (project_dir / ".project-context").is_dir():
+                found.append(path)
+                continue
+            try:
+                if MANAGED_SECTION_START in path.read_text():
+                    found.append(path)
+            except (OSError, UnicodeDecodeError):
+                pass
+    return found
+
+
+def cmd_update_sections(args):
+    """Update managed sections in CLAUDE.md or AGENTS.md."""
+    if args.recursive:
+        return _update_sections_recursive(args)
+
+    file_path = Path(args.file)
+    if not file_path.exists():
+        print(json.dumps({"updated": False, "reason": f"{args.file} not found"}))
+        return 1
+
+    status = update_managed_section(file_path)
+    print(json.dumps({"updated": status == "updated", "unchanged": status == "unchanged", "file": str(file_path)}))
     return 0
 
 
+def _update_sections_recursive(args):
+    """Update every managed CLAUDE.md/AGENTS.md under --root in parallel."""
+    if args.jobs < 1:
+        print(json.dumps({"error": "--jobs must be at least 1"}))
+        return 1
+    root = Path(args.root)
+    if not root.is_dir():
+        print(json.dumps({"error": f"{args.root} is not a directory"}))
+        return 1
+
+    files = find_managed_files(root)
+    updated, unchanged, errors = [], [], []
+
+    def _update(path):
+        try:
+            return path, update_managed_section(path), None
+        except (OSError, UnicodeDecodeError) as e:
+            return path, "error", str(e)
+
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        for path, status, error in pool.map(_update, files):
+            if status == "updated":
+                updated.append(str(path))
+            elif status == "unchanged":
+                unchanged.append(str(path))
+            else:
+                errors.append({"file": str(path), "error": error})
+
+    print(json.dumps({
+        "root": str(root),
+        "updated": len(updated),
+        "unchanged": len(unchanged),
+        "errors": len(errors),
+        "updated_files": updated,
+        "error_details": errors,
+    }, indent=2))
+    return 0 if not errors else 1
+
+
 def cmd_deps(args):
     """Show parsed dependencies for a single project."""
-    context_dir = find_context_dir(args.dir)
+    result, code = deps_report(ContextSnapshot(args.dir))
+    print(json.dumps(result, indent=2))
+    return code
+
+
+def deps_report(snapshot):
+    """Build the dependency payload for a snapshot. Returns (result, exit_code)."""
+    context_dir = snapshot.context_dir
     if not context_dir:
-        print(json.dumps({
+        return {
             "error": "No .project-context/ directory found.",
             "hint": "Run /project-context:init first, then /project-context:add-dependency"
-        }))
-        return 1
+        }, 1
 
-    deps = parse_dependencies(context_dir)
-    if not deps:
-        print(json.dumps({
+    if not snapshot.dependencies:
+        return {
             "has_dependencies": False,
             "message": "No dependencies.json found.",
             "hint": "Run /project-context:add-dependency to declare cross-project relationships"
-        }))
-        return 0
+        }, 0
+
+    # Annotated copy — the snapshot's parsed data may be shared with other commands
+    deps = copy.deepcopy(snapshot.dependencies)
 
     # Resolve paths and check if dependency contexts exist
     for dep_list_key in ("upstream", "downstream"):
@@ -411,7 +999,7 @@ def cmd_deps(args):
                 dep["has_context"] = (dep_abs / ".project-context").is_dir()
 
     result = {
-        "project_dir": str(Path(args.dir).resolve()),
+        "project_dir": str(snapshot.project_dir.resolve()),
         "has_dependencies": True,
         "git_deps_count": sum(
             1 for d in deps["upstream"] + deps["downstream"] if "git" in d
@@ -419,10 +1007,636 @@ def cmd_deps(args):
         **deps,
     }
 
-    print(json.dumps(result, indent=2))
+    return result, 0
+
+
+def _read_optional(path):
+    try:
+        return path.read_text()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def _dependency_files(snapshot, dep):
+    """Return (location label, {name: path}) for a dependency's context files."""
+    if "git" in dep:
+        cache_path = snapshot.context_dir / ".deps-cache" / dep["project"]
+        label = "git, cached" if cache_path.is_dir() else "git, not cached"
+        return label, {name: cache_path / name for name in DIGEST_DEP_FILES}
+    dep_context = snapshot.context_dir.parent / dep.get("path", "") / ".project-context"
+    return f"local: {dep.get('path', '?')}", {name: dep_context / name for name in DIGEST_DEP_FILES}
+
+
+def _dependency_map(snapshot):
+    """The "Dependency Map" lines described in dependency-loading.md."""
+    deps = snapshot.dependencies
+    if not deps:
+        return []
+    lines = ["Dependency Map:"]
+    for direction, arrow, verb in (("upstream", "↑", "provides"), ("downstream", "↓", "consumes")):
+        for dep in deps[direction]:
+            label, _ = _dependency_files(snapshot, dep)
+            line = f"{arrow} {direction}: {dep['project']} ({label})"
+            if dep.get("description"):
+                line += f' — "{dep["description"]}"'
+            if dep.get("what"):
+                line += f" — {verb}: {dep['what']}"
+            lines.append(line)
+    return lines
+
+
+def _focus_words(text):
+    return {w for w in re.findall(r"[a-z0-9]+", text.lower()) if len(w) > 2}
+
+
+def _relevant_dependencies(snapshot, focus):
+    """Dependencies worth excerpting: upstream by default, or those matching --focus."""
+    deps = snapshot.dependencies
+    if not deps:
+        return []
+    if focus:
+        wanted = _focus_words(focus)
+        candidates = [
+            d for d in deps["upstream"] + deps["downstream"]
+            if wanted & _focus_words(f"{d.get('what', '')} {d.get('description', '')} {d['project']}")
+        ]
+    else:
+        candidates = list(deps["upstream"])
+    return candidates[:DIGEST_MAX_DEPS]
+
+
+def condense_markdown(text):
+    """Reduce a context file to its information-dense lines.
+
+    Drops blank lines, rules, timestamps and table separators; replaces
+    fenced blocks with a one-line marker (diagrams are expensive to inline).
+    """
+    lines = []
+    fence = None
+    for line in text.splitlines():
+        stripped = line.strip()
+        if fence is not None:
+            if stripped.startswith("```"):
+                lines.append(f"[{fence or 'code'} block, {fence_lines} lines omitted]")
+                fence = None
+            else:
+                fence_lines += 1
+            continue
+        if stripped.startswith("```"):
+            fence = stripped[3:].strip()
+            fence_lines = 0
+            continue
+        if not stripped or stripped == "---" or stripped.startswith("*Last updated"):
+            continue
+        if re.fullmatch(r"\|?[\s:|-]+\|?", stripped) and "-" in stripped:
+            continue
+        lines.append(line.rstrip())
+    return lines
+
+
+def _fit_lines(lines, budget):
+    """Take lines in order while they fit in budget. Returns (lines, tokens).
+
+    One token is held back for the "…" marker added when lines are cut.
+    """
+    taken, used = [], 0
+    for line in lines:
+        cost = estimate_tokens(line + "\n")
+        if used + cost > budget - 1:
+            taken.append("…")
+            used += 1
+            break
+        taken.append(line)
+        used += cost
+    return taken, used
+
+
+def _digest_inputs(snapshot, focus):
+    """Ordered (section title, path) pairs for every file the digest reads."""
+    inputs = [(f"Local: {name}", snapshot.context_dir / name) for name in DIGEST_LOCAL_FILES]
+    for dep in _relevant_dependencies(snapshot, focus):
+        _, files = _dependency_files(snapshot, dep)
+        inputs += [(f"{dep['project']}: {name}", path) for name, path in files.items()]
+    return inputs
+
+
+def digest_report(snapshot, max_tokens=DEFAULT_DIGEST_TOKENS, focus=None, use_cache=True):
+    """Build a token-budgeted session digest. Returns (result, exit_code).
+
+    The digest is the Dependency Map plus condensed excerpts of the local
+    context files and of the relevant dependencies' brief/architecture.
+    Results are cached under .cache/ keyed by a hash of every input.
+    """
+    if not snapshot.context_dir:
+        return {"error": "No .project-context/ directory found."}, 1
+
+    dep_map = _dependency_map(snapshot)
+    inputs = _digest_inputs(snapshot, focus)
+    texts = {}
+    for title, path in inputs:
+        if path.parent == snapshot.context_dir:
+            texts[title] = snapshot.read_text(path.name) if snapshot.exists(path.name) else None
+        else:
+            texts[title] = _read_optional(path)
+
+    # Key covers parameters, dependencies.json, cache presence (via the map) and file contents
+    key = hashlib.sha256(json.dumps([DIGEST_CACHE_VERSION, max_tokens, focus or "", dep_map]).encode())
+    if snapshot.exists("dependencies.json"):
+        key.update(snapshot.read_text("dependencies.json").encode())
+    for title, text in texts.items():
+        key.update(f"\0{title}\0{text or ''}".encode())
+    cache_key = key.hexdigest()
+
+    cache_file = snapshot.context_dir / LOCAL_CACHE_DIR_NAME / "digest.json"
+    if use_cache:
+        cached = _read_optional(cache_file)
+        if cached:
+            try:
+                entry = json.loads(cached)
+            except (json.JSONDecodeError, ValueError):
+                entry = {}
+            if entry.get("key") == cache_key:
+                return {**entry["result"], "cached": True}, 0
+
+    budget = max_tokens
+    parts = []
+    if dep_map:
+        map_lines, used = _fit_lines(dep_map, budget)
+        parts.append("\n".join(map_lines))
+        budget -= used
+
+    # Fair share per section: whatever one section leaves unused rolls over
+    sections = [(title, condense_markdown(texts[title])) for title, _ in inputs
+                if texts[title] and texts[title].strip()]
+    included = []
+    for i, (title, lines) in enumerate(sections):
+        header = f"## {title}"
+        # Header plus the blank-line separator before it
+        overhead = estimate_tokens(header + "\n\n")
+        share = budget // (len(sections) - i)
+        body, used = _fit_lines(lines, share - overhead)
+        if not body or body == ["…"]:
+            continue
+        parts.append("\n".join([header] + body))
+        budget -= used + overhead
+        included.append(title)
+
+    digest = "\n\n".join(parts) + "\n"
+    result = {
+        "digest": digest,
+        "tokens": estimate_tokens(digest),
+        "max_tokens": max_tokens,
+        "sections": included,
+        "cache_key": cache_key,
+    }
+    try:
+        cache_file = get_local_cache_dir(snapshot.context_dir) / "digest.json"
+        cache_file.write_text(json.dumps({"key": cache_key, "result": result}))
+    except OSError:
+        pass  # read-only checkout — serve uncached
+    return {**result, "cached": False}, 0
+
+
+def cmd_digest(args):
+    """Print the session digest (Dependency Map + condensed context excerpts)."""
+    result, code = digest_report(ContextSnapshot(args.dir), args.max_tokens, args.focus, not args.no_cache)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    return code
+
+
+def get_snapshot_store(context_dir):
+    """Get or create .project-context/.snapshots/ (objects/ + manifests/)."""
+    store = context_dir / SNAPSHOT_DIR_NAME
+    (store / "objects").mkdir(parents=True, exist_ok=True)
+    (store / "manifests").mkdir(exist_ok=True)
+
+    gitignore = store / ".gitignore"
+    if not gitignore.exists():
+        gitignore.write_text("# Auto-generated — local snapshots from manage_context.py\n*\n!.gitignore\n")
+
+    return store
+
+
+@contextmanager
+def snapshot_lock(store):
+    """Exclusive flock serializing snapshot writes and gc on one store."""
+    with open(store / ".lock", "a") as handle:
+        if fcntl:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        yield
+
+
+def _object_path(store, digest):
+    return store / "objects" / digest[:2] / digest[2:]
+
+
+def snapshot_paths(snapshot):
+    """Context-relative paths a snapshot covers: context files plus plans/*.md."""
+    paths = [f for f in CONTEXT_FILES if snapshot.exists(f)]
+    paths += sorted(f"plans/{name}" for name in snapshot.plans)
+    return paths
+
+
+def current_hashes(snapshot):
+    """{path: sha256} of the working context files' bytes (line endings included)."""
+    return {
+        path: hashlib.sha256((snapshot.context_dir / path).read_bytes()).hexdigest()
+        for path in snapshot_paths(snapshot)
+    }
+
+
+def _decode(data):
+    """Snapshot content as text, keeping \r\n so line-ending changes show in patches."""
+    return data.decode("utf-8", errors="replace")
+
+
+def list_snapshots(context_dir):
+    """Snapshot manifests, oldest first (ids sort chronologically)."""
+    manifests_dir = context_dir / SNAPSHOT_DIR_NAME / "manifests"
+    manifests = []
+    for path in sorted(manifests_dir.glob("*.json")) if manifests_dir.is_dir() else []:
+        try:
+            manifests.append(json.loads(path.read_text()))
+        except (OSError, json.JSONDecodeError, ValueError):
+            continue
+    return manifests
+
+
+def latest_snapshot(context_dir, label=None):
+    """Newest manifest, optionally the newest with a given label."""
+    for manifest in reversed(list_snapshots(context_dir)):
+        if label is None or manifest.get("label") == label:
+            return manifest
+    return None
+
+
+def create_snapshot(snapshot, label=None):
+    """Store the current context files and write a manifest.
+
+    Blobs are keyed by content hash, so a file that is unchanged since any
+    earlier snapshot is not written again. If nothing changed since the
+    newest snapshot and it has the same label, that snapshot is returned
+    instead of a new one. Returns (manifest, created).
+    """
+    store = get_snapshot_store(snapshot.context_dir)
+    files = current_hashes(snapshot)
+
+    # gc must not drop an object found here before the manifest referencing it exists
+    with snapshot_lock(store):
+        previous = latest_snapshot(snapshot.context_dir)
+        if previous and previous.get("label") == label and previous["files"] == files:
+            return previous, False
+
+        for path, digest in files.items():
+            obj = _object_path(store, digest)
+            if not obj.exists():
+                obj.parent.mkdir(exist_ok=True)
+                atomic_write_bytes(obj, (snapshot.context_dir / path).read_bytes())
+
+        now = datetime.now()
+        manifest_hash = hashlib.sha256(json.dumps([label, files], sort_keys=True).encode()).hexdigest()
+        manifest = {
+            "id": f"{now.strftime('%Y%m%dT%H%M%S%f')[:-3]}-{manifest_hash[:8]}",
+            "created_at": now.isoformat(timespec="seconds"),
+            "label": label,
+            "files": files,
+        }
+        atomic_write_text(store / "manifests" / f"{manifest['id']}.json", json.dumps(manifest, indent=2))
+    return manifest, True
+
+
+def resolve_snapshot(context_dir, ref):
+    """Manifest for "latest", a label (its newest snapshot), a snapshot id or
+    unique id prefix; None for "current"."""
+    if ref == "current":
+        return None
+    manifests = list_snapshots(context_dir)
+    if not manifests:
+        raise ValueError("No snapshots yet — run: manage_context.py snapshot")
+    if ref == "latest":
+        return manifests[-1]
+    labelled = [m for m in manifests if m.get("label") == ref]
+    if labelled:
+        return labelled[-1]
+    matches = [m for m in manifests if m["id"].startswith(ref)]
+    if len(matches) != 1:
+        raise ValueError(f"{'Ambiguous' if matches else 'Unknown'} snapshot: {ref}")
+    return matches[0]
+
+
+def _snapshot_reader(snapshot, manifest):
+    """(files, read) for a manifest, or for the working files when None."""
+    if manifest is None:
+        return current_hashes(snapshot), lambda path: _decode((snapshot.context_dir / path).read_bytes())
+    store = snapshot.context_dir / SNAPSHOT_DIR_NAME
+    return manifest["files"], lambda path: _decode(_object_path(store, manifest["files"][path]).read_bytes())
+
+
+def diff_snapshots(snapshot, ref_a, ref_b="current", patch=False):
+    """Files (and sections) that differ between two snapshots.
+
+    Files with equal hashes are skipped without reading their content.
+    Returns (result, exit_code).
+    """
+    if not snapshot.context_dir:
+        return {"error": "No .project-context/ directory found."}, 1
+    try:
+        manifest_a = resolve_snapshot(snapshot.context_dir, ref_a)
+        manifest_b = resolve_snapshot(snapshot.context_dir, ref_b)
+    except ValueError as e:
+        return {"error": str(e)}, 1
+
+    files_a, read_a = _snapshot_reader(snapshot, manifest_a)
+    files_b, read_b = _snapshot_reader(snapshot, manifest_b)
+
+    changed = []
+    unchanged = 0
+    for path in sorted(set(files_a) | set(files_b)):
+        if files_a.get(path) == files_b.get(path):
+            unchanged += 1
+            continue
+        entry = {"path": path}
+        text_a = read_a(path) if path in files_a else ""
+        text_b = read_b(path) if path in files_b else ""
+        if path not in files_a:
+            entry["status"] = "added"
+        elif path not in files_b:
+            entry["status"] = "removed"
+        else:
+            entry["status"] = "modified"
+        if path.endswith(".md"):
+            sections = _changed_sections(
+                {path: _hash_sections(text_a)} if text_a else {},
+                {path: _hash_sections(text_b)} if text_b else {},
+            )
+            entry["sections"] = sections.get(path, {"added": [], "changed": [], "removed": []})
+        if patch:
+            entry["patch"] = "".join(difflib.unified_diff(
+                text_a.splitlines(keepends=True), text_b.splitlines(keepends=True),
+                fromfile=f"{ref_a}/{path}", tofile=f"{ref_b}/{path}",
+            ))
+        changed.append(entry)
+
+    result = {
+        "from": manifest_a["id"] if manifest_a else "current",
+        "to": manifest_b["id"] if manifest_b else "current",
+        "changed": changed,
+        "unchanged": unchanged,
+    }
+    return result, 0
+
+
+def gc_snapshots(context_dir, keep=None):
+    """Drop old manifests and any blobs no remaining manifest references.
+
+    With keep=N only the N newest snapshots survive, plus the newest one of
+    each label (e.g. the propagate-plan baseline).
+    """
+    store = get_snapshot_store(context_dir)
+    with snapshot_lock(store):
+        manifests = list_snapshots(context_dir)
+        kept = manifests
+        if keep is not None:
+            newest_per_label = {m.get("label"): m["id"] for m in manifests if m.get("label")}
+            kept_ids = {m["id"] for m in manifests[-keep:]} if keep > 0 else set()
+            kept_ids |= set(newest_per_label.values())
+            kept = [m for m in manifests if m["id"] in kept_ids]
+            for manifest in manifests:
+                if manifest["id"] not in kept_ids:
+                    (store / "manifests" / f"{manifest['id']}.json").unlink(missing_ok=True)
+
+        referenced = {digest for m in kept for digest in m["files"].values()}
+        removed_objects = 0
+        freed_bytes = 0
+        for obj in (store / "objects").glob("*/*"):
+            if obj.parent.name + obj.name not in referenced:
+                freed_bytes += obj.stat().st_size
+                obj.unlink()
+                removed_objects += 1
+
+    return {
+        "removed_snapshots": len(manifests) - len(kept),
+        "kept_snapshots": len(kept),
+        "removed_objects": removed_objects,
+        "freed_bytes": freed_bytes,
+    }
+
+
+def cmd_snapshot(args):
+    """Record the current context files, or list recorded snapshots."""
+    snapshot = ContextSnapshot(args.dir)
+    if not snapshot.context_dir:
+        print(json.dumps({"error": "No .project-context/ directory found."}))
+        return 1
+
+    if args.list:
+        manifests = list_snapshots(snapshot.context_dir)
+        print(json.dumps([
+            {"id": m["id"], "created_at": m["created_at"], "label": m.get("label"), "files": len(m["files"])}
+            for m in manifests
+        ], indent=2))
+        return 0
+
+    manifest, created = create_snapshot(snapshot, args.label)
+    print(json.dumps({"id": manifest["id"], "created": created, "label": manifest.get("label"), "files": len(manifest["files"])}, indent=2))
     return 0
 
 
+def cmd_diff(args):
+    """Show what changed between two snapshots (default: latest vs current)."""
+    result, code = diff_snapshots(ContextSnapshot(args.dir), args.a, args.b, patch=args.patch)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    return code
+
+
+def cmd_gc(args):
+    """Prune old snapshots and unreferenced blobs."""
+    context_dir = find_context_dir(args.dir)
+    if not context_dir:
+        print(json.dumps({"error": "No .project-context/ directory found."}))
+        return 1
+    if args.keep is not None and args.keep < 0:
+        print(json.dumps({"error": "--keep must be >= 0"}))
+        return 1
+    print(json.dumps(gc_snapshots(context_dir, args.keep), indent=2))
+    return 0
+
+
+def _keyword_matcher(words):
+    """Compile one case-insensitive word-prefix regex (so "endpoint" matches "endpoints")."""
+    words = sorted({w.lower() for w in words}, key=len, reverse=True)
+    if not words:
+        return None
+    return re.compile(r"\b(?:" + "|".join(re.escape(w) for w in words) + r")", re.IGNORECASE)
+
+
+_FILE_MATCHERS = {fname: _keyword_matcher(words) for fname, words in PROPAGATION_KEYWORDS.items()}
+
+
+def _what_terms(what):
+    """Distinctive words of a dependency's `what` field, plural-trimmed."""
+    terms = set()
+    for word in re.findall(r"[A-Za-z][A-Za-z0-9_-]+", what):
+        word = word.lower()
+        if len(word) < 3 or word in _STOPWORDS:
+            continue
+        terms.add(word[:-1] if len(word) > 4 and word.endswith("s") else word)
+    return terms
+
+
+def _hash_sections(text):
+    """{section heading: sha256} of a Markdown document."""
+    return {title: hashlib.sha256(body.strip().encode()).hexdigest() for title, body in split_sections(text)}
+
+
+def _section_hashes(files, read):
+    """{file: {section heading: sha256}} for the Markdown context files."""
+    return {fname: _hash_sections(read(fname)) for fname in PROPAGATION_KEYWORDS if fname in files}
+
+
+def _changed_sections(old, new):
+    """Per file: sections added, changed or removed between two hash maps."""
+    changes = {}
+    for fname in sorted(set(old) | set(new)):
+        before, after = old.get(fname, {}), new.get(fname, {})
+        diff = {
+            "added": [t for t in after if t not in before],
+            "changed": [t for t in after if t in before and before[t] != after[t]],
+            "removed": [t for t in before if t not in after],
+        }
+        if any(diff.values()):
+            changes[fname] = diff
+    return changes
+
+
+def propagate_plan_report(snapshot, record=False):
+    """Downstream deps (with sections) that need the latest context changes.
+
+    Diffs section hashes against the newest "propagated" snapshot (taken by
+    `propagate-plan --record`), then matches changed sections against each
+    local downstream dependency's `what` with precompiled matchers.
+    Returns (result, exit_code).
+    """
+    if not snapshot.context_dir:
+        return {"error": "No .project-context/ directory found."}, 1
+
+    if record:
+        manifest, created = create_snapshot(snapshot, PROPAGATION_LABEL)
+        return {"recorded": True, "snapshot": manifest["id"], "created": created}, 0
+
+    baseline = latest_snapshot(snapshot.context_dir, PROPAGATION_LABEL)
+    current_files, read_current = _snapshot_reader(snapshot, None)
+    current = _section_hashes(current_files, read_current)
+    old_files, read_old = _snapshot_reader(snapshot, baseline) if baseline else ({}, None)
+    old = _section_hashes(old_files, read_old) if baseline else {}
+    changes = _changed_sections(old, current)
+    result = {
+        "baseline": baseline["id"] if baseline else None,
+        "changed_files": changes,
+        "propagate": [],
+        "skipped": [],
+    }
+    if not baseline:
+        result["hint"] = "No baseline yet — every section counts as added. Run with --record after propagating."
+
+    deps = snapshot.dependencies or {"downstream": []}
+    section_texts = {}
+    for dep in deps["downstream"]:
+        if "path" not in dep:
+            result["skipped"].append({"project": dep["project"], "reason": "git dependency — cannot write to remote"})
+            continue
+        what = dep.get("what", "")
+        relevant_files = [f for f in changes if _FILE_MATCHERS.get(f) and _FILE_MATCHERS[f].search(what)]
+        what_matcher = _keyword_matcher(_what_terms(what))
+
+        sections = []
+        for fname in relevant_files:
+            for change in ("added", "changed", "removed"):
+                # Removed sections are matched on their text in the baseline
+                files, read = (old_files, read_old) if change == "removed" else (current_files, read_current)
+                key = (fname, change == "removed")
+                if key not in section_texts:
+                    section_texts[key] = dict(split_sections(read(fname))) if fname in files else {}
+                for title in changes[fname][change]:
+                    body = section_texts[key].get(title, title)
+                    matched = set()
+                    for matcher in (what_matcher, _FILE_MATCHERS[fname]):
+                        if matcher:
+                            matched.update(m.lower() for m in matcher.findall(body))
+                    if not matched:
+                        continue
+                    entry = {"file": fname, "section": title, "change": change, "matched": sorted(matched)}
+                    if change != "removed":
+                        entry["excerpt"] = body[:PROPAGATION_EXCERPT_CHARS]
+                    sections.append(entry)
+
+        if not sections:
+            continue
+        state_file = (snapshot.context_dir.parent / dep["path"] / ".project-context" / "state.md").resolve()
+        result["propagate"].append({
+            "project": dep["project"],
+            "path": dep["path"],
+            "what": what,
+            "state_file": str(state_file),
+            "state_file_exists": state_file.is_file(),
+            "sections": sections,
+        })
+
+    return result, 0
+
+
+def cmd_propagate_plan(args):
+    """Show which downstream deps need which changed sections."""
+    result, code = propagate_plan_report(ContextSnapshot(args.dir), record=args.record)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    return code
+
+
+REPORT_COMMANDS = {
+    "status": status_report,
+    "validate": validate_report,
+    "deps": deps_report,
+    "digest": digest_report,
+}
+
+
+def cmd_batch(args):
+    """Run several read-only commands on one shared snapshot."""
+    commands = args.commands
+    if args.json and commands:
+        print(json.dumps({"error": "Give commands either as arguments or with --json, not both"}))
+        return 1
+    if args.json:
+        try:
+            commands = json.loads(args.json)
+        except (json.JSONDecodeError, ValueError) as e:
+            print(json.dumps({"error": f"--json is not valid JSON: {e}"}))
+            return 1
+        if not isinstance(commands, list) or not all(isinstance(c, str) for c in commands):
+            print(json.dumps({"error": "--json must be an array of command names"}))
+            return 1
+
+    if not commands:
+        print(json.dumps({"error": "No commands given", "available": sorted(REPORT_COMMANDS)}))
+        return 1
+
+    unknown = [c for c in commands if c not in REPORT_COMMANDS]
+    if unknown:
+        print(json.dumps({"error": f"Unknown batch command(s): {', '.join(unknown)}", "available": sorted(REPORT_COMMANDS)}))
+        return 1
+
+    # Files and dependencies.json are read once, on first use by any command
+    snapshot = ContextSnapshot(args.dir)
+    results = {}
+    exit_code = 0
+    for command in dict.fromkeys(commands):
+        results[command], code = REPORT_COMMANDS[command](snapshot)
+        exit_code = max(exit_code, code)
+
+    print(json.dumps(results, indent=2))
+    return exit_code
+
+
 def main():
     parser = argparse.ArgumentParser(description="Project context management")
     subparsers = parser.add_subparsers(dest="command", required=True)
@@ -437,12 +1651,52 @@ def main():
 
     # update-sections command
     sections_parser = subparsers.add_parser("update-sections", help="Update managed sections in CLAUDE.md/AGENTS.md")
-    sections_parser.add_argument("--file", required=True, help="Path to CLAUDE.md or AGENTS.md")
+    sections_target = sections_parser.add_mutually_exclusive_group(required=True)
+    sections_target.add_argument("--file", help="Path to CLAUDE.md or AGENTS.md")
+    sections_target.add_argument("--recursive", action="store_true", help="Update every managed CLAUDE.md/AGENTS.md under --root")
+    sections_parser.add_argument("--root", default=".", help="Root directory for --recursive")
+    sections_parser.add_argument("--jobs", type=int, default=8, help="Parallel writers for --recursive")
 
     # deps command
     deps_parser = subparsers.add_parser("deps", help="Show parsed dependencies for current project")
     deps_parser.add_argument("--dir", default=".", help="Project directory")
 
+    # batch command
+    batch_parser = subparsers.add_parser("batch", help="Run several read-only commands in one process")
+    batch_parser.add_argument("commands", nargs="*", help=f"Commands to run ({', '.join(REPORT_COMMANDS)})")
+    batch_parser.add_argument("--json", help='Commands as a JSON array instead of arguments, e.g. \'["status", "validate"]\'')
+    batch_parser.add_argument("--dir", default=".", help="Project root directory")
+
+    # digest command
+    digest_parser = subparsers.add_parser("digest", help="Token-budgeted dependency map and context excerpts")
+    digest_parser.add_argument("--dir", default=".", help="Project root directory")
+    digest_parser.add_argument("--max-tokens", type=int, default=DEFAULT_DIGEST_TOKENS, help="Token budget for the digest")
+    digest_parser.add_argument("--focus", help="Topic to match against dependency 'what' fields")
+    digest_parser.add_argument("--no-cache", action="store_true", help="Rebuild even if inputs are unchanged")
+
+    # snapshot command
+    snapshot_parser = subparsers.add_parser("snapshot", help="Record the current context files in the snapshot store")
+    snapshot_parser.add_argument("--dir", default=".", help="Project root directory")
+    snapshot_parser.add_argument("--label", help="Optional label, e.g. 'synced'")
+    snapshot_parser.add_argument("--list", action="store_true", help="List recorded snapshots instead")
+
+    # diff command
+    diff_parser = subparsers.add_parser("diff", help="Show context changes between two snapshots")
+    diff_parser.add_argument("a", nargs="?", default="latest", help="Snapshot id/prefix, label, 'latest' or 'current' (default: latest)")
+    diff_parser.add_argument("b", nargs="?", default="current", help="Snapshot id/prefix, label, 'latest' or 'current' (default: current)")
+    diff_parser.add_argument("--dir", default=".", help="Project root directory")
+    diff_parser.add_argument("--patch", action="store_true", help="Include a unified diff per changed file")
+
+    # gc command
+    gc_parser = subparsers.add_parser("gc", help="Prune old snapshots and unreferenced blobs")
+    gc_parser.add_argument("--dir", default=".", help="Project root directory")
+    gc_parser.add_argument("--keep", type=int, help="Keep only the N newest snapshots (plus the newest per label)")
+
+    # propagate-plan command
+    propagate_parser = subparsers.add_parser("propagate-plan", help="Downstream deps affected by context changes")
+    propagate_parser.add_argument("--dir", default=".", help="Project root directory")
+    propagate_parser.add_argument("--record", action="store_true", help="Record the current context as the new baseline")
+
     args = parser.parse_args()
 
     commands = {
@@ -450,6 +1704,12 @@ def main():
         "validate": cmd_validate,
         "update-sections": cmd_update_sections,
         "deps": cmd_deps,
+        "batch": cmd_batch,
+        "digest": cmd_digest,
+        "propagate-plan": cmd_propagate_plan,
+        "snapshot": cmd_snapshot,
+        "diff": cmd_diff,
+        "gc": cmd_gc,
     }
 
     return commands[args.command](args)
@@ -0,0 +1,772 @@
+#!/usr/bin/env python3
+"""
+mermaid_lint.py
+Offline Mermaid syntax checker: a small pure-Python lexer/parser for the
+diagram types in references/templates.md — flowchart (graph/flowchart),
+sequence, class, state and ER. Other diagram types (journey, gantt, pie,
+gitGraph, ...) are recognized and reported as unchecked, not as errors.
+
+Errors carry the line and column (1-based) in the file, so they can be
+fixed without rendering the diagram. The parser is deliberately lenient
+where renderers differ; it flags what breaks every renderer: unclosed
+brackets, quotes, subgraphs and blocks, unquoted labels with brackets or
+pipes, malformed arrows and cardinalities, messages without ': text'.
+Statements it does not recognize at all (an unknown diagram type, a token
+where it expects a node, link or relationship) may be newer Mermaid syntax,
+so they are reported with severity "warning" instead of "error".
+
+Each plugin is installed on its own, so identical copies of this file live
+in mermaid-plugin/skills/mermaid/scripts/ (the original),
+project-context/scripts/ (validate) and obsidian-plugin/skills/obsidian/scripts/
+(format_obsidian.py). Edit the original and run sync_mermaid_lint.py, which
+copies it over (--check fails if a copy differs).
+
+Usage:
+    python3 mermaid_lint.py [--json] <file.md|file.mmd|-> [...]
+"""
+
+import argparse
+import json
+import re
+import sys
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+# Diagram types that are recognized but not parsed
+UNCHECKED_TYPES = {
+    "journey", "gantt", "pie", "gitGraph", "mindmap", "timeline", "quadrantChart", "requirementDiagram",
+    "sankey-beta", "xychart-beta", "block-beta", "packet-beta", "architecture-beta", "kanban", "radar-beta",
+    "C4Context", "C4Container", "C4Component", "C4Dynamic", "C4Deployment", "zenuml",
+}
+
+FENCE = re.compile(r"^( {0,3})(`{3,}|~{3,})\s*([^`\s]*)")
+WORD = re.compile(r"[A-Za-z][\w-]*")
+DIRECTION = re.compile(r"(TB|TD|BT|RL|LR)\b")
+SPACE = re.compile(r"\s*")
+
+
+class MermaidSyntaxError(Exception):
+    """A syntax error at a 1-based line and column; severity "warning" for unrecognized syntax."""
+
+    def __init__(self, line: int, column: int, message: str, severity: str = "error"):
+        super().__init__(f"line {line}, column {column}: {message}")
+        self.line = line
+        self.column = column
+        self.message = message
+        self.severity = severity
+
+    def as_dict(self) -> dict:
+        return {"line": self.line, "column": self.column, "message": self.message, "severity": self.severity}
+
+
+class Cursor:
+    """Position in one source line; columns in errors are 1-based."""
+
+    def __init__(self, text: str, line: int, pos: int = 0):
+        self.text = text
+        self.line = line
+        self.pos = pos
+
+    def skip_space(self) -> None:
+        self.pos = SPACE.match(self.text, self.pos).end()
+
+    def match(self, pattern: "re.Pattern") -> Optional["re.Match"]:
+        m = pattern.match(self.text, self.pos)
+        if m:
+            self.pos = m.end()
+        return m
+
+    def startswith(self, prefix: str) -> bool:
+        return self.text.startswith(prefix, self.pos)
+
+    def at_end(self) -> bool:
+        return not self.text[self.pos:].strip()
+
+    def rest(self) -> str:
+        return self.text[self.pos:].strip()
+
+    def found(self, pos: Optional[int] = None) -> str:
+        pos = self.pos if pos is None else pos
+        return f"'{self.text[pos]}'" if pos < len(self.text) and self.text[pos:].strip() else "end of line"
+
+    def error(self, message: str, pos: Optional[int] = None) -> MermaidSyntaxError:
+        return MermaidSyntaxError(self.line, (self.pos if pos is None else pos) + 1, message)
+
+    def unrecognized(self, message: str, pos: Optional[int] = None) -> MermaidSyntaxError:
+        """A warning: syntax this parser does not know, which may still render."""
+        return MermaidSyntaxError(self.line, (self.pos if pos is None else pos) + 1, message, "warning")
+
+
+def read_quoted(c: Cursor) -> str:
+    """Consume a "..." string at the cursor (\\" does not end it)."""
+    start = c.pos
+    i = c.pos + 1
+    while i < len(c.text):
+        if c.text[i] == "\\":
+            i += 2
+            continue
+        if c.text[i] == '"':
+            c.pos = i + 1
+            return c.text[start + 1:i]
+        i += 1
+    raise c.error("unterminated string — missing closing '\"'", start)
+
+
+def statements(lines: List[str], first_line: int) -> Iterator[Tuple[int, str]]:
+    """(line number, line) for each line that is not blank, a %% comment or an accessibility entry."""
+    in_descr = False
+    for offset, line in enumerate(lines):
+        stripped = line.strip()
+        if in_descr:
+            in_descr = "}" not in stripped
+            continue
+        if not stripped or stripped.startswith("%%") or stripped.startswith("accTitle") and ":" in stripped:
+            continue
+        if stripped.startswith("accDescr"):
+            rest = stripped[len("accDescr"):].strip()
+            if rest.startswith("{"):
+                in_descr = "}" not in rest
+                continue
+            if rest.startswith(":"):
+                continue
+        yield first_line + offset, line
+
+
+# ---------------------------------------------------------------------------
+# Flowchart
+# ---------------------------------------------------------------------------
+
+NODE_ID = re.compile(r"\w+(?:[-.]\w+)*")
+FLOW_KEYWORD = re.compile(r"(subgraph|end|direction|classDef|class|style|linkStyle|click)(?=\s|;|$)")
+EDGE_ID = re.compile(r"\w+@(?=[<xo]?[-=~])")
+LINK = re.compile(r"[<xo]?(?:-{2,}[>xo]|-{3,}|={2,}[>xo]|={3,}|-\.+-[>xo]?|~{3,})")
+TEXT_LINK_OPEN = re.compile(r"[<xo]?(--|==|-\.)(?![->=.])")
+TEXT_LINK_CLOSE = {
+    "--": re.compile(r"-{2,}[>xo]|-{3,}"),
+    "==": re.compile(r"={2,}[>xo]|={3,}"),
+    "-.": re.compile(r"\.+-[>xo]?"),
+}
+CLASS_SUFFIX = re.compile(r":::[\w-]+")
+# Openers, longest first, with their closers
+SHAPES = [
+    ("(((", (")))",)), ("((", ("))",)), ("([", ("])",)), ("[[", ("]]",)), ("[(", (")]",)),
+    ("[/", ("/]", "\\]")), ("[\\", ("\\]", "/]")), ("{{", ("}}",)),
+    ("[", ("]",)), ("(", (")",)), ("{", ("}",)), (">", ("]",)),
+]
+UNQUOTED_FORBIDDEN = set('[](){}"|')
+
+
+def _flow_label(c: Cursor, opener: str, closers: Tuple[str, ...]) -> None:
+    open_pos = c.pos
+    c.pos += len(opener)
+    c.skip_space()
+    if c.startswith('"'):
+        read_quoted(c)
+        c.skip_space()
+        for closer in closers:
+            if c.startswith(closer):
+                c.pos += len(closer)
+                return
+        raise c.error(f"expected '{closers[0]}' after the quoted label, found {c.found()}")
+    start = c.pos
+    while c.pos < len(c.text):
+        for closer in closers:
+            if c.startswith(closer):
+                if not c.text[start:c.pos].strip():
+                    raise c.error("empty node label", open_pos)
+                c.pos += len(closer)
+                return
+        if c.text[c.pos] in UNQUOTED_FORBIDDEN:
+            raise c.error(f"'{c.text[c.pos]}' in an unquoted label — quote it: {opener}\"...\"{closers[0]}")
+        c.pos += 1
+    raise c.error(f"'{opener}' is never closed with '{closers[0]}'", open_pos)
+
+
+def _flow_node(c: Cursor) -> None:
+    c.skip_space()
+    if not c.match(NODE_ID):
+        raise c.unrecognized(f"expected a node id, found {c.found()}")
+    for opener, closers in SHAPES:
+        if c.startswith(opener):
+            _flow_label(c, opener, closers)
+            break
+    c.match(CLASS_SUFFIX)
+    if c.startswith("@{"):
+        end = c.text.find("}", c.pos)
+        if end < 0:
+            raise c.error("'@{' is never closed with '}'")
+        c.pos = end + 1
+
+
+def _flow_link(c: Cursor) -> bool:
+    """Consume a link (with its label and an optional edge id, e.g. e1@-->) if one starts at the cursor."""
+    c.match(EDGE_ID)
+    start = c.pos
+    if c.match(LINK):
+        c.skip_space()
+        if c.startswith("|"):
+            label_start = c.pos
+            c.pos += 1
+            c.skip_space()
+            if c.startswith('"'):
+                read_quoted(c)
+                c.skip_space()
+            end = c.text.find("|", c.pos)
+            if end < 0:
+                raise c.error("edge label is never closed with '|'", label_start)
+            c.pos = end + 1
+        return True
+    m = c.match(TEXT_LINK_OPEN)
+    if m:
+        close = TEXT_LINK_CLOSE[m.group(1)].search(c.text, c.pos)
+        if not close:
+            raise c.error(f"edge label after '{m.group(0)}' is not closed by an arrow (e.g. -- text -->)", start)
+        if not c.text[c.pos:close.start()].strip():
+            raise c.error("empty edge label", start)
+        c.pos = close.end()
+        return True
+    if c.startswith("->") or c.startswith("=>"):
+        raise c.error(f"'{c.text[c.pos:c.pos + 2]}' is not a flowchart link — use '-->'")
+    return False
+
+
+def _flow_statement(c: Cursor, subgraphs: list) -> None:
+    c.skip_space()
+    keyword_pos = c.pos
+    keyword = c.match(FLOW_KEYWORD)
+    if keyword:
+        word = keyword.group(1)
+        if word == "end":
+            if not subgraphs:
+                raise c.error("'end' without an open subgraph", keyword_pos)
+            subgraphs.pop()
+        elif word == "direction":
+            c.skip_space()
+            if not c.match(DIRECTION):
+                raise c.error(f"expected TB, TD, BT, RL or LR, found {c.found()}")
+        else:
+            if word == "subgraph":
+                subgraphs.append((c.line, keyword_pos + 1))
+            if c.at_end():
+                raise c.error(f"'{word}' needs arguments")
+            c.pos = len(c.text)
+        return
+
+    _flow_node(c)
+    while True:
+        c.skip_space()
+        if c.startswith("&"):
+            c.pos += 1
+            _flow_node(c)
+            continue
+        if not _flow_link(c):
+            return
+        _flow_node(c)
+
+
+def parse_flowchart(header: Cursor, body: Iterator[Tuple[int, str]]) -> List[MermaidSyntaxError]:
+    errors = []
+    subgraphs = []
+    header.skip_space()
+    header.match(DIRECTION)
+    lines = [(header.line, header)]
+    header.skip_space()
+    if header.startswith(";"):
+        header.pos += 1
+    elif not header.at_end():
+        errors.append(header.error(f"expected TB, TD, BT, RL or LR, found {header.found()}"))
+    if header.at_end() or errors:
+        lines = []
+    lines += ((number, Cursor(text, number)) for number, text in body)
+
+    for _, c in lines:
+        try:
+            while True:
+                _flow_statement(c, subgraphs)
+                c.skip_space()
+                if c.startswith(";"):
+                    c.pos += 1
+                if c.at_end():
+                    break
+                if c.text[c.pos - 1:c.pos] != ";":
+                    raise c.unrecognized(f"expected a link (-->) or end of statement, found {c.found()}")
+        except MermaidSyntaxError as e:
+            errors.append(e)
+    errors += [MermaidSyntaxError(line, column, "subgraph is never closed with 'end'") for line, column in subgraphs]
+    return errors
+
+
+# ---------------------------------------------------------------------------
+# Sequence diagram
+# ---------------------------------------------------------------------------
+
+SEQ_BLOCKS = {"loop", "alt", "opt", "par", "critical", "break", "rect", "box"}
+SEQ_BRANCHES = {"else": {"alt"}, "and": {"par"}, "option": {"critical"}}
+SEQ_KEYWORD = re.compile(r"(create\s+)?(participant|actor)\b|[A-Za-z]+\b")
+SEQ_NOTE = re.compile(r"[Nn]ote\s+(left of|right of|over)\s+([^:]+?)\s*:")
+SEQ_ARROW = re.compile(r"<<-->>|<<->>|-->>|->>|-->|->|--x|-x|--\)|-\)")
+SEQ_ACTOR = re.compile(r"[^\-<>:,;+\s](?:[^\-<>:,;+]*[^\-<>:,;+\s])?")
+
+
+def parse_sequence(header: Cursor, body: Iterator[Tuple[int, str]]) -> List[MermaidSyntaxError]:
+    errors = []
+    blocks = []
+    if not header.at_end():
+        errors.append(header.error(f"unexpected {header.found()} after sequenceDiagram"))
+    for number, text in body:
+        c = Cursor(text, number)
+        c.skip_space()
+        start = c.pos
+        try:
+            m = SEQ_KEYWORD.match(text, c.pos)
+            word = m.group(0) if m else ""
+            if m and m.group(2):
+                c.pos = m.end()
+                if c.at_end():
+                    raise c.error(f"'{m.group(2)}' needs a name")
+            elif word in SEQ_BLOCKS:
+                blocks.append((word, number, start + 1))
+            elif word in SEQ_BRANCHES:
+                if not blocks or blocks[-1][0] not in SEQ_BRANCHES[word]:
+                    raise c.error(f"'{word}' outside {' / '.join(sorted(SEQ_BRANCHES[word]))}", start)
+            elif word == "end":
+                if not blocks:
+                    raise c.error("'end' without an open block (loop, alt, opt, par, ...)", start)
+                blocks.pop()
+                c.pos = m.end()
+                if not c.at_end():
+                    raise c.error(f"unexpected {c.found()} after 'end'")
+            elif word in ("activate", "deactivate", "destroy"):
+                c.pos = m.end()
+                c.skip_space()
+                if not c.match(SEQ_ACTOR):
+                    raise c.error(f"'{word}' needs a participant")
+            elif word in ("autonumber", "title", "links", "link", "properties", "details"):
+                pass
+            elif word.lower() == "note":
+                if not SEQ_NOTE.match(text, c.pos):
+                    raise c.error("expected 'Note left of|right of|over <participant>: text'", start)
+            else:
+                _sequence_message(c)
+        except MermaidSyntaxError as e:
+            errors.append(e)
+    errors += [MermaidSyntaxError(line, column, f"'{word}' block is never closed with 'end'")
+               for word, line, column in blocks]
+    return errors
+
+
+def _sequence_message(c: Cursor) -> None:
+    if not c.match(SEQ_ACTOR):
+        raise c.unrecognized(f"expected a participant, found {c.found()}")
+    c.skip_space()
+    if not c.match(SEQ_ARROW):
+        raise c.unrecognized(f"expected a message arrow (->>, -->>, ->, -x, -)), found {c.found()}")
+    c.skip_space()
+    if c.text[c.pos:c.pos + 1] in ("+", "-"):
+        c.pos += 1
+        c.skip_space()
+    if not c.match(SEQ_ACTOR):
+        raise c.error(f"expected the receiving participant, found {c.found()}")
+    c.skip_space()
+    if not c.startswith(":"):
+        raise c.error(f"message needs ': text' after the receiver, found {c.found()}")
+
+
+# ---------------------------------------------------------------------------
+# Class diagram
+# ---------------------------------------------------------------------------
+
+CLASS_NAME = re.compile(r"`[^`]+`|\w+(?:~[^~\s]+~)?")
+CLASS_LABEL = re.compile(r'\["[^"]*"\]')
+CARDINALITY_LABEL = re.compile(r'"[^"]*"')
+CLASS_RELATION = re.compile(r"(?:<\||\*|o|<|\(\))?(?:--|\.\.)(?:\|>|\*|o|>|\(\))?")
+CLASS_ANNOTATION = re.compile(r"<<[^>]+>>")
+CLASS_OTHER = {"direction", "classDef", "cssClass", "style", "click", "callback", "link", "note", "title"}
+
+
+def parse_class(header: Cursor, body: Iterator[Tuple[int, str]]) -> List[MermaidSyntaxError]:
+    errors = []
+    opened = []  # ("class"|"namespace", line, column)
+    in_members = False
+    for number, text in body:
+        c = Cursor(text, number)
+        c.skip_space()
+        start = c.pos
+        try:
+            if in_members:
+                if c.rest() == "}":
+                    in_members = False
+                    opened.pop()
+                continue
+            if c.rest() == "}":
+                if not opened:
+                    raise c.error("'}' without an open class or namespace")
+                opened.pop()
+                continue
+            word = WORD.match(text, c.pos)
+            word = word.group(0) if word else ""
+            if word in ("class", "namespace"):
+                c.pos += len(word)
+                c.skip_space()
+                if not c.match(CLASS_NAME if word == "class" else WORD):
+                    raise c.error(f"'{word}' needs a name, found {c.found()}")
+                if word == "class":
+                    c.match(CLASS_LABEL)
+                    c.match(CLASS_SUFFIX)
+                c.skip_space()
+                if c.startswith("{"):
+                    c.pos += 1
+                    opened.append((word, number, start + 1))
+                    in_members = word == "class"
+                    if in_members and c.rest() == "}":
+                        in_members = False
+                        opened.pop()
+                    elif not c.at_end():
+                        raise c.error(f"members go on the lines after '{{', found {c.found()}")
+                elif not c.at_end():
+                    raise c.error(f"expected '{{' or end of line, found {c.found()}")
+                continue
+            if word in CLASS_OTHER:
+                continue
+            if c.match(CLASS_ANNOTATION):
+                c.skip_space()
+                if not c.at_end() and not c.match(CLASS_NAME):
+                    raise c.error(f"expected a class name after the annotation, found {c.found()}")
+                continue
+            _class_relation(c)
+        except MermaidSyntaxError as e:
+            errors.append(e)
+    errors += [MermaidSyntaxError(line, column, f"{word} body is never closed with '}}'")
+               for word, line, column in opened]
+    return errors
+
+
+def _class_relation(c: Cursor) -> None:
+    if not c.match(CLASS_NAME):
+        raise c.unrecognized(f"expected a class name, found {c.found()}")
+    c.skip_space()
+    if c.at_end() or c.startswith(":"):
+        return
+    if c.startswith('"'):
+        c.match(CARDINALITY_LABEL) or read_quoted(c)
+        c.skip_space()
+    if not c.match(CLASS_RELATION):
+        raise c.unrecognized(f"expected a relationship (<|--, *--, o--, -->, ..>, --) or ': member', found {c.found()}")
+    c.skip_space()
+    if c.startswith('"'):
+        read_quoted(c)
+        c.skip_space()
+    if not c.match(CLASS_NAME):
+        raise c.error(f"expected a class name after the relationship, found {c.found()}")
+    c.skip_space()
+    if not c.at_end() and not c.startswith(":"):
+        raise c.error(f"expected ': label' or end of line, found {c.found()}")
+
+
+# ---------------------------------------------------------------------------
+# State diagram
+# ---------------------------------------------------------------------------
+
+STATE_REF = re.compile(r"\[\*\]|\w+")
+STATE_DECLARATION = re.compile(r'state\s+(?:"[^"]*"\s+as\s+)?(\w+)')
+STATE_NOTE = re.compile(r"note\s+(left|right)\s+of\s+\w+\s*(:)?")
+STATE_OTHER = {"direction", "classDef", "class", "style", "hide", "scale", "title"}
+
+
+def parse_state(header: Cursor, body: Iterator[Tuple[int, str]]) -> List[MermaidSyntaxError]:
+    errors = []
+    composites = []
+    in_note = None
+    for number, text in body:
+        c = Cursor(text, number)
+        c.skip_space()
+        start = c.pos
+        try:
+            rest = c.rest()
+            if in_note:
+                if rest == "end note":
+                    in_note = None
+                continue
+            if rest == "}":
+                if not composites:
+                    raise c.error("'}' without an open composite state")
+                composites.pop()
+                continue
+            if rest == "--":
+                continue
+            word = WORD.match(text, c.pos)
+            word = word.group(0) if word else ""
+            if word == "state":
+                if text[c.pos + 5:].strip().startswith('"') and not STATE_DECLARATION.match(text, c.pos):
+                    raise c.error("expected 'state \"description\" as Id'", start)
+                if not STATE_DECLARATION.match(text, c.pos):
+                    raise c.error(f"'state' needs an id, found {c.found(c.pos + 5)}")
+                c.pos = STATE_DECLARATION.match(text, c.pos).end()
+                c.skip_space()
+                if c.match(CLASS_ANNOTATION) or c.match(CLASS_SUFFIX):
+                    c.skip_space()
+                if c.startswith("{"):
+                    composites.append((number, start + 1))
+                    c.pos += 1
+                elif c.startswith(":"):
+                    c.pos = len(text)
+                if not c.at_end():
+                    raise c.error(f"expected '{{' or end of line, found {c.found()}")
+                continue
+            if word == "note":
+                m = STATE_NOTE.match(text, c.pos)
+                if not m:
+                    raise c.error("expected 'note left of|right of <state> : text'", start)
+                if not m.group(2):
+                    in_note = (number, start + 1)
+                continue
+            if word in STATE_OTHER:
+                continue
+            _state_transition(c)
+        except MermaidSyntaxError as e:
+            errors.append(e)
+    if in_note:
+        errors.append(MermaidSyntaxError(in_note[0], in_note[1], "note is never closed with 'end note'"))
+    errors += [MermaidSyntaxError(line, column, "composite state is never closed with '}'")
+               for line, column in composites]
+    return errors
+
+
+def _state_transition(c: Cursor) -> None:
+    if not c.match(STATE_REF):
+        raise c.unrecognized(f"expected a state, found {c.found()}")
+    c.match(CLASS_SUFFIX)
+    c.skip_space()
+    if c.at_end() or c.startswith(":"):
+        return
+    if not c.startswith("-->"):
+        if c.startswith("->") or c.startswith("--"):
+            raise c.error("transitions use '-->'")
+        raise c.unrecognized(f"expected '-->' or ': description', found {c.found()}")
+    c.pos += 3
+    c.skip_space()
+    if not c.match(STATE_REF):
+        raise c.error(f"expected the target state after '-->', found {c.found()}")
+    c.match(CLASS_SUFFIX)
+    c.skip_space()
+    if not c.at_end() and not c.startswith(":"):
+        raise c.error(f"expected ': label' or end of line, found {c.found()}")
+
+
+# ---------------------------------------------------------------------------
+# ER diagram
+# ---------------------------------------------------------------------------
+
+ER_ENTITY = re.compile(r'"[^"]*"|[A-Za-z_][\w-]*')
+ER_ALIAS = re.compile(r'\[(?:"[^"]*"|[^\]]*)\]')
+_ER_WORD_CARDS = r"zero or one|one or zero|one or more|one or many|many\(1\)|1\+|zero or more|zero or many|many\(0\)|0\+|only one|1"
+ER_RELATION = re.compile(
+    r"(?:\|o|\|\||\}o|\}\|)(?:--|\.\.)(?:o\||\|\||o\{|\|\{)"
+    r"|(?:" + _ER_WORD_CARDS + r")\s+(?:optionally\s+)?to\s+(?:" + _ER_WORD_CARDS + r")(?=\s)"
+)
+ER_ATTRIBUTE = re.compile(r"[A-Za-z_][\w\-\[\]()]*\s+[*A-Za-z_][\w\-\[\]()]*")
+ER_KEYS = re.compile(r"(?:PK|FK|UK)(?:\s*,\s*(?:PK|FK|UK))*")
+ER_OTHER = {"direction", "style", "classDef", "class", "title"}
+
+
+def parse_er(header: Cursor, body: Iterator[Tuple[int, str]]) -> List[MermaidSyntaxError]:
+    errors = []
+    entity = None  # (line, column) of the open entity block
+    for number, text in body:
+        c = Cursor(text, number)
+        c.skip_space()
+        start = c.pos
+        try:
+            if entity:
+                if c.rest() == "}":
+                    entity = None
+                    continue
+                if not c.match(ER_ATTRIBUTE):
+                    raise c.error("expected an attribute: type name [PK|FK|UK] [\"comment\"]")
+                c.skip_space()
+                if c.match(ER_KEYS):
+                    c.skip_space()
+                if c.startswith('"'):
+                    read_quoted(c)
+                if not c.at_end():
+                    raise c.error(f"unexpected {c.found()} in attribute")
+                continue
+            if c.rest() == "}":
+                raise c.error("'}' without an open entity")
+            word = WORD.match(text, c.pos)
+            if word and word.group(0) in ER_OTHER:
+                continue
+            if not c.match(ER_ENTITY):
+                raise c.unrecognized(f"expected an entity name, found {c.found()}")
+            c.match(ER_ALIAS)
+            c.skip_space()
+            if c.startswith("{"):
+                c.pos += 1
+                entity = (number, start + 1)
+                if c.rest() == "}":
+                    entity = None
+                elif not c.at_end():
+                    raise c.error(f"attributes go on the lines after '{{', found {c.found()}")
+                continue
+            if c.at_end():
+                continue
+            if not c.match(ER_RELATION):
+                raise c.unrecognized(f"expected a relationship such as ||--o{{ or }}o--o{{, found {c.found()}")
+            c.skip_space()
+            if not c.match(ER_ENTITY):
+                raise c.error(f"expected an entity name after the relationship, found {c.found()}")
+            c.skip_space()
+            if not c.startswith(":"):
+                raise c.error(f"relationship needs ': label', found {c.found()}")
+            c.pos += 1
+            if c.at_end():
+                raise c.error("empty relationship label")
+        except MermaidSyntaxError as e:
+            errors.append(e)
+    if entity:
+        errors.append(MermaidSyntaxError(entity[0], entity[1], "entity block is never closed with '}'"))
+    return errors
+
+
+# ---------------------------------------------------------------------------
+# Entry points
+# ---------------------------------------------------------------------------
+
+PARSERS = {
+    "graph": parse_flowchart,
+    "flowchart": parse_flowchart,
+    "sequenceDiagram": parse_sequence,
+    "classDiagram": parse_class,
+    "classDiagram-v2": parse_class,
+    "stateDiagram": parse_state,
+    "stateDiagram-v2": parse_state,
+    "erDiagram": parse_er,
+}
+HEADER = re.compile(r"[A-Za-z][\w-]*")
+
+
+def lint_diagram(source: str, first_line: int = 1) -> dict:
+    """Check one diagram; first_line is the file line of its first source line.
+
+    Returns {"type", "checked", "errors": [{"line", "column", "message", "severity"}]}.
+    """
+    lines = source.split("\n")
+    body = statements(lines, first_line)
+    # YAML front matter (--- ... ---) and %%{init}%% directives come before the header
+    for number, text in body:
+        if text.strip() == "---":
+            for _, inner in body:
+                if inner.strip() == "---":
+                    break
+            continue
+        c = Cursor(text, number)
+        c.skip_space()
+        start = c.pos
+        m = c.match(HEADER)
+        kind = m.group(0) if m else ""
+        if kind in PARSERS:
+            errors = PARSERS[kind](c, body)
+            errors.sort(key=lambda e: (e.line, e.column))
+            return {"type": kind, "checked": True, "errors": [e.as_dict() for e in errors]}
+        if kind in UNCHECKED_TYPES:
+            return {"type": kind, "checked": False, "errors": []}
+        if kind:
+            error = c.unrecognized(f"unknown diagram type '{kind}'", start)
+        else:
+            error = c.error(f"expected a diagram type, found {c.found()}")
+        return {"type": None, "checked": True, "errors": [error.as_dict()]}
+    return {"type": None, "checked": True,
+            "errors": [MermaidSyntaxError(first_line, 1, "empty diagram").as_dict()]}
+
+
+def mermaid_blocks(lines: Iterable[str]) -> Iterator[Tuple[int, str]]:
+    """(line of the first diagram line, diagram source) for each ```mermaid block outside other code blocks.
+
+    Streams: only the current Mermaid block is held in memory.
+    """
+    fence = None
+    block = []
+    start = 0
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip("\n")
+        m = FENCE.match(line)
+        if fence is None:
+            if m:
+                fence = (m.group(2), m.group(3) == "mermaid")
+                start = number + 1
+                block = []
+        elif m and m.group(2)[0] == fence[0][0] and len(m.group(2)) >= len(fence[0]) and not m.group(3):
+            if fence[1]:
+                yield start, "\n".join(block)
+            fence = None
+        elif fence[1]:
+            block.append(line)
+    if fence and fence[1]:
+        yield start, "\n".join(block)
+
+
+def lint_lines(lines: Iterable[str]) -> List[dict]:
+    """lint_diagram() for every Mermaid block in Markdown lines, with "line" set to the block's first line."""
+    results = []
+    for first_line, source in mermaid_blocks(lines):
+        result = lint_diagram(source, first_line)
+        result["line"] = first_line
+        results.append(result)
+    return results
+
+
+def lint_markdown(text: str) -> List[dict]:
+    """lint_lines() over a whole Markdown document."""
+    return lint_lines(text.split("\n"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check Mermaid diagram syntax without rendering")
+    parser.add_argument("files", nargs="+", metavar="file", help="Markdown file, .mmd diagram, or - for stdin")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    report = {}
+    status = 0
+    for path in args.files:
+        try:
+            text = sys.stdin.read() if path == "-" else open(path, encoding="utf-8").read()
+        except (OSError, UnicodeDecodeError) as e:
+            report[path] = {"error": str(e)}
+            status = 1
+            continue
+        if path.endswith((".mmd", ".mermaid")):
+            diagram = lint_diagram(text)
+            diagram["line"] = 1
+            results = [diagram]
+        else:
+            results = lint_markdown(text)
+        report[path] = {"diagrams": results}
+        if any(e["severity"] == "error" for r in results for e in r["errors"]):
+            status = 1
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return status
+    for path, entry in report.items():
+        if "error" in entry:
+            print(f"{path}: error: {entry['error']}")
+            continue
+        diagrams = entry["diagrams"]
+        for diagram in diagrams:
+            for error in diagram["errors"]:
+                label = "warning: " if error["severity"] == "warning" else ""
+                print(f"{path}:{error['line']}:{error['column']}: {label}{error['message']}")
+        failed = sum(1 for d in diagrams if any(e["severity"] == "error" for e in d["errors"]))
+        warned = sum(1 for d in diagrams if d["errors"]) - failed
+        unchecked = sum(1 for d in diagrams if not d["checked"])
+        summary = f"{path}: {len(diagrams)} diagrams, {failed} with errors"
+        if warned:
+            summary += f", {warned} with warnings only"
+        if unchecked:
+            summary += f", {unchecked} not checked (unsupported type)"
+        print(("✗ " if failed else "✓ ") + summary)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())